@@ -0,0 +1,61 @@
+"""Tenant-scoped composite indexes
+
+Revision ID: 3c1f8e2a9d47
+Revises: 5a940db2ba56
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '3c1f8e2a9d47'
+down_revision = '5a940db2ba56'
+branch_labels = None
+depends_on = None
+
+
+# (имя индекса, таблица, колонки) — должны совпадать с __table_args__ моделей
+INDEXES = [
+    ("ix_deals_organization_created_at_id", "deals", ["organization_id", "created_at", "id"]),
+    ("ix_deals_organization_amount_id", "deals", ["organization_id", "amount", "id"]),
+    (
+        "ix_deals_organization_owner_created_at_id",
+        "deals",
+        ["organization_id", "owner_id", "created_at", "id"],
+    ),
+    ("ix_deals_contact_id", "deals", ["contact_id"]),
+    (
+        "ix_contacts_organization_created_at_id",
+        "contacts",
+        ["organization_id", "created_at", "id"],
+    ),
+    (
+        "ix_contacts_organization_owner_created_at_id",
+        "contacts",
+        ["organization_id", "owner_id", "created_at", "id"],
+    ),
+    ("ix_tasks_deal_created_at_id", "tasks", ["deal_id", "created_at", "id"]),
+    ("ix_activities_deal_created_at_id", "activities", ["deal_id", "created_at", "id"]),
+    (
+        "ix_organization_members_user_organization",
+        "organization_members",
+        ["user_id", "organization_id"],
+    ),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY не блокирует запись в таблицу, но не может выполняться
+    # внутри транзакции. Если построение прервется, останется невалидный индекс —
+    # его нужно удалить вручную и повторить миграцию
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name, table, columns, postgresql_concurrently=True, if_not_exists=True
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
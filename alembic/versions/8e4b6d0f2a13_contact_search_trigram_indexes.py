@@ -0,0 +1,45 @@
+"""Trigram indexes for contact search
+
+Revision ID: 8e4b6d0f2a13
+Revises: 3c1f8e2a9d47
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '8e4b6d0f2a13'
+down_revision = '3c1f8e2a9d47'
+branch_labels = None
+depends_on = None
+
+
+COLUMNS = ["name", "email", "phone"]
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    with op.get_context().autocommit_block():
+        for column in COLUMNS:
+            op.create_index(
+                f"ix_contacts_{column}_trgm",
+                "contacts",
+                [column],
+                postgresql_using="gin",
+                postgresql_ops={column: "gin_trgm_ops"},
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    # Расширение pg_trgm не удаляется: им могут пользоваться другие объекты БД
+    with op.get_context().autocommit_block():
+        for column in COLUMNS:
+            op.drop_index(
+                f"ix_contacts_{column}_trgm",
+                table_name="contacts",
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,52 @@
+"""Per-organization deal rollups
+
+Revision ID: b7d2e5c81f60
+Revises: 8e4b6d0f2a13
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'b7d2e5c81f60'
+down_revision = '8e4b6d0f2a13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "deal_rollups",
+        sa.Column("organization_id", sa.Integer(), sa.ForeignKey("organizations.id"), nullable=False),
+        sa.Column("stage", sa.String(length=32), nullable=False),
+        sa.Column("status", sa.String(length=32), nullable=False),
+        sa.Column("currency", sa.String(length=3), nullable=False),
+        sa.Column("deal_count", sa.Integer(), nullable=False),
+        sa.Column("amount_sum", sa.Numeric(18, 2), nullable=False),
+        sa.Column("positive_amount_count", sa.Integer(), nullable=False),
+        sa.Column("positive_amount_sum", sa.Numeric(18, 2), nullable=False),
+        sa.PrimaryKeyConstraint("organization_id", "stage", "status", "currency"),
+    )
+
+    # Начальное заполнение. Сделки, записанные между миграцией и выкладкой кода,
+    # исправит python -m jobs.reconcile_deal_rollups
+    op.execute(
+        """
+        INSERT INTO deal_rollups
+        SELECT organization_id,
+               coalesce(stage::text, ''),
+               coalesce(status::text, ''),
+               coalesce(currency, ''),
+               count(*),
+               coalesce(sum(amount), 0),
+               count(*) FILTER (WHERE amount > 0),
+               coalesce(sum(amount) FILTER (WHERE amount > 0), 0)
+        FROM deals
+        GROUP BY 1, 2, 3, 4
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("deal_rollups")
@@ -0,0 +1,41 @@
+"""Daily histogram of new deals
+
+Revision ID: d4a9c3f7e215
+Revises: b7d2e5c81f60
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'd4a9c3f7e215'
+down_revision = 'b7d2e5c81f60'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "deal_daily_rollups",
+        sa.Column("organization_id", sa.Integer(), sa.ForeignKey("organizations.id"), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("new_deal_count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("organization_id", "day"),
+    )
+
+    # Начальное заполнение. Сделки, записанные между миграцией и выкладкой кода,
+    # исправит python -m jobs.reconcile_deal_rollups
+    op.execute(
+        """
+        INSERT INTO deal_daily_rollups
+        SELECT organization_id, (created_at AT TIME ZONE 'UTC')::date, count(*)
+        FROM deals
+        WHERE status = 'new' AND created_at IS NOT NULL
+        GROUP BY 1, 2
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("deal_daily_rollups")
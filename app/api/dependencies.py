@@ -1,24 +1,29 @@
+import secrets
+import time
+
 from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError, jwt
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import membership_cache, user_cache
 from app.core.config import settings
+from app.core.data_version import has_recent_write
 from app.core.exceptions import UserNotMemberOfOrganizationException
-from app.database.session import get_db
+from app.database.session import ReplicaSessionLocal, get_db
+from app.models import User
 from app.repositories import OrganizationMemberRepository, UserRepository
+from app.schemas.dto import CurrentUserDTO
 
 security = HTTPBearer()
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: AsyncSession = Depends(get_db),
-):
+def _decode_token(token: str) -> tuple[int, float | None]:
+    """
+    Возвращает id пользователя и время истечения токена
+    """
     try:
-        payload = jwt.decode(
-            credentials.credentials, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         user_id_str: str = payload.get("sub")
         if user_id_str is None:
             raise HTTPException(
@@ -37,26 +42,118 @@ async def get_current_user(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials"
         )
 
-    user_repo = UserRepository(db)
-    user = await user_repo.get(user_id)
+    return user_id, payload.get("exp")
+
+
+def _remember_user(token: str, user: User | None, expires_at: float | None) -> CurrentUserDTO:
     if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    if not user.is_active:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Inactive user")
+
+    # Запись не должна пережить сам токен
+    ttl = settings.USER_CACHE_TTL_SECONDS
+    if expires_at is not None:
+        ttl = min(ttl, expires_at - time.time())
+    # В кэше - только поля пользователя, а не отсоединенный от сессии объект ORM
+    current_user = CurrentUserDTO.model_validate(user)
+    user_cache.set(token, current_user, ttl=ttl)
+
+    return current_user
+
+
+async def verify_monitoring_token(x_monitoring_token: str | None = Header(None)) -> None:
+    """
+    Доступ к эндпоинтам мониторинга: статистика относится ко всему процессу,
+    а не к организации, поэтому проверяется служебный токен, а не роль
+    """
+    expected = settings.MONITORING_TOKEN
+    if (
+        not expected
+        or x_monitoring_token is None
+        or not secrets.compare_digest(x_monitoring_token.encode(), expected.encode())
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Invalid monitoring token"
+        )
+
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_db),
+):
+    token = credentials.credentials
+    user = user_cache.get(token)
+
+    if user is None:
+        user_id, expires_at = _decode_token(token)
+
+        user_repo = UserRepository(db)
+        user = _remember_user(token, await user_repo.get(user_id), expires_at)
+
+    # Коммиты этой сессии будут отмечены как записи пользователя
+    db.info["user_id"] = user.id
     return user
 
 
-async def get_current_organization(
+async def get_organization_context(
     x_organization_id: int = Header(..., alias="X-Organization-Id"),
-    current_user=Depends(get_current_user),
+    credentials: HTTPAuthorizationCredentials = Depends(security),
     db: AsyncSession = Depends(get_db),
 ):
-    member_repo = OrganizationMemberRepository(db)
-    membership = await member_repo.get_user_membership(current_user.id, x_organization_id)
+    """
+    Пользователь и его роль в организации из заголовка X-Organization-Id.
+    При промахе кэша оба значения загружаются одним запросом
+    """
+    token = credentials.credentials
+    user = user_cache.get(token)
+
+    if user is None:
+        user_id, expires_at = _decode_token(token)
 
-    if not membership:
+        user_repo = UserRepository(db)
+        user, role = await user_repo.get_with_membership_role(user_id, x_organization_id)
+        user = _remember_user(token, user, expires_at)
+
+        if role is not None:
+            await membership_cache.set(user.id, x_organization_id, role)
+    else:
+        role = await membership_cache.get(user.id, x_organization_id)
+
+        if role is None:
+            member_repo = OrganizationMemberRepository(db)
+            membership = await member_repo.get_user_membership(user.id, x_organization_id)
+            if membership:
+                role = membership.role
+                await membership_cache.set(user.id, x_organization_id, role)
+
+    if role is None:
         raise UserNotMemberOfOrganizationException("User is not a member of this organization")
 
+    db.info["user_id"] = user.id
+    # Записи этой сессии меняют версию данных организации (ETag)
+    db.info["organization_id"] = x_organization_id
     return {
         "organization_id": x_organization_id,
-        "user_role": membership.role,
-        "membership": membership,
+        "user_role": role,
+        "user": user,
     }
+
+
+async def get_read_db(
+    org_context=Depends(get_organization_context),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Сессия для читающих эндпоинтов: реплика, если она настроена.
+    Пользователь, недавно писавший данные, читает из основной БД
+    """
+    if ReplicaSessionLocal is None or await has_recent_write(org_context["user"].id):
+        yield db
+        return
+
+    async with ReplicaSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
@@ -0,0 +1,66 @@
+import hashlib
+import time
+
+from fastapi import Depends, Request, Response, status
+
+from app.api.dependencies import get_organization_context
+from app.core.config import settings
+from app.core.data_version import get_data_version
+from app.database.session import ReplicaSessionLocal
+
+
+async def get_etag(request: Request, org_context=Depends(get_organization_context)) -> str | None:
+    """
+    Слабый ETag ответа читающего эндпоинта: версия данных организации, пользователь
+    и его роль (от них зависит видимость записей) и полный URL запроса.
+    None - ETag не выдается: Redis недоступен или реплика может еще не содержать
+    последнюю запись
+    """
+    version = await get_data_version(org_context["organization_id"])
+    if version is None:
+        return None
+
+    # Пока реплика догоняет запись, ответ с нее мог бы закрепить у клиента
+    # устаревшие данные под новым ETag
+    if ReplicaSessionLocal is not None:
+        if time.time_ns() - version < settings.READ_YOUR_WRITES_SECONDS * 1_000_000_000:
+            return None
+
+    source = ":".join(
+        (
+            str(version),
+            str(org_context["user"].id),
+            org_context["user_role"],
+            request.url.path,
+            request.url.query,
+        )
+    )
+    return f'W/"{hashlib.sha1(source.encode(), usedforsecurity=False).hexdigest()[:20]}"'
+
+
+def etag_headers(etag: str | None) -> dict[str, str]:
+    if etag is None:
+        return {}
+    # Ответ зависит от пользователя, а клиент должен перепроверять его при каждом запросе
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+
+def _strip_weak(tag: str) -> str:
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def not_modified(request: Request, etag: str | None) -> Response | None:
+    """
+    Ответ 304, если If-None-Match совпадает с etag (слабое сравнение)
+    """
+    if etag is None:
+        return None
+
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return None
+
+    tags = {_strip_weak(tag.strip()) for tag in if_none_match.split(",")}
+    if "*" in tags or _strip_weak(etag) in tags:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=etag_headers(etag))
+    return None
@@ -0,0 +1,26 @@
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+def _default(value: Any) -> Any:
+    # Decimal отдается строкой, как при сериализации через Pydantic
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class ORJSONPageResponse(JSONResponse):
+    """
+    Ответ списочного эндпоинта, сериализованный orjson без повторной валидации
+    через response_model. Формат совпадает с Pydantic: Decimal - строка,
+    datetime - ISO 8601 с суффиксом Z для UTC
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_UTC_Z)
@@ -3,6 +3,7 @@ from .analytics import router as analytics_router
 from .auth import router as auth_router
 from .contacts import router as contacts_router
 from .deals import router as deals_router
+from .monitoring import router as monitoring_router
 from .organizations import router as organizations_router
 from .tasks import router as tasks_router
 
@@ -14,4 +15,5 @@ __all__ = [
     "tasks_router",
     "activities_router",
     "analytics_router",
+    "monitoring_router",
 ]
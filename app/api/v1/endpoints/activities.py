@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.dependencies import get_current_organization, get_current_user
+from app.api.dependencies import get_organization_context, get_read_db
+from app.api.etag import etag_headers, get_etag, not_modified
+from app.api.responses import ORJSONPageResponse
 from app.database.session import get_db
 from app.schemas import ActivityCreate, ActivityListResponse, ActivityResponse
 from app.services import ActivityService
@@ -11,18 +13,25 @@ router = APIRouter()
 
 @router.get("/deals/{deal_id}/activities", response_model=ActivityListResponse)
 async def get_deal_activities(
+    request: Request,
     deal_id: int,
     page: int = Query(1, ge=1),
     page_size: int = Query(100, ge=1, le=100),
-    db: AsyncSession = Depends(get_db),
-    current_user=Depends(get_current_user),
-    org_context=Depends(get_current_organization),
+    count: str = Query("exact", regex="^(exact|capped|none)$"),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_read_db),
+    org_context=Depends(get_organization_context),
+    etag: str | None = Depends(get_etag),
 ):
+    response = not_modified(request, etag)
+    if response is not None:
+        return response
+
     activity_service = ActivityService(db)
     result = await activity_service.get_deal_activities(
-        deal_id, org_context["organization_id"], page, page_size
+        deal_id, org_context["organization_id"], page, page_size, count, cursor
     )
-    return result
+    return ORJSONPageResponse(result, headers=etag_headers(etag))
 
 
 @router.post("/deals/{deal_id}/activities", response_model=ActivityResponse)
@@ -30,11 +39,10 @@ async def create_activity(
     deal_id: int,
     activity_data: ActivityCreate,
     db: AsyncSession = Depends(get_db),
-    current_user=Depends(get_current_user),
-    org_context=Depends(get_current_organization),
+    org_context=Depends(get_organization_context),
 ):
     activity_service = ActivityService(db)
     activity = await activity_service.create_activity(
-        deal_id, activity_data.dict(), org_context["organization_id"], current_user.id
+        deal_id, activity_data.dict(), org_context["organization_id"], org_context["user"].id
     )
     return activity
@@ -1,8 +1,8 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.dependencies import get_current_organization
-from app.database.session import get_db
+from app.api.dependencies import get_organization_context, get_read_db
+from app.api.etag import etag_headers, get_etag, not_modified
 from app.schemas import DealFunnelResponse, DealSummaryResponse
 from app.services import AnalyticsService
 
@@ -11,19 +11,39 @@ router = APIRouter()
 
 @router.get("/deals/summary", response_model=DealSummaryResponse)
 async def get_deal_summary(
+    request: Request,
+    response: Response,
     days: int = Query(30, ge=1, le=365, description="Number of days for new deals period"),
-    db: AsyncSession = Depends(get_db),
-    org_context=Depends(get_current_organization),
+    db: AsyncSession = Depends(get_read_db),
+    org_context=Depends(get_organization_context),
+    etag: str | None = Depends(get_etag),
 ):
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+
+    # Сессия реплики используется, только если сводка не кэшируется; промахи кэша
+    # считаются в основной БД (см. stale_while_revalidate), иначе отставшая реплика
+    # попала бы в кэш под новым поколением
     analytics_service = AnalyticsService(db)
     summary = await analytics_service.get_deal_summary(org_context["organization_id"], days=days)
+    response.headers.update(etag_headers(etag))
     return summary
 
 
 @router.get("/deals/funnel", response_model=DealFunnelResponse)
 async def get_deal_funnel(
-    db: AsyncSession = Depends(get_db), org_context=Depends(get_current_organization)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
+    org_context=Depends(get_organization_context),
+    etag: str | None = Depends(get_etag),
 ):
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+
     analytics_service = AnalyticsService(db)
     funnel = await analytics_service.get_deal_funnel(org_context["organization_id"])
+    response.headers.update(etag_headers(etag))
     return funnel
@@ -1,10 +1,18 @@
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, Depends, Query, Request, status
 from fastapi.responses import Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.dependencies import get_current_organization, get_current_user
+from app.api.dependencies import get_organization_context, get_read_db
+from app.api.etag import etag_headers, get_etag, not_modified
+from app.api.responses import ORJSONPageResponse
 from app.database.session import get_db
-from app.schemas import ContactCreate, ContactListResponse, ContactResponse
+from app.schemas import (
+    ContactBulkDelete,
+    ContactCreate,
+    ContactListResponse,
+    ContactResponse,
+    ContactSuggestion,
+)
 from app.schemas.dto import ContactCreateDTO
 from app.services import ContactService
 
@@ -13,14 +21,21 @@ router = APIRouter()
 
 @router.get("/", response_model=ContactListResponse)
 async def get_contacts(
+    request: Request,
     page: int = Query(1, ge=1),
     page_size: int = Query(100, ge=1, le=100),
     search: str = Query(None),
     owner_id: int = Query(None),
-    db: AsyncSession = Depends(get_db),
-    current_user=Depends(get_current_user),
-    org_context=Depends(get_current_organization),
+    count: str = Query("exact", regex="^(exact|capped|none)$"),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_read_db),
+    org_context=Depends(get_organization_context),
+    etag: str | None = Depends(get_etag),
 ):
+    response = not_modified(request, etag)
+    if response is not None:
+        return response
+
     contact_service = ContactService(db)
     result = await contact_service.get_contacts(
         organization_id=org_context["organization_id"],
@@ -28,25 +43,43 @@ async def get_contacts(
         page_size=page_size,
         search=search,
         owner_id=owner_id,
-        current_user_id=current_user.id,
+        current_user_id=org_context["user"].id,
+        user_role=org_context["user_role"],
+        count=count,
+        cursor=cursor,
+    )
+    return ORJSONPageResponse(result, headers=etag_headers(etag))
+
+
+@router.get("/autocomplete", response_model=list[ContactSuggestion])
+async def autocomplete_contacts(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_read_db),
+    org_context=Depends(get_organization_context),
+):
+    contact_service = ContactService(db)
+    return await contact_service.autocomplete(
+        organization_id=org_context["organization_id"],
+        prefix=q,
+        limit=limit,
+        current_user_id=org_context["user"].id,
         user_role=org_context["user_role"],
     )
-    return result
 
 
 @router.post("/", response_model=ContactResponse)
 async def create_contact(
     contact_data: ContactCreate,
     db: AsyncSession = Depends(get_db),
-    current_user=Depends(get_current_user),
-    org_context=Depends(get_current_organization),
+    org_context=Depends(get_organization_context),
 ):
     contact_service = ContactService(db)
 
     contact_dto = ContactCreateDTO(
         **contact_data.model_dump(),
         organization_id=org_context["organization_id"],
-        owner_id=current_user.id,
+        owner_id=org_context["user"].id,
     )
 
     contact = await contact_service.create_contact(contact_dto)
@@ -57,9 +90,19 @@ async def create_contact(
 async def delete_contact(
     contact_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user=Depends(get_current_user),
-    org_context=Depends(get_current_organization),
+    org_context=Depends(get_organization_context),
 ):
     contact_service = ContactService(db)
     await contact_service.delete_contact(contact_id, org_context["organization_id"])
     return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.post("/bulk-delete", status_code=status.HTTP_204_NO_CONTENT)
+async def bulk_delete_contacts(
+    payload: ContactBulkDelete,
+    db: AsyncSession = Depends(get_db),
+    org_context=Depends(get_organization_context),
+):
+    contact_service = ContactService(db)
+    await contact_service.bulk_delete_contacts(payload.ids, org_context["organization_id"])
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
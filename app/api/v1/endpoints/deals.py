@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, Depends, Query, Request, status
 from fastapi.responses import Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.dependencies import get_current_organization, get_current_user
+from app.api.dependencies import get_organization_context, get_read_db
+from app.api.etag import etag_headers, get_etag, not_modified
+from app.api.responses import ORJSONPageResponse
 from app.database.session import get_db
 from app.schemas import DealCreate, DealListResponse, DealResponse, DealUpdate
 from app.schemas.dto import DealCreateDTO
@@ -13,6 +15,7 @@ router = APIRouter()
 
 @router.get("/", response_model=DealListResponse)
 async def get_deals(
+    request: Request,
     page: int = Query(1, ge=1),
     page_size: int = Query(100, ge=1, le=100),
     status: list[str] | None = Query(None),
@@ -22,10 +25,17 @@ async def get_deals(
     owner_id: int | None = Query(None),
     order_by: str = Query("created_at", regex="^(created_at|amount)$"),
     order: str = Query("desc", regex="^(asc|desc)$"),
-    db: AsyncSession = Depends(get_db),
-    current_user=Depends(get_current_user),
-    org_context=Depends(get_current_organization),
+    count: str = Query("exact", regex="^(exact|capped|none)$"),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_read_db),
+    org_context=Depends(get_organization_context),
+    etag: str | None = Depends(get_etag),
 ):
+    # Данные не менялись с ответа, сохраненного клиентом: список не запрашивается
+    response = not_modified(request, etag)
+    if response is not None:
+        return response
+
     deal_service = DealService(db)
     result = await deal_service.get_deals(
         organization_id=org_context["organization_id"],
@@ -38,25 +48,27 @@ async def get_deals(
         owner_id=owner_id,
         order_by=order_by,
         order=order,
-        current_user_id=current_user.id,
+        current_user_id=org_context["user"].id,
         user_role=org_context["user_role"],
+        count=count,
+        cursor=cursor,
     )
-    return result
+    # Страница уже в виде dict: отдаем ее напрямую, минуя повторную валидацию response_model
+    return ORJSONPageResponse(result, headers=etag_headers(etag))
 
 
 @router.post("/", response_model=DealResponse)
 async def create_deal(
     deal_data: DealCreate,
     db: AsyncSession = Depends(get_db),
-    current_user=Depends(get_current_user),
-    org_context=Depends(get_current_organization),
+    org_context=Depends(get_organization_context),
 ):
     deal_service = DealService(db)
 
     deal_dto = DealCreateDTO(
         **deal_data.model_dump(),
         organization_id=org_context["organization_id"],
-        owner_id=current_user.id,
+        owner_id=org_context["user"].id,
     )
 
     deal = await deal_service.create_deal(deal_dto)
@@ -68,15 +80,14 @@ async def update_deal(
     deal_id: int,
     deal_update: DealUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user=Depends(get_current_user),
-    org_context=Depends(get_current_organization),
+    org_context=Depends(get_organization_context),
 ):
     deal_service = DealService(db)
     deal = await deal_service.update_deal(
         deal_id,
         deal_update.model_dump(exclude_unset=True),
         org_context["organization_id"],
-        current_user.id,
+        org_context["user"].id,
         org_context["user_role"],
     )
     return deal
@@ -86,11 +97,10 @@ async def update_deal(
 async def delete_deal(
     deal_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user=Depends(get_current_user),
-    org_context=Depends(get_current_organization),
+    org_context=Depends(get_organization_context),
 ):
     deal_service = DealService(db)
     await deal_service.delete_deal(
-        deal_id, org_context["organization_id"], current_user.id, org_context["user_role"]
+        deal_id, org_context["organization_id"], org_context["user"].id, org_context["user_role"]
     )
     return Response(status_code=status.HTTP_204_NO_CONTENT)
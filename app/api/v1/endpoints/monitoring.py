@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends
+
+from app.api.dependencies import verify_monitoring_token
+from app.core.cache import cache_manager
+from app.core.compression import compression_stats
+from app.database.session import get_pool_status
+
+router = APIRouter(dependencies=[Depends(verify_monitoring_token)])
+
+
+@router.get("/db-pool")
+async def get_db_pool_status() -> dict:
+    return get_pool_status()
+
+
+@router.get("/compression")
+async def get_compression_stats() -> dict:
+    return compression_stats.snapshot()
+
+
+@router.get("/cache")
+async def get_cache_stats() -> dict:
+    return {"local": cache_manager.local.stats, "namespaces": cache_manager.stats.snapshot()}
@@ -1,9 +1,11 @@
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.dependencies import get_current_organization, get_current_user
+from app.api.dependencies import get_organization_context, get_read_db
+from app.api.etag import etag_headers, get_etag, not_modified
+from app.api.responses import ORJSONPageResponse
 from app.database.session import get_db
 from app.schemas import TaskCreate, TaskListResponse, TaskResponse
 from app.schemas.dto import TaskCreateDTO
@@ -14,16 +16,23 @@ router = APIRouter()
 
 @router.get("/", response_model=TaskListResponse)
 async def get_tasks(
+    request: Request,
     page: int = Query(1, ge=1),
     page_size: int = Query(100, ge=1, le=100),
     deal_id: int | None = Query(None),
     only_open: bool = Query(False),
     due_before: datetime | None = Query(None),
     due_after: datetime | None = Query(None),
-    db: AsyncSession = Depends(get_db),
-    current_user=Depends(get_current_user),
-    org_context=Depends(get_current_organization),
+    count: str = Query("exact", regex="^(exact|capped|none)$"),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_read_db),
+    org_context=Depends(get_organization_context),
+    etag: str | None = Depends(get_etag),
 ):
+    response = not_modified(request, etag)
+    if response is not None:
+        return response
+
     task_service = TaskService(db)
     result = await task_service.get_tasks(
         organization_id=org_context["organization_id"],
@@ -33,16 +42,17 @@ async def get_tasks(
         only_open=only_open,
         due_before=due_before,
         due_after=due_after,
+        count=count,
+        cursor=cursor,
     )
-    return result
+    return ORJSONPageResponse(result, headers=etag_headers(etag))
 
 
 @router.post("/", response_model=TaskResponse)
 async def create_task(
     task_data: TaskCreate,
     db: AsyncSession = Depends(get_db),
-    current_user=Depends(get_current_user),
-    org_context=Depends(get_current_organization),
+    org_context=Depends(get_organization_context),
 ):
     task_service = TaskService(db)
 
@@ -50,7 +60,7 @@ async def create_task(
 
     task = await task_service.create_task(
         task_dto,
-        current_user.id,
+        org_context["user"].id,
         org_context["user_role"],
         org_context["organization_id"]
     )
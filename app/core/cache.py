@@ -1,23 +1,651 @@
+import asyncio
+import contextlib
+import json
+import logging
+import math
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Callable, Hashable
+from typing import Any
+
 import redis.asyncio as redis
 
 from .config import settings
 
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+# Пауза перед повторной подпиской на канал инвалидации после обрыва
+_RESUBSCRIBE_SECONDS = 1.0
+# Сколько ждать сообщения подписки за одно чтение. Истечение ожидания - не ошибка:
+# канал инвалидаций может подолгу молчать
+_SUBSCRIBE_POLL_SECONDS = 1.0
+
+
+class TTLCache:
+    """
+    LRU-кэш в памяти процесса с ограничением по размеру и времени жизни записей
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return default
+
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> bool:
+        return self._data.pop(key, _MISSING) is not _MISSING
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def stats(self) -> dict:
+        requests = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / requests, 4) if requests else 0.0,
+        }
+
+
+class CircuitOpenError(redis.ConnectionError):
+    """
+    Redis не опрашивается: размыкатель открыт после серии ошибок
+    """
+
+
+class CacheBackend(ABC):
+    """
+    Хранилище кэша с подмножеством команд Redis, которое используют
+    CacheManager, версии данных и блокировки пересчета. Значения - строки
+    """
+
+    # Видят ли запись другие процессы (и нужна ли рассылка инвалидаций)
+    shared = False
+
+    async def available(self) -> bool:
+        return True
+
+    @abstractmethod
+    async def ping(self) -> bool: ...
+
+    @abstractmethod
+    async def get(self, key: str) -> str | None: ...
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ex: float | None = None, nx: bool = False) -> bool:
+        """
+        Записывает значение; с nx=True - только если ключа нет.
+        ex - время жизни в секундах, None - бессрочно
+        """
+
+    async def setex(self, key: str, ttl: float, value: Any) -> bool:
+        return await self.set(key, value, ex=ttl)
+
+    @abstractmethod
+    async def delete(self, key: str) -> int: ...
+
+    @abstractmethod
+    async def incr(self, key: str) -> int: ...
+
+    @abstractmethod
+    async def release_lock(self, key: str, token: str) -> bool:
+        """
+        Удаляет ключ блокировки, только если он все еще принадлежит владельцу token
+        """
+
+    @abstractmethod
+    async def publish(self, channel: str, message: str) -> int: ...
+
+    @abstractmethod
+    def subscribe(
+        self, channel: str, on_subscribed: Callable[[], None] | None = None
+    ) -> AsyncIterator[str]:
+        """
+        Сообщения канала; on_subscribed вызывается, когда подписка установлена
+        """
+
+    async def close(self) -> None:
+        return None
+
+
+class InMemoryBackend(CacheBackend):
+    """
+    Хранилище в памяти процесса: для развертывания в одном процессе, тестов
+    и как запасное хранилище, пока Redis недоступен. max_ttl ограничивает
+    время жизни любой записи, в том числе бессрочной
+    """
+
+    def __init__(self, maxsize: int, max_ttl: float | None = None):
+        self.max_ttl = max_ttl
+        self._data = TTLCache(maxsize=maxsize, ttl=math.inf if max_ttl is None else max_ttl)
+
+    async def ping(self) -> bool:
+        return True
+
+    async def get(self, key: str) -> str | None:
+        return self._data.get(key)
+
+    async def set(self, key: str, value: Any, ex: float | None = None, nx: bool = False) -> bool:
+        if nx and self._data.get(key) is not None:
+            return False
+        if ex is not None and self.max_ttl is not None:
+            ex = min(ex, self.max_ttl)
+        self._data.set(key, str(value), ttl=ex)
+        return True
+
+    async def delete(self, key: str) -> int:
+        return int(self._data.delete(key))
+
+    async def incr(self, key: str) -> int:
+        value = int(self._data.get(key) or 0) + 1
+        self._data.set(key, str(value))
+        return value
+
+    async def release_lock(self, key: str, token: str) -> bool:
+        if self._data.get(key) != token:
+            return False
+        return self._data.delete(key)
+
+    async def publish(self, channel: str, message: str) -> int:
+        # Других процессов, которым нужна рассылка, нет
+        return 0
+
+    async def subscribe(
+        self, channel: str, on_subscribed: Callable[[], None] | None = None
+    ) -> AsyncIterator[str]:
+        # Публиковать в канал некому: сообщений не будет
+        if on_subscribed is not None:
+            on_subscribed()
+        return
+        yield
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    async def close(self) -> None:
+        self.clear()
+
+
+class RedisBackend(CacheBackend):
+    shared = True
+
+    # Снимает блокировку, только если она все еще принадлежит владельцу токена
+    _RELEASE_LOCK = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+    def __init__(self, client: redis.Redis):
+        self.client = client
+
+    async def ping(self) -> bool:
+        return bool(await self.client.ping())  # type: ignore[misc]
+
+    async def get(self, key: str) -> str | None:
+        return await self.client.get(key)
+
+    async def set(self, key: str, value: Any, ex: float | None = None, nx: bool = False) -> bool:
+        # Redis принимает время жизни только целым числом секунд
+        ex = math.ceil(ex) if ex is not None else None
+        return bool(await self.client.set(key, value, ex=ex, nx=nx))
+
+    async def delete(self, key: str) -> int:
+        return await self.client.delete(key)
+
+    async def incr(self, key: str) -> int:
+        return await self.client.incr(key)
+
+    async def release_lock(self, key: str, token: str) -> bool:
+        return bool(await self.client.eval(self._RELEASE_LOCK, 1, key, token))  # type: ignore[misc]
+
+    async def publish(self, channel: str, message: str) -> int:
+        return await self.client.publish(channel, message)
+
+    async def subscribe(
+        self, channel: str, on_subscribed: Callable[[], None] | None = None
+    ) -> AsyncIterator[str]:
+        async with self.client.pubsub(ignore_subscribe_messages=True) as pubsub:
+            await pubsub.subscribe(channel)
+            if on_subscribed is not None:
+                on_subscribed()
+            # Не listen(): блокирующее чтение ограничено socket_timeout клиента
+            # и на молчащем канале завершалось бы TimeoutError. Живость соединения
+            # проверяет PING по health_check_interval
+            while True:
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=_SUBSCRIBE_POLL_SECONDS
+                )
+                if message is not None and message["type"] == "message":
+                    yield message["data"]
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+class CircuitBreakerBackend(CacheBackend):
+    """
+    Redis с размыкателем. После failure_threshold ошибок подряд Redis больше
+    не опрашивается (запросы не ждут таймаутов соединения), а команды
+    выполняет запасное хранилище в памяти процесса. Через reset_seconds
+    один запрос проверяет Redis командой PING; если Redis ответил, размыкатель
+    замыкается, а запасное хранилище очищается.
+
+    Ошибки, на которых размыкатель еще не открылся, пробрасываются как есть
+    """
+
+    shared = True
+
+    def __init__(
+        self,
+        primary: CacheBackend,
+        fallback: InMemoryBackend,
+        failure_threshold: int,
+        reset_seconds: float,
+    ):
+        self.primary = primary
+        self.fallback = fallback
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+    async def available(self) -> bool:
+        """
+        Можно ли обращаться к Redis. У открытого размыкателя по истечении
+        reset_seconds проверяет Redis (одним запросом на процесс)
+        """
+        if self._opened_at is None:
+            return True
+        if self._probing or time.monotonic() - self._opened_at < self.reset_seconds:
+            return False
+
+        self._probing = True
+        try:
+            await self.primary.ping()
+        except redis.RedisError:
+            self._opened_at = time.monotonic()
+            return False
+        finally:
+            self._probing = False
+
+        logger.info("Redis is available again, cache circuit closed")
+        self._opened_at = None
+        self._failures = 0
+        self.fallback.clear()
+        return True
+
+    def _record_failure(self) -> None:
+        self._failures += 1
+        if self._opened_at is None and self._failures >= self.failure_threshold:
+            logger.warning(
+                "Redis failed %s times in a row, cache circuit opened for %s seconds",
+                self._failures,
+                self.reset_seconds,
+            )
+            self._opened_at = time.monotonic()
+
+    async def _call(self, command: str, *args: Any, **kwargs: Any) -> Any:
+        if not await self.available():
+            return await getattr(self.fallback, command)(*args, **kwargs)
+
+        try:
+            result = await getattr(self.primary, command)(*args, **kwargs)
+        except redis.RedisError:
+            self._record_failure()
+            raise
+        self._failures = 0
+        return result
+
+    async def ping(self) -> bool:
+        return await self._call("ping")
+
+    async def get(self, key: str) -> str | None:
+        return await self._call("get", key)
+
+    async def set(self, key: str, value: Any, ex: float | None = None, nx: bool = False) -> bool:
+        return await self._call("set", key, value, ex=ex, nx=nx)
+
+    async def delete(self, key: str) -> int:
+        return await self._call("delete", key)
+
+    async def incr(self, key: str) -> int:
+        return await self._call("incr", key)
+
+    async def release_lock(self, key: str, token: str) -> bool:
+        return await self._call("release_lock", key, token)
+
+    async def publish(self, channel: str, message: str) -> int:
+        return await self._call("publish", channel, message)
+
+    async def subscribe(
+        self, channel: str, on_subscribed: Callable[[], None] | None = None
+    ) -> AsyncIterator[str]:
+        # Ошибки подписки не учитываются размыкателем: его открывают и замыкают
+        # только команды с данными
+        if not await self.available():
+            raise CircuitOpenError("Cache circuit is open")
+        async for message in self.primary.subscribe(channel, on_subscribed):
+            yield message
+
+    async def close(self) -> None:
+        await self.primary.close()
+        await self.fallback.close()
+
+
+def create_backend() -> CacheBackend:
+    """
+    Хранилище по settings.CACHE_BACKEND: "redis" - Redis по settings.redis_url
+    с размыкателем и запасным хранилищем в памяти, "memory" - только память процесса
+    """
+    if settings.CACHE_BACKEND == "memory":
+        return InMemoryBackend(maxsize=settings.CACHE_MEMORY_MAX_SIZE)
+
+    client = redis.from_url(
+        settings.redis_url,
+        decode_responses=True,
+        socket_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+        socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+        health_check_interval=settings.REDIS_HEALTH_CHECK_SECONDS,
+    )
+    # Запасные записи живут не дольше локальных копий: другие воркеры их не видят
+    fallback = InMemoryBackend(
+        maxsize=settings.CACHE_MEMORY_MAX_SIZE, max_ttl=settings.CACHE_LOCAL_TTL_SECONDS
+    )
+    return CircuitBreakerBackend(
+        RedisBackend(client),
+        fallback,
+        failure_threshold=settings.CACHE_BREAKER_FAILURE_THRESHOLD,
+        reset_seconds=settings.CACHE_BREAKER_RESET_SECONDS,
+    )
+
+
+class CacheStats:
+    """
+    Попадания и промахи двухуровневого кэша по пространствам имен
+    """
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self._namespaces: dict[str, dict[str, int]] = {}
+
+    def record(self, namespace: str, outcome: str) -> None:
+        item = self._namespaces.setdefault(
+            namespace, {"local_hits": 0, "redis_hits": 0, "misses": 0}
+        )
+        item[outcome] += 1
+
+    @staticmethod
+    def _summary(item: dict[str, int]) -> dict[str, Any]:
+        requests = item["local_hits"] + item["redis_hits"] + item["misses"]
+        hits = item["local_hits"] + item["redis_hits"]
+        return {
+            **item,
+            "hit_ratio": round(hits / requests, 4) if requests else 0.0,
+            "local_hit_ratio": round(item["local_hits"] / requests, 4) if requests else 0.0,
+        }
+
+    def snapshot(self) -> dict:
+        return {namespace: self._summary(item) for namespace, item in self._namespaces.items()}
+
 
 class CacheManager:
-    def __init__(self):
-        self.redis_client = None
+    """
+    Двухуровневый кэш: LRU в памяти воркера перед Redis. Значения хранятся
+    в Redis в JSON под ключом "namespace:key". Запись и удаление рассылаются
+    остальным воркерам через pub/sub, и те сбрасывают свою локальную копию;
+    время жизни локальной копии ограничено local_ttl на случай потерянных сообщений
+    """
+
+    def __init__(
+        self,
+        local_maxsize: int = settings.CACHE_LOCAL_MAX_SIZE,
+        local_ttl: int = settings.CACHE_LOCAL_TTL_SECONDS,
+        default_ttl: int = settings.CACHE_DEFAULT_TTL_SECONDS,
+        channel: str = settings.CACHE_INVALIDATION_CHANNEL,
+        backend: CacheBackend | None = None,
+    ):
+        # Хранилище создается при первом обращении (см. create_backend)
+        self.backend = backend
+        self.local = TTLCache(maxsize=local_maxsize, ttl=local_ttl)
+        self.default_ttl = default_ttl
+        self.channel = channel
+        self.stats = CacheStats()
+        self._ttls: dict[str, int] = dict(settings.CACHE_NAMESPACE_TTLS)
+        # Отличает собственные сообщения об инвалидации от сообщений других воркеров
+        self._origin = uuid.uuid4().hex
+        self._listener: asyncio.Task | None = None
 
-    async def init_redis(self):
-        self.redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+    async def get_backend(self) -> CacheBackend:
+        if self.backend is None:
+            self.backend = create_backend()
+        return self.backend
 
-    async def get_redis(self):
-        if self.redis_client is None:
-            await self.init_redis()
-        return self.redis_client
+    async def available(self) -> bool:
+        """
+        Доступно ли общее хранилище; False - команды выполняет запасное
+        хранилище в памяти процесса
+        """
+        backend = await self.get_backend()
+        return await backend.available()
 
-    async def close_redis(self):
-        if self.redis_client:
-            await self.redis_client.close()
+    async def close(self):
+        await self.stop_invalidation_listener()
+        if self.backend is not None:
+            await self.backend.close()
+
+    def register_namespace(self, namespace: str, ttl: int) -> None:
+        """
+        Задает TTL записей пространства имен, если он не переопределен
+        в settings.CACHE_NAMESPACE_TTLS
+        """
+        self._ttls.setdefault(namespace, ttl)
+
+    def ttl(self, namespace: str) -> int:
+        return self._ttls.get(namespace, self.default_ttl)
+
+    @staticmethod
+    def redis_key(namespace: str, key: str) -> str:
+        return f"{namespace}:{key}"
+
+    async def get(self, namespace: str, key: str) -> Any | None:
+        """
+        Значение из локального кэша, затем из Redis; None - промах.
+        Ошибки Redis пробрасываются
+        """
+        value = self.local.get((namespace, key))
+        if value is not None:
+            self.stats.record(namespace, "local_hits")
+            return value
+
+        backend = await self.get_backend()
+        cached = await backend.get(self.redis_key(namespace, key))
+        if cached is None:
+            self.stats.record(namespace, "misses")
+            return None
+
+        self.stats.record(namespace, "redis_hits")
+        value = json.loads(cached)
+        self._set_local(namespace, key, value)
+        return value
+
+    async def set(self, namespace: str, key: str, value: Any) -> None:
+        payload = json.dumps(value, default=str)
+        backend = await self.get_backend()
+        await backend.setex(self.redis_key(namespace, key), self.ttl(namespace), payload)
+        # Локальная копия - в том же виде, в каком ее прочитают из Redis другие воркеры
+        self._set_local(namespace, key, json.loads(payload))
+        await self._publish(backend, namespace, key)
+
+    async def delete(self, namespace: str, key: str) -> None:
+        self.local.delete((namespace, key))
+        backend = await self.get_backend()
+        await backend.delete(self.redis_key(namespace, key))
+        await self._publish(backend, namespace, key)
+
+    def _set_local(self, namespace: str, key: str, value: Any) -> None:
+        self.local.set((namespace, key), value, ttl=min(self.local.ttl, self.ttl(namespace)))
+
+    async def _publish(self, backend: CacheBackend, namespace: str, key: str) -> None:
+        message = {"origin": self._origin, "namespace": namespace, "key": key}
+        await backend.publish(self.channel, json.dumps(message))
+
+    def apply_invalidation(self, data: str) -> None:
+        """
+        Сбрасывает локальную копию по сообщению другого воркера
+        """
+        try:
+            message = json.loads(data)
+            if message["origin"] != self._origin:
+                self.local.delete((message["namespace"], message["key"]))
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Malformed cache invalidation message: %r", data)
+
+    async def start_invalidation_listener(self) -> None:
+        backend = await self.get_backend()
+        # Хранилище одного процесса: других воркеров, которых нужно уведомлять, нет
+        if self._listener is None and backend.shared:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop_invalidation_listener(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._listener
+            self._listener = None
+
+    async def _listen(self) -> None:
+        resubscribing = False
+
+        def subscribed() -> None:
+            # Пока подписки не было, сообщения могли потеряться
+            if resubscribing:
+                self.local.clear()
+
+        while True:
+            try:
+                backend = await self.get_backend()
+                async for message in backend.subscribe(self.channel, subscribed):
+                    self.apply_invalidation(message)
+            except redis.RedisError:
+                logger.warning("Cache invalidation channel is unavailable, reconnecting")
+            except Exception:
+                # Подписка не должна завершаться: без нее локальные копии живут до local_ttl
+                logger.exception("Cache invalidation listener failed, restarting")
+            resubscribing = True
+            await asyncio.sleep(_RESUBSCRIBE_SECONDS)
 
 
 cache_manager = CacheManager()
+
+
+class MembershipCache:
+    """
+    Кэш ролей пользователей в организациях: (user_id, organization_id) -> role.
+    Первый уровень хранится в памяти процесса, второй (опционально) в Redis.
+    API не меняет членство, явной инвалидации нет: роль, измененная в БД,
+    видна всем воркерам не позже чем через ttl
+    """
+
+    def __init__(self, maxsize: int, ttl: int, use_redis: bool = False):
+        self.ttl = ttl
+        self.use_redis = use_redis
+        self.local = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    @staticmethod
+    def _redis_key(user_id: int, organization_id: int) -> str:
+        return f"membership:{user_id}:{organization_id}"
+
+    async def get(self, user_id: int, organization_id: int) -> str | None:
+        role = self.local.get((user_id, organization_id))
+        if role is not None or not self.use_redis:
+            return role
+
+        try:
+            backend = await cache_manager.get_backend()
+            role = await backend.get(self._redis_key(user_id, organization_id))
+        except redis.RedisError:
+            logger.warning("Redis is unavailable, membership cache lookup skipped")
+            return None
+
+        if role is not None:
+            self.local.set((user_id, organization_id), role)
+        return role
+
+    async def set(self, user_id: int, organization_id: int, role: str) -> None:
+        self.local.set((user_id, organization_id), role)
+        if not self.use_redis:
+            return
+
+        try:
+            backend = await cache_manager.get_backend()
+            await backend.setex(self._redis_key(user_id, organization_id), self.ttl, role)
+        except redis.RedisError:
+            logger.warning("Redis is unavailable, membership cache write skipped")
+
+
+# Пользователи, уже прошедшие проверку токена: token -> CurrentUserDTO.
+# API не меняет пользователей, явной инвалидации нет: деактивация или смена
+# данных в БД видна не позже чем через USER_CACHE_TTL_SECONDS
+user_cache = TTLCache(maxsize=settings.USER_CACHE_MAX_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS)
+
+
+membership_cache = MembershipCache(
+    maxsize=settings.MEMBERSHIP_CACHE_MAX_SIZE,
+    ttl=settings.MEMBERSHIP_CACHE_TTL_SECONDS,
+    use_redis=settings.MEMBERSHIP_CACHE_USE_REDIS,
+)
+
+# Организации пользователя с ролями: user_id -> list[dict]. Кэш в памяти
+# воркера без инвалидации (API не меняет членство): изменения в БД видны
+# не позже чем через USER_ORGANIZATIONS_CACHE_TTL_SECONDS
+user_organizations_cache = TTLCache(
+    maxsize=settings.USER_ORGANIZATIONS_CACHE_MAX_SIZE,
+    ttl=settings.USER_ORGANIZATIONS_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,245 @@
+import time
+import zlib
+from typing import Any
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli есть в requirements.txt; если пакет не собрался, остается gzip
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "text/",
+)
+
+# Верхние границы корзин (байт) для статистики по размеру несжатого ответа
+SIZE_BUCKETS = (1024, 4096, 16_384, 65_536, 262_144)
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    """
+    Выбирает br или gzip по заголовку Accept-Encoding с учетом q-весов.
+    При равных весах предпочитается br
+    """
+    weights: dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        weight = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        if name:
+            weights[name.strip()] = weight
+
+    candidates = ("br", "gzip") if brotli is not None else ("gzip",)
+    best, best_weight = None, 0.0
+    for encoding in candidates:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+class CompressionStats:
+    """
+    Счетчики сжатия по кодировкам и корзинам размера: сколько байт сэкономлено
+    и сколько процессорного времени на это потрачено
+    """
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.skipped_below_threshold = 0
+        self._encodings: dict[str, dict[str, float]] = {}
+        self._buckets: dict[str, dict[str, float]] = {}
+
+    @staticmethod
+    def _bucket(size: int) -> str:
+        for upper in SIZE_BUCKETS:
+            if size < upper:
+                return f"<{upper // 1024}KB"
+        return f">={SIZE_BUCKETS[-1] // 1024}KB"
+
+    def record(self, encoding: str, bytes_in: int, bytes_out: int, cpu_seconds: float) -> None:
+        for key, table in ((encoding, self._encodings), (self._bucket(bytes_in), self._buckets)):
+            item = table.setdefault(
+                key, {"responses": 0, "bytes_in": 0, "bytes_out": 0, "cpu_seconds": 0.0}
+            )
+            item["responses"] += 1
+            item["bytes_in"] += bytes_in
+            item["bytes_out"] += bytes_out
+            item["cpu_seconds"] += cpu_seconds
+
+    @staticmethod
+    def _summary(item: dict[str, float]) -> dict[str, Any]:
+        saved = item["bytes_in"] - item["bytes_out"]
+        return {
+            "responses": item["responses"],
+            "bytes_in": item["bytes_in"],
+            "bytes_out": item["bytes_out"],
+            "bytes_saved": saved,
+            "ratio": round(item["bytes_out"] / item["bytes_in"], 4) if item["bytes_in"] else None,
+            "cpu_ms": round(item["cpu_seconds"] * 1000, 3),
+            "cpu_us_per_kb_saved": (
+                round(item["cpu_seconds"] * 1_000_000 / (saved / 1024), 2) if saved > 0 else None
+            ),
+        }
+
+    def snapshot(self) -> dict:
+        return {
+            "skipped_below_threshold": self.skipped_below_threshold,
+            "encodings": {key: self._summary(item) for key, item in self._encodings.items()},
+            "by_size": {key: self._summary(item) for key, item in self._buckets.items()},
+        }
+
+
+compression_stats = CompressionStats()
+
+
+class _Compressor:
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            # wbits=31 - формат gzip (заголовок и контрольная сумма)
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        if self.encoding == "br":
+            output = self._brotli.process(data)
+            return output + (self._brotli.finish() if final else self._brotli.flush())
+        output = self._zlib.compress(data)
+        return output + self._zlib.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class CompressionMiddleware:
+    """
+    ASGI-middleware сжатия ответов gzip/brotli по Accept-Encoding.
+    Ответы меньше minimum_size отдаются как есть. Потоковые ответы (more_body)
+    сжимаются по частям со сбросом буфера после каждой части, чтобы клиент
+    получал данные без задержки
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        stats: CompressionStats = compression_stats,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.stats = stats
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.downstream = send
+        self.start_message: Message | None = None
+        self.compressor: _Compressor | None = None
+        self.passthrough = False
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.cpu_seconds = 0.0
+
+    def _is_compressible(self, headers: Headers) -> bool:
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "")
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    def _compress(self, data: bytes, final: bool) -> bytes:
+        assert self.compressor is not None
+        started = time.thread_time()
+        output = self.compressor.compress(data, final)
+        self.cpu_seconds += time.thread_time() - started
+        self.bytes_in += len(data)
+        self.bytes_out += len(output)
+        return output
+
+    def _start_compression(self) -> None:
+        assert self.start_message is not None
+        self.compressor = _Compressor(
+            self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality
+        )
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        del headers["Content-Length"]
+        self.start_message["headers"] = headers.raw
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            self.passthrough = not self._is_compressible(Headers(raw=message["headers"]))
+            if self.passthrough:
+                await self.downstream(message)
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.downstream(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            if not more_body and len(body) < self.middleware.minimum_size:
+                # Небольшой ответ целиком: сжатие не окупится
+                self.middleware.stats.skipped_below_threshold += 1
+                self.passthrough = True
+                assert self.start_message is not None
+                await self.downstream(self.start_message)
+                await self.downstream(message)
+                return
+
+            self._start_compression()
+            assert self.start_message is not None
+            if not more_body:
+                output = self._compress(body, final=True)
+                headers = MutableHeaders(raw=self.start_message["headers"])
+                headers["Content-Length"] = str(len(output))
+                await self.downstream(self.start_message)
+                await self.downstream({"type": "http.response.body", "body": output})
+                self._record()
+                return
+            await self.downstream(self.start_message)
+
+        output = self._compress(body, final=not more_body)
+        await self.downstream({"type": "http.response.body", "body": output, "more_body": more_body})
+        if not more_body:
+            self._record()
+
+    def _record(self) -> None:
+        self.middleware.stats.record(
+            self.encoding, self.bytes_in, self.bytes_out, self.cpu_seconds
+        )
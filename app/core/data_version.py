@@ -0,0 +1,174 @@
+import logging
+import time
+
+import redis.asyncio as redis
+
+from .cache import CacheBackend, cache_manager
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# Организации, изменения которых не удалось отметить, пока общее хранилище
+# было недоступно: их версии сменяются при первом обращении после восстановления
+_missed_data_versions: set[int] = set()
+_missed_analytics_generations: set[int] = set()
+
+
+def _key(organization_id: int) -> str:
+    return f"data_version:{organization_id}"
+
+
+def _analytics_key(organization_id: int) -> str:
+    return f"analytics_generation:{organization_id}"
+
+
+def _recent_write_key(user_id: int) -> str:
+    return f"ryw:{user_id}"
+
+
+async def _get_or_init(backend: CacheBackend, key: str) -> int | None:
+    # Отсутствующий ключ (новая организация или вытеснение из Redis) заводится
+    # текущим временем в наносекундах: он не совпадет ни с одним значением,
+    # выданным до потери ключа
+    value = await backend.get(key)
+    if value is None:
+        value = time.time_ns()
+        if not await backend.set(key, value, nx=True):
+            value = await backend.get(key)
+
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+async def _incr_analytics_generation(backend: CacheBackend, organization_id: int) -> None:
+    if await backend.incr(_analytics_key(organization_id)) == 1:
+        # Ключ был потерян: продолжаем с текущего времени, чтобы не вернуться
+        # к поколению, под которым еще могут лежать старые сводки
+        await backend.set(_analytics_key(organization_id), time.time_ns())
+
+
+async def _replay_missed_bumps(backend: CacheBackend) -> None:
+    for organization_id in list(_missed_data_versions):
+        await backend.set(_key(organization_id), time.time_ns())
+        _missed_data_versions.discard(organization_id)
+    for organization_id in list(_missed_analytics_generations):
+        await _incr_analytics_generation(backend, organization_id)
+        _missed_analytics_generations.discard(organization_id)
+
+
+async def _shared_backend() -> CacheBackend | None:
+    """
+    Общее хранилище, если оно доступно, с уже отмеченными пропущенными изменениями.
+    Версии из запасного хранилища процесса не выдаются: его не видят другие
+    воркеры, и они не узнали бы о записях этого
+    """
+    if not await cache_manager.available():
+        return None
+
+    backend = await cache_manager.get_backend()
+    await _replay_missed_bumps(backend)
+    return backend
+
+
+async def bump_data_version(organization_id: int) -> None:
+    """
+    Отмечает изменение данных организации. Версия - время записи в наносекундах:
+    после потери ключа в Redis новая версия не совпадет ни с одной из выданных ранее
+    """
+    try:
+        backend = await _shared_backend()
+        if backend is not None:
+            await backend.set(_key(organization_id), time.time_ns())
+            return
+    except redis.RedisError:
+        pass
+
+    _missed_data_versions.add(organization_id)
+    logger.warning(
+        "Redis is unavailable, data version of organization %s not bumped", organization_id
+    )
+
+
+async def get_data_version(organization_id: int) -> int | None:
+    """
+    Текущая версия данных организации; None, если Redis недоступен
+    """
+    try:
+        backend = await _shared_backend()
+        if backend is not None:
+            return await _get_or_init(backend, _key(organization_id))
+    except redis.RedisError:
+        pass
+
+    logger.warning("Redis is unavailable, data version lookup skipped")
+    return None
+
+
+async def bump_analytics_generation(organization_id: int) -> None:
+    """
+    Сменяет поколение кэша аналитики организации одним INCR: ключи сводок
+    содержат поколение, поэтому записи прежнего поколения больше не читаются
+    и истекают по TTL
+    """
+    try:
+        backend = await _shared_backend()
+        if backend is not None:
+            await _incr_analytics_generation(backend, organization_id)
+            return
+    except redis.RedisError:
+        pass
+
+    _missed_analytics_generations.add(organization_id)
+    logger.warning(
+        "Redis is unavailable, analytics cache of organization %s not invalidated",
+        organization_id,
+    )
+
+
+async def get_analytics_generation(organization_id: int) -> int | None:
+    """
+    Текущее поколение кэша аналитики организации; None, если Redis недоступен
+    """
+    try:
+        backend = await _shared_backend()
+        if backend is not None:
+            return await _get_or_init(backend, _analytics_key(organization_id))
+    except redis.RedisError:
+        pass
+
+    logger.warning("Redis is unavailable, analytics generation lookup skipped")
+    return None
+
+
+async def mark_recent_write(user_id: int) -> None:
+    """
+    Отмечает запись пользователя в основную БД: READ_YOUR_WRITES_SECONDS
+    его чтения идут мимо реплики. Отметка хранится в Redis и видна всем воркерам
+    """
+    try:
+        backend = await _shared_backend()
+        if backend is not None:
+            await backend.set(_recent_write_key(user_id), 1, ex=settings.READ_YOUR_WRITES_SECONDS)
+            return
+    except redis.RedisError:
+        pass
+
+    logger.warning("Redis is unavailable, recent write of user %s not marked", user_id)
+
+
+async def has_recent_write(user_id: int) -> bool:
+    """
+    Писал ли пользователь недавно. Если Redis недоступен - True: отметку
+    другого воркера не проверить, и читать безопасно только из основной БД
+    """
+    try:
+        backend = await _shared_backend()
+        if backend is not None:
+            return await backend.get(_recent_write_key(user_id)) is not None
+    except redis.RedisError:
+        pass
+
+    logger.warning("Redis is unavailable, reads of user %s go to the primary", user_id)
+    return True
@@ -1,7 +1,24 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
 from passlib.context import CryptContext
 
+from .config import settings
+
 password_context = CryptContext(schemes=["argon2"], deprecated="auto")
 
+# argon2 отпускает GIL, поэтому хеширование в потоках не блокирует event loop
+_hashing_executor: ThreadPoolExecutor | None = None
+
+
+def _get_hashing_executor() -> ThreadPoolExecutor:
+    global _hashing_executor
+    if _hashing_executor is None:
+        _hashing_executor = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_HASHING_WORKERS, thread_name_prefix="password-hashing"
+        )
+    return _hashing_executor
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return password_context.verify(plain_password, hashed_password)
@@ -9,3 +26,22 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     return password_context.hash(password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _get_hashing_executor(), verify_password, plain_password, hashed_password
+    )
+
+
+async def get_password_hash_async(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_hashing_executor(), get_password_hash, password)
+
+
+def shutdown_hashing_executor() -> None:
+    global _hashing_executor
+    if _hashing_executor is not None:
+        _hashing_executor.shutdown(wait=False, cancel_futures=True)
+        _hashing_executor = None
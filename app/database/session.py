@@ -1,8 +1,34 @@
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 
 from app.core.config import settings
 
-engine = create_async_engine(settings.database_url, echo=True, future=True)
+
+def _connect_args() -> dict:
+    if settings.DB_STATEMENT_TIMEOUT_MS <= 0:
+        return {}
+    return {"server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}}
+
+
+def _create_engine(url: str) -> AsyncEngine:
+    return create_async_engine(
+        url,
+        echo=settings.DB_ECHO,
+        future=True,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args=_connect_args(),
+    )
+
+
+engine = _create_engine(settings.database_url)
 
 AsyncSessionLocal = async_sessionmaker(
     engine,
@@ -10,6 +36,37 @@ AsyncSessionLocal = async_sessionmaker(
     expire_on_commit=False,
 )
 
+replica_engine = (
+    _create_engine(settings.REPLICA_DATABASE_URL) if settings.REPLICA_DATABASE_URL else None
+)
+
+ReplicaSessionLocal = (
+    async_sessionmaker(replica_engine, class_=AsyncSession, expire_on_commit=False)
+    if replica_engine is not None
+    else None
+)
+
+
+def _engine_pool_status(async_engine: AsyncEngine) -> dict:
+    pool = async_engine.pool
+    return {
+        "pool_size": pool.size(),  # type: ignore[attr-defined]
+        "checked_in": pool.checkedin(),  # type: ignore[attr-defined]
+        "checked_out": pool.checkedout(),  # type: ignore[attr-defined]
+        "overflow": pool.overflow(),  # type: ignore[attr-defined]
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+    }
+
+
+def get_pool_status() -> dict:
+    """
+    Текущее состояние пулов соединений основной БД и реплики
+    """
+    return {
+        "primary": _engine_pool_status(engine),
+        "replica": _engine_pool_status(replica_engine) if replica_engine is not None else None,
+    }
+
 
 async def get_db():
     async with AsyncSessionLocal() as session:
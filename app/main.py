@@ -11,11 +11,15 @@ from app.api.v1.endpoints import (
     auth_router,
     contacts_router,
     deals_router,
+    monitoring_router,
     organizations_router,
     tasks_router,
 )
+from app.core.cache import cache_manager
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
 from app.core.exceptions import DomainException
+from app.core.security import shutdown_hashing_executor
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -33,6 +37,12 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+)
 
 app.include_router(auth_router, prefix=f"{settings.API_V1_STR}/auth", tags=["auth"])
 app.include_router(
@@ -45,6 +55,9 @@ app.include_router(
     activities_router, prefix=f"{settings.API_V1_STR}/activities", tags=["activities"]
 )
 app.include_router(analytics_router, prefix=f"{settings.API_V1_STR}/analytics", tags=["analytics"])
+app.include_router(
+    monitoring_router, prefix=f"{settings.API_V1_STR}/monitoring", tags=["monitoring"]
+)
 
 
 @app.exception_handler(DomainException)
@@ -58,4 +71,12 @@ async def domain_exception_handler(request: Request, exc: DomainException) -> JS
 
 @app.on_event("startup")
 async def startup() -> None:
+    await cache_manager.start_invalidation_listener()
     logger.info("Application started")
+
+
+@app.on_event("shutdown")
+async def shutdown() -> None:
+    shutdown_hashing_executor()
+    await cache_manager.close()
+    logger.info("Application stopped")
@@ -1,6 +1,7 @@
 from .activity import Activity
 from .contact import Contact
 from .deal import Deal
+from .deal_rollup import DealDailyRollup, DealRollup
 from .organization import Organization, OrganizationMember
 from .task import Task
 from .user import User
@@ -11,6 +12,8 @@ __all__ = [
     "OrganizationMember",
     "Contact",
     "Deal",
+    "DealRollup",
+    "DealDailyRollup",
     "Task",
     "Activity",
 ]
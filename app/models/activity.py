@@ -1,4 +1,4 @@
-from sqlalchemy import JSON, Column, DateTime, Enum, ForeignKey, Integer
+from sqlalchemy import JSON, Column, DateTime, Enum, ForeignKey, Index, Integer
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -27,3 +27,5 @@ class Activity(Base):
 
     deal = relationship("Deal", back_populates="activities")
     author = relationship("User")
+
+    __table_args__ = (Index("ix_activities_deal_created_at_id", "deal_id", "created_at", "id"),)
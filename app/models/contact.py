@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -19,3 +19,33 @@ class Contact(Base):
     organization = relationship("Organization")
     owner = relationship("User")
     deals = relationship("Deal", back_populates="contact")
+
+    __table_args__ = (
+        Index("ix_contacts_organization_created_at_id", "organization_id", "created_at", "id"),
+        Index(
+            "ix_contacts_organization_owner_created_at_id",
+            "organization_id",
+            "owner_id",
+            "created_at",
+            "id",
+        ),
+        # Триграммные индексы для поиска по подстроке (нужно расширение pg_trgm)
+        Index(
+            "ix_contacts_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_contacts_email_trgm",
+            "email",
+            postgresql_using="gin",
+            postgresql_ops={"email": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_contacts_phone_trgm",
+            "phone",
+            postgresql_using="gin",
+            postgresql_ops={"phone": "gin_trgm_ops"},
+        ),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, Enum, ForeignKey, Integer, Numeric, String, Text
+from sqlalchemy import Column, DateTime, Enum, ForeignKey, Index, Integer, Numeric, String, Text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -29,3 +29,17 @@ class Deal(Base):
     owner = relationship("User")
     tasks = relationship("Task", back_populates="deal")
     activities = relationship("Activity", back_populates="deal")
+
+    # Индексы под фильтры и сортировки DealRepository (id — для keyset-пагинации)
+    __table_args__ = (
+        Index("ix_deals_organization_created_at_id", "organization_id", "created_at", "id"),
+        Index("ix_deals_organization_amount_id", "organization_id", "amount", "id"),
+        Index(
+            "ix_deals_organization_owner_created_at_id",
+            "organization_id",
+            "owner_id",
+            "created_at",
+            "id",
+        ),
+        Index("ix_deals_contact_id", "contact_id"),
+    )
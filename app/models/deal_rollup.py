@@ -0,0 +1,37 @@
+from sqlalchemy import Column, Date, ForeignKey, Integer, Numeric, String
+
+from app.database.base import Base
+
+
+class DealRollup(Base):
+    """
+    Агрегаты сделок организации по (stage, status, currency). Обновляются
+    приращениями в транзакции каждой записи сделки (DealRepository), поэтому
+    аналитика читает несколько строк вместо группировки по всем сделкам.
+    Пустые stage/status/currency хранятся как ""
+    """
+
+    __tablename__ = "deal_rollups"
+
+    organization_id = Column(Integer, ForeignKey("organizations.id"), primary_key=True)
+    stage = Column(String(32), primary_key=True)
+    status = Column(String(32), primary_key=True)
+    currency = Column(String(3), primary_key=True)
+    deal_count = Column(Integer, nullable=False, default=0)
+    amount_sum = Column(Numeric(18, 2), nullable=False, default=0)
+    # Для средней суммы: учитываются только сделки с amount > 0
+    positive_amount_count = Column(Integer, nullable=False, default=0)
+    positive_amount_sum = Column(Numeric(18, 2), nullable=False, default=0)
+
+
+class DealDailyRollup(Base):
+    """
+    Гистограмма сделок организации в статусе new по дню создания (UTC).
+    Число новых сделок за любые последние N дней - сумма ее последних корзин
+    """
+
+    __tablename__ = "deal_daily_rollups"
+
+    organization_id = Column(Integer, ForeignKey("organizations.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    new_deal_count = Column(Integer, nullable=False, default=0)
@@ -1,4 +1,13 @@
-from sqlalchemy import Column, DateTime, Enum, ForeignKey, Integer, String, UniqueConstraint
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    UniqueConstraint,
+)
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -24,4 +33,9 @@ class OrganizationMember(Base):
     organization = relationship("Organization")
     user = relationship("User")
 
-    __table_args__ = (UniqueConstraint("organization_id", "user_id", name="uq_organization_user"),)
+    # Уникальный индекс (organization_id, user_id) покрывает поиск по организации,
+    # для списка организаций пользователя нужен индекс, начинающийся с user_id
+    __table_args__ = (
+        UniqueConstraint("organization_id", "user_id", name="uq_organization_user"),
+        Index("ix_organization_members_user_organization", "user_id", "organization_id"),
+    )
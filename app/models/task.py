@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -17,3 +17,5 @@ class Task(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     deal = relationship("Deal", back_populates="tasks")
+
+    __table_args__ = (Index("ix_tasks_deal_created_at_id", "deal_id", "created_at", "id"),)
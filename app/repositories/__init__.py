@@ -2,6 +2,7 @@ from .activity import ActivityRepository
 from .base import BaseRepository
 from .contact import ContactRepository
 from .deal import DealRepository
+from .deal_rollup import DealRollupRepository
 from .organization import OrganizationMemberRepository, OrganizationRepository
 from .task import TaskRepository
 from .user import UserRepository
@@ -13,6 +14,7 @@ __all__ = [
     "OrganizationMemberRepository",
     "ContactRepository",
     "DealRepository",
+    "DealRollupRepository",
     "TaskRepository",
     "ActivityRepository",
 ]
@@ -1,4 +1,4 @@
-from sqlalchemy import and_, select
+from sqlalchemy import Select, and_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..models import Activity
@@ -9,31 +9,41 @@ class ActivityRepository(BaseRepository[Activity]):
     def __init__(self, db: AsyncSession):
         super().__init__(Activity, db)
 
-    async def get_deal_activities(
-        self, deal_id: int, organization_id: int, skip: int = 0, limit: int = 100
-    ) -> list[Activity]:
+    def _deal_activities_query(self, deal_id: int, organization_id: int) -> Select:
         from app.models.deal import Deal
 
-        query = (
+        return (
             select(Activity)
             .join(Deal, Activity.deal_id == Deal.id)
             .where(and_(Activity.deal_id == deal_id, Deal.organization_id == organization_id))
-            .order_by(Activity.created_at.desc())
-            .offset(skip)
-            .limit(limit)
         )
 
+    async def get_deal_activities(
+        self,
+        deal_id: int,
+        organization_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        after: tuple | None = None,
+    ) -> list[Activity]:
+        query = self._order_by_keyset(
+            self._deal_activities_query(deal_id, organization_id), Activity.created_at, after=after
+        )
+        query = query.offset(skip).limit(limit)
+
         result = await self.db.execute(query)
         return result.scalars().all() # type: ignore
 
-    async def count_deal_activities(self, deal_id: int, organization_id: int) -> int:
-        from app.models.deal import Deal
-
-        query = (
-            select(Activity)
-            .join(Deal, Activity.deal_id == Deal.id)
-            .where(and_(Activity.deal_id == deal_id, Deal.organization_id == organization_id))
+    async def get_deal_activities_with_total(
+        self, deal_id: int, organization_id: int, skip: int = 0, limit: int = 100
+    ) -> tuple[list[Activity], int]:
+        query = self._order_by_keyset(
+            self._deal_activities_query(deal_id, organization_id), Activity.created_at
         )
+        return await self._fetch_page_with_total(query, skip, limit)
 
-        result = await self.db.execute(query)
-        return len(result.scalars().all())
+    async def count_deal_activities(
+        self, deal_id: int, organization_id: int, cap: int | None = None
+    ) -> int:
+        query = self._deal_activities_query(deal_id, organization_id)
+        return await self._count(query, cap)
@@ -1,8 +1,21 @@
+from collections.abc import Iterable
 from typing import Any, Generic, TypeVar
 
-from sqlalchemy import delete, select, update
+from sqlalchemy import (
+    ColumnElement,
+    Select,
+    and_,
+    delete,
+    func,
+    literal,
+    or_,
+    select,
+    tuple_,
+    update,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.data_version import bump_data_version, mark_recent_write
 from app.database.base import Base
 
 ModelType = TypeVar("ModelType", bound=Base)
@@ -21,6 +34,7 @@ class BaseRepository(Generic[ModelType]):
         db_obj = self.model(**obj_in)
         self.db.add(db_obj)
         await self.db.commit()
+        await self._mark_written()
         await self.db.refresh(db_obj)
         return db_obj
 
@@ -29,9 +43,98 @@ class BaseRepository(Generic[ModelType]):
             update(self.model).where(self.model.id == id).values(**obj_in).returning(self.model)
         )
         await self.db.commit()
+        await self._mark_written()
         return result.scalar_one_or_none()
 
     async def delete(self, id: Any) -> bool:
         result = await self.db.execute(delete(self.model).where(self.model.id == id))
         await self.db.commit()
+        await self._mark_written()
         return result.rowcount > 0  # type: ignore
+
+    async def _mark_written(self) -> None:
+        """
+        Обновляет версию данных организации текущего запроса (ее задает
+        get_organization_context), чтобы ETag-и ее списков перестали совпадать,
+        и отмечает запись пользователя, чтобы он не читал из отстающей реплики
+        """
+        organization_id = self.db.info.get("organization_id")
+        if organization_id is not None:
+            await bump_data_version(organization_id)
+        user_id = self.db.info.get("user_id")
+        if user_id is not None:
+            await mark_recent_write(user_id)
+
+    async def _get_values_by_ids(self, column: ColumnElement, ids: Iterable[int]) -> dict[int, Any]:
+        """
+        Значения одной колонки для набора id одним запросом: id -> value
+        """
+        ids = set(ids)
+        if not ids:
+            return {}
+
+        result = await self.db.execute(select(self.model.id, column).where(self.model.id.in_(ids)))
+        return dict(result.tuples().all())
+
+    def _order_by_keyset(
+        self,
+        query: Select,
+        column: ColumnElement,
+        descending: bool = True,
+        after: tuple | None = None,
+        nullable: bool = False,
+    ) -> Select:
+        """
+        Сортирует по (column, id) и при заданном курсоре after=(value, id)
+        оставляет только строки после него. NULL в column, как и в PostgreSQL
+        по умолчанию, считается больше любого значения, поэтому обычный
+        btree-индекс по (column, id) подходит для обоих направлений
+        """
+        pk = self.model.id
+
+        if after is not None:
+            value, last_id = after
+            if value is None:
+                after_null = and_(column.is_(None), pk < last_id if descending else pk > last_id)
+                query = query.where(or_(after_null, column.is_not(None)) if descending else after_null)
+            else:
+                key = tuple_(column, pk)
+                bound = tuple_(literal(value, column.type), literal(last_id, pk.type))
+                if descending:
+                    query = query.where(key < bound)
+                else:
+                    query = query.where(or_(key > bound, column.is_(None)) if nullable else key > bound)
+
+        if descending:
+            return query.order_by(column.desc(), pk.desc())
+        return query.order_by(column.asc(), pk.asc())
+
+    async def _count(self, query: Select, cap: int | None = None) -> int:
+        """
+        Считает строки запроса через SELECT count(*).
+        При заданном cap подсчет останавливается на cap + 1 строке
+        """
+        query = query.with_only_columns(self.model.id).order_by(None)
+        if cap is not None:
+            query = query.limit(cap + 1)
+
+        result = await self.db.execute(select(func.count()).select_from(query.subquery()))
+        return result.scalar_one()
+
+    async def _fetch_page_with_total(
+        self, query: Select, skip: int, limit: int
+    ) -> tuple[list[ModelType], int]:
+        """
+        Возвращает строки страницы и общее число строк одним запросом (count(*) OVER ()).
+        Для пустой страницы за пределами списка total считается отдельным запросом
+        """
+        result = await self.db.execute(
+            query.add_columns(func.count().over().label("total")).offset(skip).limit(limit)
+        )
+        rows = result.all()
+
+        if not rows:
+            total = await self._count(query) if skip else 0
+            return [], total
+
+        return [row[0] for row in rows], rows[0][1]
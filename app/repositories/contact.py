@@ -1,51 +1,123 @@
-from sqlalchemy import and_, select
+from collections.abc import Iterable
+
+from sqlalchemy import Select, and_, delete, exists, func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..models import Contact
+from ..models import Contact, Deal
 from .base import BaseRepository
 
 
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
 class ContactRepository(BaseRepository[Contact]):
     def __init__(self, db: AsyncSession):
         super().__init__(Contact, db)
 
-    async def get_organization_contacts(
-        self,
-        organization_id: int,
-        skip: int = 0,
-        limit: int = 100,
-        search: str | None = None,
-        owner_id: int | None = None,
-    ) -> list[Contact]:
+    def _organization_contacts_query(
+        self, organization_id: int, search: str | None = None, owner_id: int | None = None
+    ) -> Select:
         query = select(Contact).where(Contact.organization_id == organization_id)
 
         if search:
+            # Подстрочный поиск обслуживается GIN-индексами pg_trgm по name, email и phone
+            pattern = f"%{_escape_like(search)}%"
             query = query.where(
-                (Contact.name.ilike(f"%{search}%")) | (Contact.email.ilike(f"%{search}%"))
+                or_(
+                    Contact.name.ilike(pattern, escape="\\"),
+                    Contact.email.ilike(pattern, escape="\\"),
+                    Contact.phone.ilike(pattern, escape="\\"),
+                )
             )
 
         if owner_id:
             query = query.where(Contact.owner_id == owner_id)
 
+        return query
+
+    def _apply_order(
+        self, query: Select, search: str | None = None, after: tuple | None = None
+    ) -> Select:
+        """
+        Результаты поиска сортируются по релевантности (word_similarity из pg_trgm),
+        остальные списки - по (created_at, id) с поддержкой курсора
+        """
+        if not search:
+            return self._order_by_keyset(query, Contact.created_at, after=after)
+
+        relevance = func.greatest(
+            func.word_similarity(search, Contact.name),
+            func.word_similarity(search, Contact.email),
+            func.word_similarity(search, Contact.phone),
+        )
+        return query.order_by(relevance.desc(), Contact.id.desc())
+
+    async def get_organization_contacts(
+        self,
+        organization_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        search: str | None = None,
+        owner_id: int | None = None,
+        after: tuple | None = None,
+    ) -> list[Contact]:
+        query = self._organization_contacts_query(organization_id, search, owner_id)
+        query = self._apply_order(query, search, after)
+
         query = query.offset(skip).limit(limit)
         result = await self.db.execute(query)
         return result.scalars().all()  # type: ignore
 
+    async def get_organization_contacts_with_total(
+        self,
+        organization_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        search: str | None = None,
+        owner_id: int | None = None,
+    ) -> tuple[list[Contact], int]:
+        query = self._organization_contacts_query(organization_id, search, owner_id)
+        query = self._apply_order(query, search)
+        return await self._fetch_page_with_total(query, skip, limit)
+
     async def count_organization_contacts(
-        self, organization_id: int, search: str | None = None, owner_id: int | None = None
+        self,
+        organization_id: int,
+        search: str | None = None,
+        owner_id: int | None = None,
+        cap: int | None = None,
     ) -> int:
-        query = select(Contact).where(Contact.organization_id == organization_id)
+        query = self._organization_contacts_query(organization_id, search, owner_id)
+        return await self._count(query, cap)
 
-        if search:
-            query = query.where(
-                (Contact.name.ilike(f"%{search}%")) | (Contact.email.ilike(f"%{search}%"))
-            )
+    async def get_organization_contact_keys(self, organization_id: int, limit: int) -> list:
+        """
+        Поля контактов, нужные префиксному индексу: (id, name, email, owner_id)
+        """
+        result = await self.db.execute(
+            select(Contact.id, Contact.name, Contact.email, Contact.owner_id)
+            .where(Contact.organization_id == organization_id)
+            .limit(limit)
+        )
+        return result.all()  # type: ignore
 
+    async def search_by_prefix(
+        self, organization_id: int, prefix: str, limit: int, owner_id: int | None = None
+    ) -> list[Contact]:
+        pattern = f"{_escape_like(prefix)}%"
+        query = select(Contact).where(
+            Contact.organization_id == organization_id,
+            or_(
+                Contact.name.ilike(pattern, escape="\\"),
+                Contact.email.ilike(pattern, escape="\\"),
+            ),
+        )
         if owner_id:
             query = query.where(Contact.owner_id == owner_id)
 
-        result = await self.db.execute(query)
-        return len(result.scalars().all())
+        result = await self.db.execute(query.order_by(Contact.name, Contact.id).limit(limit))
+        return result.scalars().all()  # type: ignore
 
     async def get_contact_with_organization(
         self, contact_id: int, organization_id: int
@@ -56,3 +128,36 @@ class ContactRepository(BaseRepository[Contact]):
             )
         )
         return result.scalar_one_or_none()
+
+    async def get_deletion_candidates(
+        self, contact_ids: list[int], organization_id: int
+    ) -> dict[int, bool]:
+        """
+        Одним запросом: контакты организации из contact_ids -> есть ли у контакта сделки.
+        Отсутствующих в ответе контактов нет в организации
+        """
+        # Тот же предикат, что в DealRepository.contact_has_deals
+        has_deals = (
+            exists()
+            .where(Deal.contact_id == Contact.id, Deal.organization_id == organization_id)
+            .correlate(Contact)
+        )
+        result = await self.db.execute(
+            select(Contact.id, has_deals).where(
+                Contact.id.in_(contact_ids), Contact.organization_id == organization_id
+            )
+        )
+        return dict(result.tuples().all())
+
+    async def delete_many(self, contact_ids: list[int], organization_id: int) -> int:
+        result = await self.db.execute(
+            delete(Contact).where(
+                Contact.id.in_(contact_ids), Contact.organization_id == organization_id
+            )
+        )
+        await self.db.commit()
+        await self._mark_written()
+        return result.rowcount  # type: ignore
+
+    async def get_names_by_ids(self, ids: Iterable[int]) -> dict[int, str]:
+        return await self._get_values_by_ids(Contact.name, ids)
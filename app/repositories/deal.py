@@ -1,27 +1,86 @@
-from sqlalchemy import and_, select
+from collections.abc import Iterable
+from typing import Any
+
+from sqlalchemy import Select, and_, delete, exists, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.data_version import bump_analytics_generation
+
 from ..models import Deal
 from .base import BaseRepository
+from .deal_rollup import ROLLUP_COLUMNS, DealRollupRepository
 
 
 class DealRepository(BaseRepository[Deal]):
     def __init__(self, db: AsyncSession):
         super().__init__(Deal, db)
+        self.rollups = DealRollupRepository(db)
 
-    async def get_organization_deals(
+    # Запись сделки и приращение агрегатов deal_rollups - одна транзакция
+
+    async def create(self, obj_in: dict) -> Deal:
+        deal = Deal(**obj_in)
+        self.db.add(deal)
+        # created_at (server_default) приходит в том же INSERT ... RETURNING, что и id
+        await self.db.flush()
+        await self.rollups.apply_deal_change(
+            None, {column.key: getattr(deal, column.key) for column in ROLLUP_COLUMNS}
+        )
+        await self.db.commit()
+        await self._mark_written()
+        await self.db.refresh(deal)
+        return deal
+
+    async def update(self, id: Any, obj_in: dict) -> Deal | None:
+        old = None
+        if any(column.key in obj_in for column in ROLLUP_COLUMNS):
+            result = await self.db.execute(
+                select(*ROLLUP_COLUMNS).where(Deal.id == id).with_for_update()
+            )
+            old = result.mappings().first()
+
+        result = await self.db.execute(
+            update(Deal)
+            .where(Deal.id == id)
+            .values(**obj_in)
+            .returning(Deal)
+            .execution_options(populate_existing=True)
+        )
+        deal = result.scalar_one_or_none()
+        if old is not None and deal is not None:
+            await self.rollups.apply_deal_change(
+                old, {column.key: getattr(deal, column.key) for column in ROLLUP_COLUMNS}
+            )
+        await self.db.commit()
+        await self._mark_written()
+        return deal
+
+    async def delete(self, id: Any) -> bool:
+        result = await self.db.execute(delete(Deal).where(Deal.id == id).returning(*ROLLUP_COLUMNS))
+        old = result.mappings().first()
+        if old is not None:
+            await self.rollups.apply_deal_change(old, None)
+        await self.db.commit()
+        await self._mark_written()
+        return old is not None
+
+    async def _mark_written(self) -> None:
+        # Сводки аналитики считаются по сделкам. Поколение их кэша сменяется раньше
+        # версии данных, чтобы под новым ETag не отдавалась сводка из старого кэша
+        organization_id = self.db.info.get("organization_id")
+        if organization_id is not None:
+            await bump_analytics_generation(organization_id)
+        await super()._mark_written()
+
+    def _organization_deals_query(
         self,
         organization_id: int,
-        skip: int = 0,
-        limit: int = 100,
         status: list[str] | None = None,
         stage: str | None = None,
         min_amount: float | None = None,
         max_amount: float | None = None,
         owner_id: int | None = None,
-        order_by: str = "created_at",
-        order: str = "desc",
-    ) -> list[Deal]:
+    ) -> Select:
         query = select(Deal).where(Deal.organization_id == organization_id)
 
         if status:
@@ -39,21 +98,59 @@ class DealRepository(BaseRepository[Deal]):
         if owner_id:
             query = query.where(Deal.owner_id == owner_id)
 
+        return query
+
+    def _apply_order(
+        self, query: Select, order_by: str, order: str, after: tuple | None = None
+    ) -> Select:
         if order_by == "amount":
-            if order == "asc":
-                query = query.order_by(Deal.amount.asc())
-            else:
-                query = query.order_by(Deal.amount.desc())
-        else:
-            if order == "asc":
-                query = query.order_by(Deal.created_at.asc())
-            else:
-                query = query.order_by(Deal.created_at.desc())
+            return self._order_by_keyset(
+                query, Deal.amount, order != "asc", after, nullable=True
+            )
+        return self._order_by_keyset(query, Deal.created_at, order != "asc", after)
+
+    async def get_organization_deals(
+        self,
+        organization_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        status: list[str] | None = None,
+        stage: str | None = None,
+        min_amount: float | None = None,
+        max_amount: float | None = None,
+        owner_id: int | None = None,
+        order_by: str = "created_at",
+        order: str = "desc",
+        after: tuple | None = None,
+    ) -> list[Deal]:
+        query = self._organization_deals_query(
+            organization_id, status, stage, min_amount, max_amount, owner_id
+        )
+        query = self._apply_order(query, order_by, order, after)
 
         query = query.offset(skip).limit(limit)
         result = await self.db.execute(query)
         return result.scalars().all()  # type: ignore
 
+    async def get_organization_deals_with_total(
+        self,
+        organization_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        status: list[str] | None = None,
+        stage: str | None = None,
+        min_amount: float | None = None,
+        max_amount: float | None = None,
+        owner_id: int | None = None,
+        order_by: str = "created_at",
+        order: str = "desc",
+    ) -> tuple[list[Deal], int]:
+        query = self._organization_deals_query(
+            organization_id, status, stage, min_amount, max_amount, owner_id
+        )
+        query = self._apply_order(query, order_by, order)
+        return await self._fetch_page_with_total(query, skip, limit)
+
     async def count_organization_deals(
         self,
         organization_id: int,
@@ -62,29 +159,29 @@ class DealRepository(BaseRepository[Deal]):
         min_amount: float | None = None,
         max_amount: float | None = None,
         owner_id: int | None = None,
+        cap: int | None = None,
     ) -> int:
-        query = select(Deal).where(Deal.organization_id == organization_id)
-
-        if status:
-            query = query.where(Deal.status.in_(status))
-
-        if stage:
-            query = query.where(Deal.stage == stage)
-
-        if min_amount is not None:
-            query = query.where(Deal.amount >= min_amount)
-
-        if max_amount is not None:
-            query = query.where(Deal.amount <= max_amount)
-
-        if owner_id:
-            query = query.where(Deal.owner_id == owner_id)
-
-        result = await self.db.execute(query)
-        return len(result.scalars().all())
+        query = self._organization_deals_query(
+            organization_id, status, stage, min_amount, max_amount, owner_id
+        )
+        return await self._count(query, cap)
 
     async def get_deal_with_organization(self, deal_id: int, organization_id: int) -> Deal | None:
         result = await self.db.execute(
             select(Deal).where(and_(Deal.id == deal_id, Deal.organization_id == organization_id))
         )
         return result.scalar_one_or_none()
+
+    async def contact_has_deals(self, contact_id: int, organization_id: int) -> bool:
+        # EXISTS останавливается на первой строке индекса ix_deals_contact_id
+        result = await self.db.execute(
+            select(
+                exists().where(
+                    Deal.contact_id == contact_id, Deal.organization_id == organization_id
+                )
+            )
+        )
+        return result.scalar_one()
+
+    async def get_titles_by_ids(self, ids: Iterable[int]) -> dict[int, str]:
+        return await self._get_values_by_ids(Deal.title, ids)
@@ -0,0 +1,269 @@
+from collections.abc import Mapping
+from datetime import UTC, date, datetime
+from decimal import Decimal
+from typing import Any
+
+from sqlalchemy import (
+    ColumnElement,
+    Date,
+    Row,
+    Select,
+    String,
+    cast,
+    delete,
+    func,
+    insert,
+    literal_column,
+    select,
+    text,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import Deal, DealDailyRollup, DealRollup
+from .base import BaseRepository
+
+# Колонки сделки, от которых зависят агрегаты
+ROLLUP_COLUMNS = (
+    Deal.organization_id,
+    Deal.stage,
+    Deal.status,
+    Deal.currency,
+    Deal.amount,
+    Deal.created_at,
+)
+
+KEY_FIELDS = ("organization_id", "stage", "status", "currency")
+VALUE_FIELDS = ("deal_count", "amount_sum", "positive_amount_count", "positive_amount_sum")
+DAILY_KEY_FIELDS = ("organization_id", "day")
+DAILY_VALUE_FIELDS = ("new_deal_count",)
+
+
+def _rollup_key(deal: Mapping[str, Any]) -> tuple:
+    return (
+        deal["organization_id"],
+        deal["stage"] or "",
+        deal["status"] or "",
+        deal["currency"] or "",
+    )
+
+
+def _rollup_values(deal: Mapping[str, Any], sign: int) -> tuple:
+    amount = deal["amount"] or Decimal("0")
+    positive = amount > 0
+    return (sign, sign * amount, sign * int(positive), sign * amount if positive else Decimal("0"))
+
+
+def utc_day(value: datetime) -> date:
+    return value.astimezone(UTC).date() if value.tzinfo else value.date()
+
+
+class DealRollupRepository(BaseRepository[DealRollup]):
+    def __init__(self, db: AsyncSession):
+        super().__init__(DealRollup, db)
+
+    async def apply_deal_change(
+        self, old: Mapping[str, Any] | None, new: Mapping[str, Any] | None
+    ) -> None:
+        """
+        Переносит сделку из агрегатов со значениями old в агрегаты new
+        (создание - old=None, удаление - new=None). Не коммитит: вызывается
+        в транзакции, в которой записывается сама сделка
+        """
+        deltas: dict[tuple, list] = {}
+        daily_deltas: dict[tuple, list] = {}
+        for deal, sign in ((old, -1), (new, 1)):
+            if deal is None:
+                continue
+            values = deltas.setdefault(_rollup_key(deal), [0, Decimal("0"), 0, Decimal("0")])
+            for i, value in enumerate(_rollup_values(deal, sign)):
+                values[i] += value
+
+            if deal["status"] == "new" and deal["created_at"] is not None:
+                key = (deal["organization_id"], utc_day(deal["created_at"]))
+                daily_deltas.setdefault(key, [0])[0] += sign
+
+        await self._upsert_deltas(DealRollup, KEY_FIELDS, VALUE_FIELDS, deltas)
+        await self._upsert_deltas(
+            DealDailyRollup, DAILY_KEY_FIELDS, DAILY_VALUE_FIELDS, daily_deltas
+        )
+
+    async def _upsert_deltas(
+        self,
+        model: Any,
+        key_fields: tuple[str, ...],
+        value_fields: tuple[str, ...],
+        deltas: dict[tuple, list],
+    ) -> None:
+        # Строки блокируются в порядке ключей: одновременные записи сделок
+        # одной организации не взаимоблокируются
+        rows = [
+            dict(zip(key_fields + value_fields, (*key, *values), strict=True))
+            for key, values in sorted(deltas.items())
+            if any(values)
+        ]
+        if not rows:
+            return
+
+        statement = pg_insert(model).values(rows)
+        await self.db.execute(
+            statement.on_conflict_do_update(
+                index_elements=list(key_fields),
+                set_={
+                    field: getattr(model, field) + getattr(statement.excluded, field)
+                    for field in value_fields
+                },
+            )
+        )
+
+    async def get_status_totals(self, organization_id: int) -> list[Row]:
+        """
+        (status, count, amount_sum, positive_amount_count, positive_amount_sum) по статусам
+        """
+        result = await self.db.execute(
+            select(
+                DealRollup.status,
+                func.sum(DealRollup.deal_count),
+                func.sum(DealRollup.amount_sum),
+                func.sum(DealRollup.positive_amount_count),
+                func.sum(DealRollup.positive_amount_sum),
+            )
+            .where(DealRollup.organization_id == organization_id)
+            .group_by(DealRollup.status)
+            .having(func.sum(DealRollup.deal_count) > 0)
+        )
+        return list(result.all())
+
+    async def get_stage_status_counts(self, organization_id: int) -> list[Row]:
+        """
+        (stage, status, count) по стадиям и статусам
+        """
+        result = await self.db.execute(
+            select(DealRollup.stage, DealRollup.status, func.sum(DealRollup.deal_count))
+            .where(DealRollup.organization_id == organization_id)
+            .group_by(DealRollup.stage, DealRollup.status)
+            .having(func.sum(DealRollup.deal_count) > 0)
+        )
+        return list(result.all())
+
+    async def get_new_deal_histogram(self, organization_id: int, since: date) -> dict[date, int]:
+        """
+        Число сделок в статусе new по дням создания начиная с since: day -> count
+        """
+        result = await self.db.execute(
+            select(DealDailyRollup.day, DealDailyRollup.new_deal_count).where(
+                DealDailyRollup.organization_id == organization_id,
+                DealDailyRollup.day >= since,
+                DealDailyRollup.new_deal_count > 0,
+            )
+        )
+        return dict(result.tuples().all())
+
+    async def rebuild(self, organization_id: int | None = None, commit: bool = True) -> list[dict]:
+        """
+        Пересчитывает агрегаты по таблице deals (для организации или для всех)
+        и возвращает расхождения с сохраненными значениями. С commit=False
+        только сообщает о расхождениях, ничего не меняя
+        """
+        # Записи сделок ждут окончания пересчета на обновлении агрегатов, а пересчет
+        # начинается после коммита уже начатых записей: приращения не теряются
+        await self.db.execute(
+            text("LOCK TABLE deal_rollups, deal_daily_rollups IN SHARE ROW EXCLUSIVE MODE")
+        )
+
+        # Константы литералами, а не параметрами: иначе выражения в SELECT
+        # и GROUP BY не совпадут
+        empty_string: ColumnElement[str] = literal_column("''")
+        key_columns = (
+            Deal.organization_id,
+            func.coalesce(cast(Deal.stage, String), empty_string),
+            func.coalesce(cast(Deal.status, String), empty_string),
+            func.coalesce(Deal.currency, empty_string),
+        )
+        expected_query = select(
+            *key_columns,
+            func.count(Deal.id),
+            func.coalesce(func.sum(Deal.amount), Decimal("0")),
+            func.count(Deal.id).filter(Deal.amount > 0),
+            func.coalesce(func.sum(Deal.amount).filter(Deal.amount > 0), Decimal("0")),
+        ).group_by(*key_columns)
+
+        day = cast(func.timezone(literal_column("'UTC'"), Deal.created_at), Date)
+        expected_daily_query = (
+            select(Deal.organization_id, day, func.count(Deal.id))
+            .where(Deal.status == "new", Deal.created_at.is_not(None))
+            .group_by(Deal.organization_id, day)
+        )
+        if organization_id is not None:
+            expected_query = expected_query.where(Deal.organization_id == organization_id)
+            expected_daily_query = expected_daily_query.where(
+                Deal.organization_id == organization_id
+            )
+
+        drift = await self._rebuild_table(
+            DealRollup, KEY_FIELDS, VALUE_FIELDS, expected_query, organization_id, commit
+        )
+        drift += await self._rebuild_table(
+            DealDailyRollup,
+            DAILY_KEY_FIELDS,
+            DAILY_VALUE_FIELDS,
+            expected_daily_query,
+            organization_id,
+            commit,
+        )
+
+        if commit:
+            await self.db.commit()
+        else:
+            await self.db.rollback()
+        return drift
+
+    async def _rebuild_table(
+        self,
+        model: Any,
+        key_fields: tuple[str, ...],
+        value_fields: tuple[str, ...],
+        expected_query: Select,
+        organization_id: int | None,
+        replace: bool,
+    ) -> list[dict]:
+        key_size = len(key_fields)
+        actual_query = select(*(getattr(model, field) for field in key_fields + value_fields))
+        if organization_id is not None:
+            actual_query = actual_query.where(model.organization_id == organization_id)
+
+        expected = {
+            tuple(row[:key_size]): tuple(row[key_size:])
+            for row in await self.db.execute(expected_query)
+        }
+        actual = {
+            tuple(row[:key_size]): tuple(row[key_size:])
+            for row in await self.db.execute(actual_query)
+        }
+
+        empty = (0,) * len(value_fields)
+        drift = [
+            {
+                "table": model.__tablename__,
+                **dict(zip(key_fields, key, strict=True)),
+                "expected": dict(zip(value_fields, expected.get(key, empty), strict=True)),
+                "actual": dict(zip(value_fields, actual.get(key, empty), strict=True)),
+            }
+            for key in sorted(expected.keys() | actual.keys())
+            if expected.get(key, empty) != actual.get(key, empty)
+        ]
+
+        if replace:
+            delete_query = delete(model)
+            if organization_id is not None:
+                delete_query = delete_query.where(model.organization_id == organization_id)
+            await self.db.execute(delete_query)
+            if expected:
+                await self.db.execute(
+                    insert(model),
+                    [
+                        dict(zip(key_fields + value_fields, (*key, *values), strict=True))
+                        for key, values in expected.items()
+                    ],
+                )
+        return drift
@@ -25,10 +25,13 @@ class OrganizationMemberRepository(BaseRepository[OrganizationMember]):
         )
         return result.scalar_one_or_none()
 
-    async def get_user_organizations(self, user_id: int) -> list[Organization]:
+    async def get_user_organizations_with_roles(
+        self, user_id: int
+    ) -> list[tuple[Organization, str]]:
         result = await self.db.execute(
-            select(Organization)
+            select(Organization, OrganizationMember.role)
             .join(OrganizationMember, OrganizationMember.organization_id == Organization.id)
             .where(OrganizationMember.user_id == user_id)
+            .order_by(Organization.id)
         )
-        return result.scalars().all() # type: ignore
+        return result.tuples().all()  # type: ignore
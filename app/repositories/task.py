@@ -1,6 +1,6 @@
 from typing import Optional
 
-from sqlalchemy import select
+from sqlalchemy import Select, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..models import Task
@@ -11,22 +11,20 @@ class TaskRepository(BaseRepository[Task]):
     def __init__(self, db: AsyncSession):
         super().__init__(Task, db)
 
-    async def get_organization_tasks(
+    def _organization_tasks_query(
         self,
         organization_id: int,
-        skip: int = 0,
-        limit: int = 100,
         deal_id: int | None = None,
         only_open: bool = False,
-        due_before: Optional = None, # type: ignore
+        due_before: Optional = None,  # type: ignore
         due_after: Optional = None,  # type: ignore
-    ) -> list[Task]:
+    ) -> Select:
         from app.models.deal import Deal
 
         query = (
             select(Task)
             .join(Deal, Task.deal_id == Deal.id)
-            .where(Deal.organization_id == organization_id) # noqa E712
+            .where(Deal.organization_id == organization_id)
         )
 
         if deal_id:
@@ -41,10 +39,44 @@ class TaskRepository(BaseRepository[Task]):
         if due_after:
             query = query.where(Task.due_date >= due_after)
 
+        return query
+
+    async def get_organization_tasks(
+        self,
+        organization_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        deal_id: int | None = None,
+        only_open: bool = False,
+        due_before: Optional = None, # type: ignore
+        due_after: Optional = None,  # type: ignore
+        after: tuple | None = None,
+    ) -> list[Task]:
+        query = self._organization_tasks_query(
+            organization_id, deal_id, only_open, due_before, due_after
+        )
+        query = self._order_by_keyset(query, Task.created_at, after=after)
+
         query = query.offset(skip).limit(limit)
         result = await self.db.execute(query)
         return result.scalars().all()  # type: ignore
 
+    async def get_organization_tasks_with_total(
+        self,
+        organization_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        deal_id: int | None = None,
+        only_open: bool = False,
+        due_before: Optional = None,  # type: ignore
+        due_after: Optional = None,  # type: ignore
+    ) -> tuple[list[Task], int]:
+        query = self._organization_tasks_query(
+            organization_id, deal_id, only_open, due_before, due_after
+        )
+        query = self._order_by_keyset(query, Task.created_at)
+        return await self._fetch_page_with_total(query, skip, limit)
+
     async def count_organization_tasks(
         self,
         organization_id: int,
@@ -52,26 +84,9 @@ class TaskRepository(BaseRepository[Task]):
         only_open: bool = False,
         due_before: Optional = None,  # type: ignore
         due_after: Optional = None,  # type: ignore
+        cap: int | None = None,
     ) -> int:
-        from app.models.deal import Deal
-
-        query = (
-            select(Task)
-            .join(Deal, Task.deal_id == Deal.id)
-            .where(Deal.organization_id == organization_id)
+        query = self._organization_tasks_query(
+            organization_id, deal_id, only_open, due_before, due_after
         )
-
-        if deal_id:
-            query = query.where(Task.deal_id == deal_id)
-
-        if only_open:
-            query = query.where(Task.is_done == False) # noqa E712
-
-        if due_before:
-            query = query.where(Task.due_date <= due_before)
-
-        if due_after:
-            query = query.where(Task.due_date >= due_after)
-
-        result = await self.db.execute(query)
-        return len(result.scalars().all())
+        return await self._count(query, cap)
@@ -1,7 +1,9 @@
-from sqlalchemy import select
+from collections.abc import Iterable
+
+from sqlalchemy import and_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..models import User
+from ..models import OrganizationMember, User
 from .base import BaseRepository
 
 
@@ -12,3 +14,25 @@ class UserRepository(BaseRepository[User]):
     async def get_by_email(self, email: str) -> User | None:
         result = await self.db.execute(select(User).where(User.email == email))
         return result.scalar_one_or_none()
+
+    async def get_with_membership_role(
+        self, user_id: int, organization_id: int
+    ) -> tuple[User | None, str | None]:
+        result = await self.db.execute(
+            select(User, OrganizationMember.role)
+            .outerjoin(
+                OrganizationMember,
+                and_(
+                    OrganizationMember.user_id == User.id,
+                    OrganizationMember.organization_id == organization_id,
+                ),
+            )
+            .where(User.id == user_id)
+        )
+        row = result.first()
+        if row is None:
+            return None, None
+        return row[0], row[1]
+
+    async def get_names_by_ids(self, ids: Iterable[int]) -> dict[int, str]:
+        return await self._get_values_by_ids(User.name, ids)
@@ -1,7 +1,14 @@
 from .activity import ActivityCreate, ActivityListResponse, ActivityResponse
 from .analytics import DealFunnelResponse, DealSummaryResponse
 from .auth import Token, UserLogin, UserRegister, UserResponse
-from .contact import ContactCreate, ContactListResponse, ContactResponse, ContactUpdate
+from .contact import (
+    ContactBulkDelete,
+    ContactCreate,
+    ContactListResponse,
+    ContactResponse,
+    ContactSuggestion,
+    ContactUpdate,
+)
 from .deal import DealCreate, DealListResponse, DealResponse, DealUpdate
 from .organization import OrganizationMemberResponse, OrganizationResponse
 from .task import TaskCreate, TaskListResponse, TaskResponse, TaskUpdate
@@ -14,9 +21,11 @@ __all__ = [
     "OrganizationResponse",
     "OrganizationMemberResponse",
     "ContactCreate",
+    "ContactBulkDelete",
     "ContactUpdate",
     "ContactResponse",
     "ContactListResponse",
+    "ContactSuggestion",
     "DealCreate",
     "DealUpdate",
     "DealResponse",
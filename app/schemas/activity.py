@@ -24,7 +24,9 @@ class ActivityResponse(ActivityBase):
 
 class ActivityListResponse(BaseModel):
     items: list[ActivityResponse]
-    total: int
+    total: int | None
+    total_capped: bool = False
     page: int
     page_size: int
-    total_pages: int
+    total_pages: int | None
+    next_cursor: str | None = None
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from pydantic import BaseModel, ConfigDict, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 
 
 class ContactBase(BaseModel):
@@ -27,9 +27,21 @@ class ContactResponse(ContactBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class ContactBulkDelete(BaseModel):
+    ids: list[int] = Field(..., min_length=1, max_length=1000)
+
+
+class ContactSuggestion(BaseModel):
+    id: int
+    name: str
+    email: str | None = None
+
+
 class ContactListResponse(BaseModel):
     items: list[ContactResponse]
-    total: int
+    total: int | None
+    total_capped: bool = False
     page: int
     page_size: int
-    total_pages: int
+    total_pages: int | None
+    next_cursor: str | None = None
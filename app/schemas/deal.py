@@ -41,7 +41,9 @@ class DealResponse(DealBase):
 
 class DealListResponse(BaseModel):
     items: list[DealResponse]
-    total: int
+    total: int | None
+    total_capped: bool = False
     page: int
     page_size: int
-    total_pages: int
+    total_pages: int | None
+    next_cursor: str | None = None
@@ -1,7 +1,7 @@
 from datetime import datetime
 from decimal import Decimal
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 class ContactCreateDTO(BaseModel):
@@ -28,3 +28,13 @@ class TaskCreateDTO(BaseModel):
     description: str | None = None
     due_date: datetime | None = None
     deal_id: int
+
+
+class CurrentUserDTO(BaseModel):
+    """Аутентифицированный пользователь: поля User, которые хранит кэш по токену"""
+
+    id: int
+    email: str
+    name: str
+
+    model_config = ConfigDict(from_attributes=True, frozen=True)
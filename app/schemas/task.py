@@ -32,7 +32,9 @@ class TaskResponse(TaskBase):
 
 class TaskListResponse(BaseModel):
     items: list[TaskResponse]
-    total: int
+    total: int | None
+    total_capped: bool = False
     page: int
     page_size: int
-    total_pages: int
+    total_pages: int | None
+    next_cursor: str | None = None
@@ -4,12 +4,18 @@ from app.core.exceptions import DealNotFoundException, ValidationException
 from app.repositories import ActivityRepository, DealRepository
 from app.schemas import ActivityResponse
 
+from .names import NameLoader
+from .pagination import build_page, decode_cursor, get_count_cap, make_next_cursor
+
+ACTIVITIES_SORT = "created_at:desc"
+
 
 class ActivityService:
     def __init__(self, db: AsyncSession):
         self.db = db
         self.activity_repo = ActivityRepository(db)
         self.deal_repo = DealRepository(db)
+        self.names = NameLoader(db)
 
     async def create_activity(
         self, deal_id: int, activity_data: dict, organization_id: int, author_id: int
@@ -29,6 +35,7 @@ class ActivityService:
         activity_data.update({"deal_id": deal_id, "author_id": author_id})
 
         activity = await self.activity_repo.create(activity_data)
+        author_names = await self.names.users([activity.author_id])
 
         return ActivityResponse(
             id=activity.id,
@@ -37,39 +44,69 @@ class ActivityService:
             type=activity.type,
             payload=activity.payload,
             created_at=activity.created_at,
-            author_name=f"User {activity.author_id}" if activity.author_id else "System",
+            author_name=self._author_name(activity.author_id, author_names),
         )
 
+    @staticmethod
+    def _author_name(author_id: int | None, author_names: dict[int, str]) -> str:
+        # Активности без автора создаются системой
+        if author_id is None:
+            return "System"
+        return author_names.get(author_id, "")
+
     async def get_deal_activities(
-        self, deal_id: int, organization_id: int, page: int = 1, page_size: int = 100
+        self,
+        deal_id: int,
+        organization_id: int,
+        page: int = 1,
+        page_size: int = 100,
+        count: str = "exact",
+        cursor: str | None = None,
     ) -> dict:
         deal = await self.deal_repo.get_deal_with_organization(deal_id, organization_id)
         if not deal:
             raise DealNotFoundException("Deal not found in organization")
 
-        skip = (page - 1) * page_size
-        activities = await self.activity_repo.get_deal_activities(
-            deal_id, organization_id, skip, page_size
-        )
-        total = await self.activity_repo.count_deal_activities(deal_id, organization_id)
+        after = decode_cursor(cursor, ACTIVITIES_SORT) if cursor else None
+        skip = 0 if after else (page - 1) * page_size
+        count_cap = get_count_cap(count)
+        total = None
 
-        activity_responses = [
-            ActivityResponse(
-                id=activity.id,
-                deal_id=activity.deal_id,
-                author_id=activity.author_id,
-                type=activity.type,
-                payload=activity.payload,
-                created_at=activity.created_at,
-                author_name=f"User {activity.author_id}" if activity.author_id else "System",
+        if count == "exact" and after is None:
+            # Страница и total одним запросом
+            activities, total = await self.activity_repo.get_deal_activities_with_total(
+                deal_id, organization_id, skip, page_size
             )
+        else:
+            activities = await self.activity_repo.get_deal_activities(
+                deal_id, organization_id, skip, page_size, after
+            )
+            if count != "none":
+                total = await self.activity_repo.count_deal_activities(
+                    deal_id, organization_id, cap=count_cap
+                )
+
+        author_names = await self.names.users(activity.author_id for activity in activities)
+
+        # Элементы страницы - dict: без валидации моделей, ответ сериализует orjson
+        activity_responses = [
+            {
+                "id": activity.id,
+                "deal_id": activity.deal_id,
+                "author_id": activity.author_id,
+                "type": activity.type,
+                "payload": activity.payload,
+                "created_at": activity.created_at,
+                "author_name": self._author_name(activity.author_id, author_names),
+            }
             for activity in activities
         ]
 
-        return {
-            "items": activity_responses,
-            "total": total,
-            "page": page,
-            "page_size": page_size,
-            "total_pages": (total + page_size - 1) // page_size,
-        }
+        return build_page(
+            activity_responses,
+            total,
+            page,
+            page_size,
+            count_cap,
+            make_next_cursor(activities, page_size, ACTIVITIES_SORT, "created_at"),
+        )
@@ -1,99 +1,101 @@
-import json
-from datetime import datetime, timedelta
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
 from decimal import Decimal
 
-from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.cache import cache_manager
-from app.models import Deal
+from app.core.config import settings
+from app.core.data_version import bump_analytics_generation, get_analytics_generation
+from app.repositories import DealRollupRepository
+
+from .caching import F, stale_while_revalidate
+
+# Наибольший период сводки (параметр days эндпоинта)
+MAX_SUMMARY_DAYS = 365
+
+
+async def _analytics_key(organization_id: int) -> str | None:
+    # Поколение в ключе сменяется при каждой записи сделок организации
+    # (см. DealRepository._mark_written). Без поколения (Redis недоступен)
+    # сводка считается по агрегатам без кэша: иначе записи других воркеров
+    # не сбросили бы ее
+    generation = await get_analytics_generation(organization_id)
+    if generation is None:
+        return None
+    return f"{organization_id}:{generation}"
+
+
+def _analytics_cache(namespace: str) -> Callable[[F], F]:
+    cache_manager.register_namespace(namespace, settings.ANALYTICS_CACHE_TTL_SECONDS)
+    return stale_while_revalidate(
+        namespace,
+        _analytics_key,
+        soft_ttl=settings.ANALYTICS_CACHE_SOFT_TTL_SECONDS,
+        lock_seconds=settings.ANALYTICS_CACHE_LOCK_SECONDS,
+        wait_seconds=settings.ANALYTICS_CACHE_WAIT_SECONDS,
+    )
 
 
 class AnalyticsService:
     def __init__(self, db: AsyncSession):
         self.db = db
+        self.rollup_repo = DealRollupRepository(db)
 
     async def get_deal_summary(self, organization_id: int, days: int = 30) -> dict:
         """
         Получает сводку по сделкам для организации с кэшированием
         """
-        # Проверяем кэш с учетом параметра days
-        cache_key = f"deal_summary:{organization_id}:{days}"
-        redis_client = await cache_manager.get_redis()
-        cached_result = await redis_client.get(cache_key)
-
-        if cached_result:
-            return json.loads(cached_result)
-
-        # Получаем количество сделок и сумму по статусам
-        result = await self.db.execute(
-            select(
-                Deal.status,
-                func.count(Deal.id).label("count"),
-                func.coalesce(func.sum(Deal.amount), Decimal("0")).label("total_amount"),
-            )
-            .where(Deal.organization_id == organization_id)
-            .group_by(Deal.status)
+        # Одна запись кэша на организацию для любого days: в ней дневная гистограмма
+        # новых сделок, окно считается суммой ее последних корзин
+        summary = await self._build_deal_summary(organization_id)
+
+        # Окно считается по дням UTC и включает весь день, в который оно начинается
+        since = (datetime.now(UTC) - timedelta(days=days)).date().isoformat()
+        new_deals_last_n_days = sum(
+            count for day, count in summary["new_deals_by_day"].items() if day >= since
         )
-        status_data = result.all()
 
+        return {
+            "status_counts": summary["status_counts"],
+            "amount_by_status": summary["amount_by_status"],
+            "average_won_amount": summary["average_won_amount"],
+            "new_deals_last_n_days": new_deals_last_n_days,
+            "days_period": days,
+        }
+
+    @_analytics_cache("deal_summary")
+    async def _build_deal_summary(self, organization_id: int) -> dict:
+        # Количества и суммы по статусам - из агрегатов deal_rollups: несколько строк
+        # на организацию независимо от числа сделок
         status_counts = {}
         amount_by_status = {}
+        avg_won_amount = Decimal("0")
 
-        for status, count, total_amount in status_data:
+        status_totals = await self.rollup_repo.get_status_totals(organization_id)
+        for status, count, total_amount, positive_count, positive_sum in status_totals:
             status_counts[status] = count
             amount_by_status[status] = total_amount
+            if status == "won" and positive_count:
+                avg_won_amount = positive_sum / positive_count
 
-        # Получаем среднюю сумму выигранных сделок
-        result = await self.db.execute(
-            select(func.avg(Deal.amount)).where(
-                Deal.organization_id == organization_id, Deal.status == "won", Deal.amount > 0
-            )
-        )
-        avg_won_amount = result.scalar() or Decimal("0")
-
-        # Получаем количество новых сделок за указанное количество дней
-        days_ago = datetime.utcnow() - timedelta(days=days)
-        result = await self.db.execute(
-            select(func.count(Deal.id)).where(
-                Deal.organization_id == organization_id,
-                Deal.created_at >= days_ago,
-                Deal.status == "new",
-            )
-        )
-        new_deals_last_n_days = result.scalar() or 0
+        since = (datetime.now(UTC) - timedelta(days=MAX_SUMMARY_DAYS)).date()
+        histogram = await self.rollup_repo.get_new_deal_histogram(organization_id, since)
 
-        result_data = {
+        return {
             "status_counts": status_counts,
             "amount_by_status": amount_by_status,
             "average_won_amount": float(avg_won_amount) if avg_won_amount else 0.0,
-            "new_deals_last_n_days": new_deals_last_n_days,
-            "days_period": days,
+            "new_deals_by_day": {day.isoformat(): count for day, count in histogram.items()},
         }
 
-        await redis_client.setex(cache_key, 300, json.dumps(result_data, default=str))
-
-        return result_data
-
+    @_analytics_cache("deal_funnel")
     async def get_deal_funnel(self, organization_id: int) -> dict:
         """
         Получает воронку продаж для организации с кэшированием
         """
-        # Проверяем кэш
-        cache_key = f"deal_funnel:{organization_id}"
-        redis_client = await cache_manager.get_redis()
-        cached_result = await redis_client.get(cache_key)
-
-        if cached_result:
-            return json.loads(cached_result)
-
-        # Получаем количество сделок по стадиям и статусам
-        result = await self.db.execute(
-            select(Deal.stage, Deal.status, func.count(Deal.id).label("count"))
-            .where(Deal.organization_id == organization_id)
-            .group_by(Deal.stage, Deal.status)
-        )
-        stage_data = result.all()
+        # Получаем количество сделок по стадиям и статусам из агрегатов deal_rollups
+        stage_data = await self.rollup_repo.get_stage_status_counts(organization_id)
 
         # Организуем данные по стадиям
         stages_order = ["qualification", "proposal", "negotiation", "closed"]
@@ -139,23 +141,11 @@ class AnalyticsService:
             (last_stage_count / first_stage_count * 100) if first_stage_count > 0 else 0.0
         )
 
-        result_data = {"stages": funnel_stages, "total_conversion": round(total_conversion, 2)}
-
-        await redis_client.setex(cache_key, 300, json.dumps(result_data, default=str))
-
-        return result_data
+        return {"stages": funnel_stages, "total_conversion": round(total_conversion, 2)}
 
     async def invalidate_analytics_cache(self, organization_id: int):
         """
-        Инвалидирует кэш аналитики для организации
+        Инвалидирует кэш аналитики для организации: сводки прежнего поколения
+        больше не читаются и истекают по TTL
         """
-        redis_client = await cache_manager.get_redis()
-
-        pattern = f"deal_summary:{organization_id}:*"
-        keys = await redis_client.keys(pattern)
-
-        if keys:
-            await redis_client.delete(*keys)
-
-        funnel_key = f"deal_funnel:{organization_id}"
-        await redis_client.delete(funnel_key)
+        await bump_analytics_generation(organization_id)
@@ -5,7 +5,7 @@ from jose import jwt
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.core.security import verify_password
+from app.core.security import verify_password_async
 from app.repositories.user import UserRepository
 
 logger = logging.getLogger(__name__)
@@ -32,6 +32,6 @@ class AuthService:
 
     async def authenticate_user(self, email: str, password: str):
         user = await self.user_repo.get_by_email(email)
-        if not user or not verify_password(password, user.hashed_password):
+        if not user or not await verify_password_async(password, user.hashed_password):
             return None
         return user
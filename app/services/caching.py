@@ -0,0 +1,208 @@
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from functools import wraps
+from typing import Any, TypeVar, cast
+
+import redis.asyncio as redis
+
+from app.core.cache import cache_manager
+from app.database.session import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Awaitable[Any]])
+
+# Интервал опроса Redis, пока значение считает другой воркер
+_POLL_SECONDS = 0.05
+
+
+class SingleFlight:
+    """
+    Пересчеты значений, выполняющиеся в этом процессе: key -> задача.
+    Одновременные вызовы с одним ключом ждут одну и ту же задачу
+    """
+
+    def __init__(self) -> None:
+        self._tasks: dict[str, asyncio.Future] = {}
+
+    def running(self, key: str) -> bool:
+        return key in self._tasks
+
+    async def run(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._tasks[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        # Отмена одного из ожидающих запросов не прерывает пересчет для остальных
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Future) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+
+
+single_flight = SingleFlight()
+
+# Фоновые обновления: ссылки держатся до завершения, иначе задачу может собрать GC
+_background_tasks: set[asyncio.Task] = set()
+
+
+def _entry(value: Any, soft_ttl: float) -> dict:
+    return {"value": value, "refresh_at": time.time() + soft_ttl}
+
+
+async def _store(namespace: str, cache_key: str, value: Any, soft_ttl: float) -> None:
+    # Значение уже посчитано: ошибка записи в кэш не должна его потерять
+    try:
+        await cache_manager.set(namespace, cache_key, _entry(value, soft_ttl))
+    except redis.RedisError:
+        logger.warning("Redis is unavailable, cache key %s:%s is not stored", namespace, cache_key)
+
+
+async def _load(
+    namespace: str,
+    cache_key: str,
+    compute: Callable[[], Awaitable[Any]],
+    soft_ttl: float,
+    lock_seconds: int,
+    wait_seconds: float,
+) -> Any:
+    """
+    Пересчитывает значение под блокировкой в Redis: среди всех воркеров значение
+    считает один, остальные ждут его результат до wait_seconds. wait_seconds=0 -
+    не ждать (фоновое обновление, которое уже выполняет другой воркер).
+    Если Redis недоступен, значение считается без блокировки и кэша
+    """
+    backend = await cache_manager.get_backend()
+    redis_key = cache_manager.redis_key(namespace, cache_key)
+    token = uuid.uuid4().hex
+    lock_key = f"lock:{redis_key}"
+
+    try:
+        locked = await backend.set(lock_key, token, ex=lock_seconds, nx=True)
+    except redis.RedisError:
+        logger.warning("Redis is unavailable, cache key %s is computed without cache", redis_key)
+        return await compute()
+
+    if not locked:
+        if wait_seconds <= 0:
+            return None
+
+        deadline = time.monotonic() + wait_seconds
+        try:
+            while time.monotonic() < deadline:
+                await asyncio.sleep(_POLL_SECONDS)
+                # Опрашивается только Redis: локальная копия здесь заведомо отсутствует
+                cached = await backend.get(redis_key)
+                if cached:
+                    return json.loads(cached)["value"]
+        except redis.RedisError:
+            logger.warning(
+                "Redis is unavailable, cache key %s is computed without cache", redis_key
+            )
+            return await compute()
+
+        # Владелец блокировки не уложился в ожидание: считаем сами, не дожидаясь его
+        logger.warning("Cache key %s is still being computed, computing locally", redis_key)
+        value = await compute()
+        await _store(namespace, cache_key, value, soft_ttl)
+        return value
+
+    try:
+        value = await compute()
+        await _store(namespace, cache_key, value, soft_ttl)
+        return value
+    finally:
+        try:
+            await backend.release_lock(lock_key, token)
+        except redis.RedisError:
+            logger.warning("Redis is unavailable, lock %s expires by its TTL", lock_key)
+
+
+def stale_while_revalidate(
+    namespace: str,
+    key: Callable[..., Awaitable[str | None]],
+    soft_ttl: float,
+    lock_seconds: int = 10,
+    wait_seconds: float = 5.0,
+) -> Callable[[F], F]:
+    """
+    Кэширует результат метода сервиса в cache_manager (память воркера и Redis)
+    с защитой от одновременных пересчетов.
+
+    key(*args, **kwargs) строит ключ записи в пространстве имен namespace
+    (None - не кэшировать этот вызов); TTL записи - TTL пространства имен
+    (cache_manager.register_namespace). После soft_ttl запись отдается как есть,
+    а обновляется в фоне одним запросом: в процессе - через SingleFlight, между
+    воркерами - через блокировку в Redis.
+    При промахе одновременные запросы ждут один пересчет. Пересчет (и при
+    промахе, и в фоне) выполняется в собственной сессии основной БД: он общий
+    для нескольких запросов и не должен зависеть от сессии запроса, который
+    его начал. Поэтому сервис должен создаваться как ClassName(db).
+    Если Redis недоступен при чтении записи, метод выполняется без кэша в сессии
+    вызывающего; если Redis отказывает при пересчете, значение считается без
+    блокировки и не кэшируется (см. _load). Ошибки Redis до открытия размыкателя
+    (CircuitBreakerBackend) до вызывающего не доходят
+    """
+
+    def decorator(func: F) -> F:
+        async def compute(service_class: type, args: tuple, kwargs: dict) -> Any:
+            async with AsyncSessionLocal() as session:
+                return await func(service_class(session), *args, **kwargs)
+
+        async def refresh(service_class: type, cache_key: str, args: tuple, kwargs: dict) -> None:
+            try:
+                await _load(
+                    namespace,
+                    cache_key,
+                    lambda: compute(service_class, args, kwargs),
+                    soft_ttl,
+                    lock_seconds,
+                    wait_seconds=0,
+                )
+            except Exception:
+                logger.exception("Background refresh of cache key %s failed", cache_key)
+
+        @wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            cache_key = await key(*args, **kwargs)
+            if cache_key is None:
+                return await func(self, *args, **kwargs)
+            flight_key = cache_manager.redis_key(namespace, cache_key)
+            try:
+                entry = await cache_manager.get(namespace, cache_key)
+            except redis.RedisError:
+                logger.warning("Redis is unavailable, cache key %s is not used", flight_key)
+                return await func(self, *args, **kwargs)
+
+            if entry is not None:
+                if time.time() >= entry["refresh_at"] and not single_flight.running(flight_key):
+                    task = asyncio.create_task(
+                        single_flight.run(
+                            flight_key, lambda: refresh(type(self), cache_key, args, kwargs)
+                        )
+                    )
+                    _background_tasks.add(task)
+                    task.add_done_callback(_background_tasks.discard)
+                return entry["value"]
+
+            return await single_flight.run(
+                flight_key,
+                lambda: _load(
+                    namespace,
+                    cache_key,
+                    lambda: compute(type(self), args, kwargs),
+                    soft_ttl,
+                    lock_seconds,
+                    wait_seconds,
+                ),
+            )
+
+        return cast(F, wrapper)
+
+    return decorator
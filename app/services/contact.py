@@ -4,21 +4,36 @@ from app.core.exceptions import (
     ContactHasActiveDealsException,
     ContactNotFoundException,
     PermissionDeniedException,
+    ValidationException,
 )
+from app.database.session import AsyncSessionLocal
 from app.repositories import ContactRepository, DealRepository
-from app.schemas import ContactResponse
+from app.schemas import ContactResponse, ContactSuggestion
 from app.schemas.dto import ContactCreateDTO
 
+from .contact_index import ContactEntry, contact_prefix_index
+from .names import NameLoader
+from .pagination import build_page, decode_cursor, get_count_cap, make_next_cursor
+
+CONTACTS_SORT = "created_at:desc"
+
 
 class ContactService:
     def __init__(self, db: AsyncSession):
         self.db = db
         self.contact_repo = ContactRepository(db)
         self.deal_repo = DealRepository(db)
+        self.names = NameLoader(db)
 
     async def create_contact(self, contact_dto: ContactCreateDTO) -> ContactResponse:
         contact_data = contact_dto.model_dump()
         contact = await self.contact_repo.create(contact_data)
+        contact_prefix_index.add(
+            contact.organization_id,
+            ContactEntry(contact.id, contact.name, contact.email, contact.owner_id),
+        )
+
+        owner_names = await self.names.users([contact.owner_id])
 
         return ContactResponse(
             id=contact.id,
@@ -28,7 +43,7 @@ class ContactService:
             email=contact.email,
             phone=contact.phone,
             created_at=contact.created_at,
-            owner_name=f"User {contact.owner_id}",
+            owner_name=owner_names.get(contact.owner_id, ""),
         )
 
     async def get_contacts(
@@ -40,6 +55,8 @@ class ContactService:
         owner_id: int | None = None,
         current_user_id: int = None,
         user_role: str = None,
+        count: str = "exact",
+        cursor: str | None = None,
     ) -> dict:
         if owner_id and owner_id != current_user_id:
             if user_role == "member":
@@ -48,51 +65,134 @@ class ContactService:
         if user_role == "member" and owner_id is None:
             owner_id = current_user_id
 
-        skip = (page - 1) * page_size
-
-        contacts = await self.contact_repo.get_organization_contacts(
-            organization_id=organization_id,
-            skip=skip,
-            limit=page_size,
-            search=search,
-            owner_id=owner_id,
-        )
+        # Результаты поиска упорядочены по релевантности, курсор по created_at к ним неприменим
+        if search and cursor:
+            raise ValidationException("Cursor pagination is not supported with search")
+
+        after = decode_cursor(cursor, CONTACTS_SORT) if cursor else None
+        skip = 0 if after else (page - 1) * page_size
+        count_cap = get_count_cap(count)
+        total = None
+
+        if count == "exact" and after is None:
+            # Страница и total одним запросом
+            contacts, total = await self.contact_repo.get_organization_contacts_with_total(
+                organization_id=organization_id,
+                skip=skip,
+                limit=page_size,
+                search=search,
+                owner_id=owner_id,
+            )
+        else:
+            contacts = await self.contact_repo.get_organization_contacts(
+                organization_id=organization_id,
+                skip=skip,
+                limit=page_size,
+                search=search,
+                owner_id=owner_id,
+                after=after,
+            )
+            if count != "none":
+                total = await self.contact_repo.count_organization_contacts(
+                    organization_id, search, owner_id, cap=count_cap
+                )
 
-        total = await self.contact_repo.count_organization_contacts(
-            organization_id, search, owner_id
-        )
+        owner_names = await self.names.users(contact.owner_id for contact in contacts)
 
+        # Элементы страницы - dict: без валидации моделей, ответ сериализует orjson
         contact_responses = [
-            ContactResponse(
-                id=contact.id,
-                organization_id=contact.organization_id,
-                owner_id=contact.owner_id,
-                name=contact.name,
-                email=contact.email,
-                phone=contact.phone,
-                created_at=contact.created_at,
-                owner_name=f"User {contact.owner_id}",
-            )
+            {
+                "id": contact.id,
+                "organization_id": contact.organization_id,
+                "owner_id": contact.owner_id,
+                "name": contact.name,
+                "email": contact.email,
+                "phone": contact.phone,
+                "created_at": contact.created_at,
+                "owner_name": owner_names.get(contact.owner_id, ""),
+            }
             for contact in contacts
         ]
 
-        return {
-            "items": contact_responses,
-            "total": total,
-            "page": page,
-            "page_size": page_size,
-            "total_pages": (total + page_size - 1) // page_size,
-        }
+        return build_page(
+            contact_responses,
+            total,
+            page,
+            page_size,
+            count_cap,
+            None if search else make_next_cursor(contacts, page_size, CONTACTS_SORT, "created_at"),
+        )
 
     async def delete_contact(self, contact_id: int, organization_id: int) -> bool:
         contact = await self.contact_repo.get_contact_with_organization(contact_id, organization_id)
         if not contact:
             raise ContactNotFoundException("Contact not found")
 
-        deals = await self.deal_repo.get_organization_deals(organization_id)
-        deals_with_contact = [deal for deal in deals if deal.contact_id == contact_id]
-
-        if deals_with_contact:
+        if await self.deal_repo.contact_has_deals(contact_id, organization_id):
             raise ContactHasActiveDealsException("Cannot delete contact with active deals")
 
-        return await self.contact_repo.delete(contact_id)
+        deleted = await self.contact_repo.delete(contact_id)
+        contact_prefix_index.remove(organization_id, contact_id)
+        return deleted
+
+    async def bulk_delete_contacts(self, contact_ids: list[int], organization_id: int) -> int:
+        """
+        Удаляет контакты только если все они найдены в организации и ни у одного нет сделок
+        """
+        contact_ids = list(dict.fromkeys(contact_ids))
+        candidates = await self.contact_repo.get_deletion_candidates(contact_ids, organization_id)
+
+        missing = [contact_id for contact_id in contact_ids if contact_id not in candidates]
+        if missing:
+            raise ContactNotFoundException(f"Contacts not found: {missing}")
+
+        with_deals = [contact_id for contact_id in contact_ids if candidates[contact_id]]
+        if with_deals:
+            raise ContactHasActiveDealsException(
+                f"Cannot delete contacts with active deals: {with_deals}"
+            )
+
+        deleted = await self.contact_repo.delete_many(contact_ids, organization_id)
+        for contact_id in contact_ids:
+            contact_prefix_index.remove(organization_id, contact_id)
+        return deleted
+
+    async def autocomplete(
+        self,
+        organization_id: int,
+        prefix: str,
+        limit: int = 10,
+        current_user_id: int = None,
+        user_role: str = None,
+    ) -> list[ContactSuggestion]:
+        # Участник с ролью member видит только свои контакты, как и в списке
+        owner_id = current_user_id if user_role == "member" else None
+
+        async def load(max_contacts: int) -> list[ContactEntry] | None:
+            # Индекс служит всем запросам организации до max_age, поэтому он строится
+            # по основной БД, а не по реплике, которую может получить сессия запроса
+            async with AsyncSessionLocal() as session:
+                rows = await ContactRepository(session).get_organization_contact_keys(
+                    organization_id, max_contacts + 1
+                )
+            if len(rows) > max_contacts:
+                return None
+            return [ContactEntry(*row) for row in rows]
+
+        index = await contact_prefix_index.get(organization_id, load)
+        if index is not None:
+            entries = index.search(prefix, limit, owner_id)
+        else:
+            # Слишком большая организация: префиксный поиск в БД
+            contacts = await self.contact_repo.search_by_prefix(
+                organization_id, prefix, limit, owner_id
+            )
+            entries = [
+                ContactEntry(contact.id, contact.name, contact.email, contact.owner_id)
+                for contact in contacts
+            ]
+
+        return [
+            ContactSuggestion(id=entry.id, name=entry.name, email=entry.email)
+            for entry in entries
+        ]
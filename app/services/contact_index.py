@@ -0,0 +1,236 @@
+import asyncio
+import time
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass
+
+from app.core.config import settings
+
+
+def normalize(value: str) -> str:
+    return " ".join(value.casefold().split())
+
+
+@dataclass(frozen=True, slots=True)
+class ContactEntry:
+    id: int
+    name: str
+    email: str | None
+    owner_id: int
+
+
+class OrganizationContactIndex:
+    """
+    Префиксный индекс контактов одной организации: отсортированный массив ключей
+    (нормализованные имя, каждое слово имени и email) -> id контакта.
+    Поиск - bisect до первого ключа с префиксом и проход вперед до limit совпадений
+    """
+
+    def __init__(self, entries: Iterable[ContactEntry]):
+        self.contacts: dict[int, ContactEntry] = {}
+        self._keys: list[tuple[str, int]] = []
+        for entry in entries:
+            self.contacts[entry.id] = entry
+            self._keys.extend((key, entry.id) for key in self._entry_keys(entry))
+        self._keys.sort()
+        self.loaded_at = time.monotonic()
+
+    @staticmethod
+    def _entry_keys(entry: ContactEntry) -> set[str]:
+        name = normalize(entry.name)
+        keys = {name, *name.split(" ")}
+        if entry.email:
+            keys.add(normalize(entry.email))
+        keys.discard("")
+        return keys
+
+    def add(self, entry: ContactEntry) -> None:
+        if entry.id in self.contacts:
+            self.remove(entry.id)
+        self.contacts[entry.id] = entry
+        for key in self._entry_keys(entry):
+            insort(self._keys, (key, entry.id))
+
+    def remove(self, contact_id: int) -> None:
+        entry = self.contacts.pop(contact_id, None)
+        if entry is None:
+            return
+        for key in self._entry_keys(entry):
+            position = bisect_left(self._keys, (key, contact_id))
+            if position < len(self._keys) and self._keys[position] == (key, contact_id):
+                del self._keys[position]
+
+    def search(self, prefix: str, limit: int, owner_id: int | None = None) -> list[ContactEntry]:
+        prefix = normalize(prefix)
+        found: dict[int, ContactEntry] = {}
+
+        position = bisect_left(self._keys, (prefix, -1))
+        while position < len(self._keys) and len(found) < limit:
+            key, contact_id = self._keys[position]
+            if not key.startswith(prefix):
+                break
+            entry = self.contacts[contact_id]
+            if owner_id is None or entry.owner_id == owner_id:
+                found.setdefault(contact_id, entry)
+            position += 1
+
+        return list(found.values())
+
+    def __len__(self) -> int:
+        return len(self.contacts)
+
+
+class ContactPrefixIndex:
+    """
+    Индексы организаций в памяти процесса. Индекс организации строится при первом
+    запросе и перестраивается через max_age секунд, чтобы подхватить изменения,
+    сделанные другими воркерами. Организации без запросов дольше idle_seconds
+    вытесняются, а при превышении max_contacts вытесняются самые давно
+    использованные. Организации больше max_organization_contacts не индексируются
+    """
+
+    def __init__(
+        self,
+        max_contacts: int,
+        max_organization_contacts: int,
+        idle_seconds: float,
+        max_age_seconds: float,
+    ):
+        self.max_contacts = max_contacts
+        self.max_organization_contacts = max_organization_contacts
+        self.idle_seconds = idle_seconds
+        self.max_age_seconds = max_age_seconds
+        # organization_id -> (время последнего обращения, индекс)
+        self._indexes: OrderedDict[int, tuple[float, OrganizationContactIndex]] = OrderedDict()
+        self._locks: dict[int, asyncio.Lock] = {}
+        # organization_id -> изменения, пришедшие во время загрузки индекса
+        self._pending: dict[int, list[Callable[[OrganizationContactIndex], None]]] = {}
+        self._size = 0
+
+    async def get(
+        self,
+        organization_id: int,
+        load: Callable[[int], Awaitable[list[ContactEntry] | None]],
+    ) -> OrganizationContactIndex | None:
+        """
+        Индекс организации; load(limit) загружает не больше limit контактов
+        или возвращает None, если организация слишком велика для индексации
+        """
+        now = time.monotonic()
+        self._evict_idle(now)
+
+        index = self._touch(organization_id, now)
+        if index is not None:
+            return index
+
+        # Одновременные запросы одной организации ждут единственную загрузку
+        lock = self._locks.setdefault(organization_id, asyncio.Lock())
+        async with lock:
+            index = self._touch(organization_id, time.monotonic())
+            if index is None:
+                index = await self._load(organization_id, load)
+
+        if not lock.locked():
+            self._locks.pop(organization_id, None)
+        return index
+
+    async def _load(
+        self,
+        organization_id: int,
+        load: Callable[[int], Awaitable[list[ContactEntry] | None]],
+    ) -> OrganizationContactIndex | None:
+        # Загрузка могла прочитать данные до записи, завершившейся во время нее:
+        # такие изменения копятся и применяются к построенному индексу
+        pending = self._pending[organization_id] = []
+        try:
+            entries = await load(self.max_organization_contacts)
+            if entries is None:
+                return None
+            # Сортировка сотен тысяч ключей занимает заметное время,
+            # поэтому индекс строится вне event loop
+            index = await asyncio.to_thread(OrganizationContactIndex, entries)
+        finally:
+            del self._pending[organization_id]
+
+        for apply in pending:
+            apply(index)
+        if len(index) > self.max_organization_contacts:
+            return None
+        self._store(organization_id, index)
+        return index
+
+    def add(self, organization_id: int, entry: ContactEntry) -> None:
+        pending = self._pending.get(organization_id)
+        if pending is not None:
+            pending.append(lambda index: index.add(entry))
+        item = self._indexes.get(organization_id)
+        if item is None:
+            return
+        index = item[1]
+        self._size -= len(index)
+        index.add(entry)
+        self._size += len(index)
+        if len(index) > self.max_organization_contacts:
+            self.discard(organization_id)
+
+    def remove(self, organization_id: int, contact_id: int) -> None:
+        pending = self._pending.get(organization_id)
+        if pending is not None:
+            pending.append(lambda index: index.remove(contact_id))
+        item = self._indexes.get(organization_id)
+        if item is None:
+            return
+        index = item[1]
+        self._size -= len(index)
+        index.remove(contact_id)
+        self._size += len(index)
+
+    def discard(self, organization_id: int) -> None:
+        item = self._indexes.pop(organization_id, None)
+        if item is not None:
+            self._size -= len(item[1])
+
+    def clear(self) -> None:
+        self._indexes.clear()
+        self._size = 0
+
+    def _touch(self, organization_id: int, now: float) -> OrganizationContactIndex | None:
+        item = self._indexes.get(organization_id)
+        if item is None:
+            return None
+        index = item[1]
+        if now - index.loaded_at >= self.max_age_seconds:
+            self.discard(organization_id)
+            return None
+        self._indexes[organization_id] = (now, index)
+        self._indexes.move_to_end(organization_id)
+        return index
+
+    def _store(self, organization_id: int, index: OrganizationContactIndex) -> None:
+        self.discard(organization_id)
+        self._indexes[organization_id] = (time.monotonic(), index)
+        self._size += len(index)
+        while self._size > self.max_contacts and len(self._indexes) > 1:
+            oldest = next(iter(self._indexes))
+            self.discard(oldest)
+
+    def _evict_idle(self, now: float) -> None:
+        # Записи упорядочены по времени последнего обращения
+        while self._indexes:
+            organization_id, (last_used, _) = next(iter(self._indexes.items()))
+            if now - last_used < self.idle_seconds:
+                break
+            self.discard(organization_id)
+
+    @property
+    def stats(self) -> dict:
+        return {"organizations": len(self._indexes), "contacts": self._size}
+
+
+contact_prefix_index = ContactPrefixIndex(
+    max_contacts=settings.CONTACT_INDEX_MAX_CONTACTS,
+    max_organization_contacts=settings.CONTACT_INDEX_MAX_ORGANIZATION_CONTACTS,
+    idle_seconds=settings.CONTACT_INDEX_IDLE_SECONDS,
+    max_age_seconds=settings.CONTACT_INDEX_MAX_AGE_SECONDS,
+)
@@ -13,6 +13,9 @@ from app.repositories import ActivityRepository, ContactRepository, DealReposito
 from app.schemas import DealResponse
 from app.schemas.dto import DealCreateDTO
 
+from .names import NameLoader
+from .pagination import build_page, decode_cursor, get_count_cap, make_next_cursor
+
 
 class DealService:
     def __init__(self, db: AsyncSession):
@@ -20,6 +23,7 @@ class DealService:
         self.deal_repo = DealRepository(db)
         self.contact_repo = ContactRepository(db)
         self.activity_repo = ActivityRepository(db)
+        self.names = NameLoader(db)
 
     async def create_deal(self, deal_dto: DealCreateDTO) -> DealResponse:
         contact = await self.contact_repo.get_contact_with_organization(
@@ -40,6 +44,8 @@ class DealService:
             }
         )
 
+        owner_names = await self.names.users([deal.owner_id])
+
         return DealResponse(
             id=deal.id,
             organization_id=deal.organization_id,
@@ -53,8 +59,8 @@ class DealService:
             description=deal.description,
             created_at=deal.created_at,
             updated_at=deal.updated_at,
-            contact_name=f"Contact {deal.contact_id}",
-            owner_name=f"User {deal.owner_id}",
+            contact_name=contact.name,
+            owner_name=owner_names.get(deal.owner_id, ""),
         )
 
     async def update_deal(
@@ -112,6 +118,8 @@ class DealService:
 
         update_data["updated_at"] = datetime.utcnow()
         updated_deal = await self.deal_repo.update(deal_id, update_data)
+        contact_names = await self.names.contacts([updated_deal.contact_id])
+        owner_names = await self.names.users([updated_deal.owner_id])
 
         return DealResponse(
             id=updated_deal.id,
@@ -126,8 +134,8 @@ class DealService:
             description=updated_deal.description,
             created_at=updated_deal.created_at,
             updated_at=updated_deal.updated_at,
-            contact_name=f"Contact {updated_deal.contact_id}",
-            owner_name=f"User {updated_deal.owner_id}",
+            contact_name=contact_names.get(updated_deal.contact_id, ""),
+            owner_name=owner_names.get(updated_deal.owner_id, ""),
         )
 
     def _get_stage_index(self, stage: str) -> int:
@@ -148,6 +156,8 @@ class DealService:
         order: str = "desc",
         current_user_id: int = None,
         user_role: str = None,
+        count: str = "exact",
+        cursor: str | None = None,
     ) -> dict:
         if owner_id and owner_id != current_user_id:
             if user_role == "member":
@@ -156,50 +166,78 @@ class DealService:
         if user_role == "member" and owner_id is None:
             owner_id = current_user_id
 
-        skip = (page - 1) * page_size
-        deals = await self.deal_repo.get_organization_deals(
-            organization_id,
-            skip,
-            page_size,
-            status,
-            stage,
-            min_amount,
-            max_amount,
-            owner_id,
-            order_by,
-            order,
-        )
-        total = await self.deal_repo.count_organization_deals(
-            organization_id, status, stage, min_amount, max_amount, owner_id
-        )
+        sort = f"{order_by}:{order}"
+        after = decode_cursor(cursor, sort) if cursor else None
+        skip = 0 if after else (page - 1) * page_size
+        count_cap = get_count_cap(count)
+        total = None
+
+        if count == "exact" and after is None:
+            # Страница и total одним запросом
+            deals, total = await self.deal_repo.get_organization_deals_with_total(
+                organization_id,
+                skip,
+                page_size,
+                status,
+                stage,
+                min_amount,
+                max_amount,
+                owner_id,
+                order_by,
+                order,
+            )
+        else:
+            deals = await self.deal_repo.get_organization_deals(
+                organization_id,
+                skip,
+                page_size,
+                status,
+                stage,
+                min_amount,
+                max_amount,
+                owner_id,
+                order_by,
+                order,
+                after,
+            )
+            if count != "none":
+                total = await self.deal_repo.count_organization_deals(
+                    organization_id, status, stage, min_amount, max_amount, owner_id, cap=count_cap
+                )
+
+        # По одному запросу на тип сущности для всей страницы
+        contact_names = await self.names.contacts(deal.contact_id for deal in deals)
+        owner_names = await self.names.users(deal.owner_id for deal in deals)
 
+        # Элементы страницы - dict: без валидации моделей, ответ сериализует orjson
         deal_responses = [
-            DealResponse(
-                id=deal.id,
-                organization_id=deal.organization_id,
-                contact_id=deal.contact_id,
-                owner_id=deal.owner_id,
-                title=deal.title,
-                amount=deal.amount,
-                currency=deal.currency,
-                status=deal.status,
-                stage=deal.stage,
-                description=deal.description,
-                created_at=deal.created_at,
-                updated_at=deal.updated_at,
-                contact_name=f"Contact {deal.contact_id}",
-                owner_name=f"User {deal.owner_id}",
-            )
+            {
+                "id": deal.id,
+                "organization_id": deal.organization_id,
+                "contact_id": deal.contact_id,
+                "owner_id": deal.owner_id,
+                "title": deal.title,
+                "amount": deal.amount,
+                "currency": deal.currency,
+                "status": deal.status,
+                "stage": deal.stage,
+                "description": deal.description,
+                "created_at": deal.created_at,
+                "updated_at": deal.updated_at,
+                "contact_name": contact_names.get(deal.contact_id, ""),
+                "owner_name": owner_names.get(deal.owner_id, ""),
+            }
             for deal in deals
         ]
 
-        return {
-            "items": deal_responses,
-            "total": total,
-            "page": page,
-            "page_size": page_size,
-            "total_pages": (total + page_size - 1) // page_size,
-        }
+        return build_page(
+            deal_responses,
+            total,
+            page,
+            page_size,
+            count_cap,
+            make_next_cursor(deals, page_size, sort, order_by),
+        )
 
     async def delete_deal(
         self, deal_id: int, organization_id: int, current_user_id: int, user_role: str
@@ -0,0 +1,42 @@
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.repositories import ContactRepository, DealRepository, UserRepository
+
+
+class NameLoader:
+    """
+    Пакетная загрузка отображаемых имен в пределах одного запроса: все id одного
+    типа сущности, встреченные на странице, загружаются одним запросом, а уже
+    загруженные имена берутся из кэша экземпляра
+    """
+
+    def __init__(self, db: AsyncSession):
+        self._user_repo = UserRepository(db)
+        self._contact_repo = ContactRepository(db)
+        self._deal_repo = DealRepository(db)
+        self._users: dict[int, str] = {}
+        self._contacts: dict[int, str] = {}
+        self._deals: dict[int, str] = {}
+
+    @staticmethod
+    async def _load(
+        cache: dict[int, str],
+        ids: Iterable[Any],
+        fetch: Callable[[set[int]], Awaitable[dict[int, str]]],
+    ) -> dict[int, str]:
+        missing = {id_ for id_ in ids if id_ is not None and id_ not in cache}
+        if missing:
+            cache.update(await fetch(missing))
+        return cache
+
+    async def users(self, ids: Iterable[Any]) -> dict[Any, str]:
+        return await self._load(self._users, ids, self._user_repo.get_names_by_ids)
+
+    async def contacts(self, ids: Iterable[Any]) -> dict[Any, str]:
+        return await self._load(self._contacts, ids, self._contact_repo.get_names_by_ids)
+
+    async def deals(self, ids: Iterable[Any]) -> dict[Any, str]:
+        return await self._load(self._deals, ids, self._deal_repo.get_titles_by_ids)
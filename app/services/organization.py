@@ -1,5 +1,6 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import user_organizations_cache
 from app.repositories import OrganizationMemberRepository, OrganizationRepository
 
 
@@ -10,18 +11,20 @@ class OrganizationService:
         self.member_repo = OrganizationMemberRepository(db)
 
     async def get_user_organizations(self, user_id: int) -> list:
-        organizations = await self.member_repo.get_user_organizations(user_id)
+        cached = user_organizations_cache.get(user_id)
+        if cached is not None:
+            return list(cached)
 
-        result = []
-        for organization in organizations:
-            membership = await self.member_repo.get_user_membership(user_id, organization.id)
-            result.append(
-                {
-                    "id": organization.id,
-                    "name": organization.name,
-                    "created_at": organization.created_at,
-                    "role": membership.role,
-                }
-            )
+        rows = await self.member_repo.get_user_organizations_with_roles(user_id)
+        result = [
+            {
+                "id": organization.id,
+                "name": organization.name,
+                "created_at": organization.created_at,
+                "role": role,
+            }
+            for organization, role in rows
+        ]
 
-        return result
+        user_organizations_cache.set(user_id, result)
+        return list(result)
@@ -0,0 +1,114 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any
+
+from app.core.config import settings
+from app.core.exceptions import ValidationException
+
+# Допустимые типы значения курсора по колонке сортировки: значение
+# подставляется в сравнение с колонкой и должно иметь ее тип
+_CURSOR_VALUE_TYPES: dict[str, tuple[type, ...]] = {
+    "created_at": (datetime,),
+    "amount": (Decimal, type(None)),
+}
+
+
+def get_count_cap(count_mode: str) -> int | None:
+    """
+    Режимы подсчета total: exact - точный count(*),
+    capped - count(*) не дальше LIST_COUNT_CAP строк, none - без total
+    """
+    return settings.LIST_COUNT_CAP if count_mode == "capped" else None
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"dec": str(value)}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "dec" in value:
+            return Decimal(value["dec"])
+        raise ValueError("Unknown cursor value")
+    return value
+
+
+def encode_cursor(sort: str, value: Any, last_id: int) -> str:
+    """
+    Непрозрачный курсор keyset-пагинации: сортировка и ключ (value, id) последней строки
+    """
+    payload = {"s": sort, "v": _encode_value(value), "id": last_id}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> tuple[Any, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        value, last_id = _decode_value(payload["v"]), int(payload["id"])
+        cursor_sort = payload["s"]
+    except (
+        binascii.Error,
+        InvalidOperation,
+        KeyError,
+        TypeError,
+        UnicodeDecodeError,
+        ValueError,
+    ):
+        raise ValidationException("Invalid cursor")
+
+    if cursor_sort != sort:
+        raise ValidationException("Cursor does not match the requested sort order")
+
+    sort_column = sort.partition(":")[0]
+    if not isinstance(value, _CURSOR_VALUE_TYPES.get(sort_column, ())):
+        raise ValidationException("Invalid cursor")
+
+    return value, last_id
+
+
+def make_next_cursor(items: list, page_size: int, sort: str, sort_attribute: str) -> str | None:
+    """
+    Курсор следующей страницы; None, если страница неполная и дальше строк нет
+    """
+    if len(items) < page_size or not items:
+        return None
+    last = items[-1]
+    return encode_cursor(sort, getattr(last, sort_attribute), last.id)
+
+
+def build_page(
+    items: list,
+    total: int | None,
+    page: int,
+    page_size: int,
+    count_cap: int | None = None,
+    next_cursor: str | None = None,
+) -> dict:
+    """
+    Формирует ответ списочного эндпоинта. Если total превысил count_cap,
+    возвращается count_cap и total_capped=True (клиент показывает "1000+")
+    """
+    total_capped = count_cap is not None and total is not None and total > count_cap
+    if total_capped:
+        total = count_cap
+
+    return {
+        "items": items,
+        "total": total,
+        "total_capped": total_capped,
+        "page": page,
+        "page_size": page_size,
+        "total_pages": (total + page_size - 1) // page_size if total is not None else None,
+        "next_cursor": next_cursor,
+    }
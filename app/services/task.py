@@ -12,6 +12,11 @@ from app.repositories import ActivityRepository, DealRepository, TaskRepository
 from app.schemas import TaskResponse
 from app.schemas.dto import TaskCreateDTO
 
+from .names import NameLoader
+from .pagination import build_page, decode_cursor, get_count_cap, make_next_cursor
+
+TASKS_SORT = "created_at:desc"
+
 
 class TaskService:
     def __init__(self, db: AsyncSession):
@@ -19,6 +24,7 @@ class TaskService:
         self.task_repo = TaskRepository(db)
         self.deal_repo = DealRepository(db)
         self.activity_repo = ActivityRepository(db)
+        self.names = NameLoader(db)
 
     async def create_task(
         self, task_dto: TaskCreateDTO, current_user_id: int, user_role: str, organization_id: int
@@ -62,7 +68,7 @@ class TaskService:
             due_date=task.due_date,
             is_done=task.is_done,
             created_at=task.created_at,
-            deal_title=f"Deal {task.deal_id}",
+            deal_title=deal.title,
         )
 
     async def get_tasks(
@@ -74,33 +80,50 @@ class TaskService:
         only_open: bool = False,
         due_before: Optional = None, # type: ignore
         due_after: Optional = None, # type: ignore
+        count: str = "exact",
+        cursor: str | None = None,
     ) -> dict:
-        skip = (page - 1) * page_size
-        tasks = await self.task_repo.get_organization_tasks(
-            organization_id, skip, page_size, deal_id, only_open, due_before, due_after
-        )
-        total = await self.task_repo.count_organization_tasks(
-            organization_id, deal_id, only_open, due_before, due_after
-        )
+        after = decode_cursor(cursor, TASKS_SORT) if cursor else None
+        skip = 0 if after else (page - 1) * page_size
+        count_cap = get_count_cap(count)
+        total = None
 
-        task_responses = [
-            TaskResponse(
-                id=task.id,
-                deal_id=task.deal_id,
-                title=task.title,
-                description=task.description,
-                due_date=task.due_date,
-                is_done=task.is_done,
-                created_at=task.created_at,
-                deal_title=f"Deal {task.deal_id}",
+        if count == "exact" and after is None:
+            # Страница и total одним запросом
+            tasks, total = await self.task_repo.get_organization_tasks_with_total(
+                organization_id, skip, page_size, deal_id, only_open, due_before, due_after
+            )
+        else:
+            tasks = await self.task_repo.get_organization_tasks(
+                organization_id, skip, page_size, deal_id, only_open, due_before, due_after, after
             )
+            if count != "none":
+                total = await self.task_repo.count_organization_tasks(
+                    organization_id, deal_id, only_open, due_before, due_after, cap=count_cap
+                )
+
+        deal_titles = await self.names.deals(task.deal_id for task in tasks)
+
+        # Элементы страницы - dict: без валидации моделей, ответ сериализует orjson
+        task_responses = [
+            {
+                "id": task.id,
+                "deal_id": task.deal_id,
+                "title": task.title,
+                "description": task.description,
+                "due_date": task.due_date,
+                "is_done": task.is_done,
+                "created_at": task.created_at,
+                "deal_title": deal_titles.get(task.deal_id, ""),
+            }
             for task in tasks
         ]
 
-        return {
-            "items": task_responses,
-            "total": total,
-            "page": page,
-            "page_size": page_size,
-            "total_pages": (total + page_size - 1) // page_size,
-        }
+        return build_page(
+            task_responses,
+            total,
+            page,
+            page_size,
+            count_cap,
+            make_next_cursor(tasks, page_size, TASKS_SORT, "created_at"),
+        )
@@ -1,6 +1,6 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.security import get_password_hash
+from app.core.security import get_password_hash_async
 from app.repositories import OrganizationMemberRepository, OrganizationRepository, UserRepository
 
 
@@ -14,8 +14,9 @@ class UserService:
     async def create_user_with_organization(
         self, email: str, password: str, name: str, organization_name: str
     ):
+        hashed_password = await get_password_hash_async(password)
         user = await self.user_repo.create(
-            {"email": email, "hashed_password": get_password_hash(password), "name": name}
+            {"email": email, "hashed_password": hashed_password, "name": name}
         )
 
         organization = await self.org_repo.create({"name": organization_name})
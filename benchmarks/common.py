@@ -0,0 +1,129 @@
+"""
+Общие утилиты бенчмарков: подключение к БД, наполнение данными и замеры.
+
+Бенчмарки работают с БД из settings.database_url и создают в ней отдельную
+организацию, поэтому их не стоит запускать на production-базе.
+"""
+
+import statistics
+import time
+from collections.abc import Awaitable, Callable
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from app.core.config import settings
+from app.database.base import Base
+
+
+def create_engine() -> AsyncEngine:
+    return create_async_engine(settings.database_url, echo=False)
+
+
+def create_session_factory(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def ensure_schema(engine: AsyncEngine) -> None:
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await conn.run_sync(Base.metadata.create_all)
+
+
+async def seed_organization(engine: AsyncEngine, contacts: int, deals: int) -> tuple[int, int]:
+    """
+    Создает пользователя и организацию с заданным числом контактов и сделок.
+    Возвращает (organization_id, user_id)
+    """
+    async with engine.begin() as conn:
+        user_id = (
+            await conn.execute(
+                text(
+                    "INSERT INTO users (email, hashed_password, name, is_active) "
+                    "VALUES ('bench-' || md5(random()::text) || '@example.com', '-', 'Bench', true) "
+                    "RETURNING id"
+                )
+            )
+        ).scalar_one()
+        organization_id = (
+            await conn.execute(
+                text("INSERT INTO organizations (name) VALUES ('Benchmark') RETURNING id")
+            )
+        ).scalar_one()
+        await conn.execute(
+            text(
+                "INSERT INTO organization_members (organization_id, user_id, role) "
+                "VALUES (:organization_id, :user_id, 'owner')"
+            ),
+            {"organization_id": organization_id, "user_id": user_id},
+        )
+        await conn.execute(
+            text(
+                "INSERT INTO contacts (organization_id, owner_id, name, email, phone, created_at) "
+                "SELECT :organization_id, :user_id, 'Contact ' || md5(g::text), "
+                "'contact' || g || '@example.com', '+1' || lpad(g::text, 10, '0'), "
+                "now() - make_interval(secs => g) "
+                "FROM generate_series(1, :contacts) AS g"
+            ),
+            {"organization_id": organization_id, "user_id": user_id, "contacts": contacts},
+        )
+        first_contact_id = (
+            await conn.execute(
+                text("SELECT min(id) FROM contacts WHERE organization_id = :organization_id"),
+                {"organization_id": organization_id},
+            )
+        ).scalar_one()
+        await conn.execute(
+            text(
+                "INSERT INTO deals (organization_id, contact_id, owner_id, title, amount, "
+                "currency, status, stage, created_at) "
+                "SELECT :organization_id, :first_contact_id + g % :contacts, :user_id, "
+                "'Deal ' || g, (g % 10000)::numeric, 'USD', "
+                "(ARRAY['new', 'in_progress', 'won', 'lost'])[1 + g % 4]::deal_statuses, "
+                "(ARRAY['qualification', 'proposal', 'negotiation', 'closed'])[1 + g % 4]"
+                "::deal_stages, "
+                "now() - make_interval(mins => g % 525600) "
+                "FROM generate_series(1, :deals) AS g"
+            ),
+            {
+                "organization_id": organization_id,
+                "user_id": user_id,
+                "first_contact_id": first_contact_id,
+                "contacts": contacts,
+                "deals": deals,
+            },
+        )
+
+    async with engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("ANALYZE contacts"))
+        await conn.execute(text("ANALYZE deals"))
+
+    return organization_id, user_id
+
+
+async def measure(
+    func: Callable[[], Awaitable[object]], repeat: int = 20, warmup: int = 2
+) -> dict:
+    """
+    Медиана и p95 времени выполнения в миллисекундах
+    """
+    for _ in range(warmup):
+        await func()
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await func()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    return {
+        "median_ms": round(statistics.median(timings), 2),
+        "p95_ms": round(timings[max(int(len(timings) * 0.95) - 1, 0)], 2),
+    }
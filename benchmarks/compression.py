@@ -0,0 +1,56 @@
+"""
+Стоимость сжатия страниц списков: процессорное время против сэкономленных байт
+для разных размеров страницы и уровней gzip/brotli. Помогает выбрать
+COMPRESSION_MINIMUM_SIZE и уровень сжатия.
+
+Запуск: python -m benchmarks.compression
+"""
+
+import argparse
+import statistics
+import time
+
+from app.api.responses import ORJSONPageResponse
+from app.core.compression import _Compressor, brotli
+from app.services.pagination import build_page
+from benchmarks.list_serialization import ENDPOINTS
+
+
+def measure(compressor_args: tuple[str, int, int], body: bytes, repeat: int) -> tuple[float, int]:
+    timings = []
+    size = 0
+    for _ in range(repeat):
+        compressor = _Compressor(*compressor_args)
+        started = time.thread_time()
+        size = len(compressor.compress(body, final=True))
+        timings.append(time.thread_time() - started)
+    return statistics.median(timings) * 1_000_000, size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    settings = [("gzip", level, 0) for level in (1, 6, 9)]
+    if brotli is not None:
+        settings += [("br", 6, quality) for quality in (1, 4, 8)]
+
+    for name, make_item, _, _ in ENDPOINTS:
+        for page_size in (1, 10, 100):
+            body = ORJSONPageResponse(
+                build_page([make_item(i) for i in range(page_size)], 1000, 1, page_size)
+            ).body
+            for compressor_args in settings:
+                cpu_us, size = measure(compressor_args, body, args.repeat)
+                saved = len(body) - size
+                level = compressor_args[1] if compressor_args[0] == "gzip" else compressor_args[2]
+                per_kb = f"{cpu_us / (saved / 1024):7.1f} us/KB saved" if saved > 0 else "no gain"
+                print(
+                    f"{name:>10} x{page_size:<3} {compressor_args[0]:>4}-{level}: "
+                    f"{len(body):>7} -> {size:>6} B, {cpu_us:8.1f} us, {per_kb}"
+                )
+
+
+if __name__ == "__main__":
+    main()
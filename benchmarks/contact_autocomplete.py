@@ -0,0 +1,58 @@
+"""
+Время поиска по префиксному индексу контактов (без БД и HTTP).
+
+Запуск: python -m benchmarks.contact_autocomplete --contacts 200000
+"""
+
+import argparse
+import random
+import statistics
+import string
+import time
+
+from app.services.contact_index import ContactEntry, OrganizationContactIndex
+
+
+def random_word(rng: random.Random) -> str:
+    return "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 10)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--contacts", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=10_000)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    entries = [
+        ContactEntry(
+            i,
+            f"{random_word(rng).title()} {random_word(rng).title()}",
+            f"{random_word(rng)}@example.com",
+            owner_id=rng.randint(1, 20),
+        )
+        for i in range(args.contacts)
+    ]
+
+    started = time.perf_counter()
+    index = OrganizationContactIndex(entries)
+    print(f"build: {(time.perf_counter() - started) * 1000:.0f} ms for {args.contacts} contacts")
+
+    for label, owner_id in (("all contacts", None), ("member filter", 1)):
+        timings = []
+        for _ in range(args.queries):
+            prefix = random_word(rng)[: rng.randint(1, 3)]
+            started = time.perf_counter()
+            index.search(prefix, args.limit, owner_id)
+            timings.append((time.perf_counter() - started) * 1_000_000)
+
+        timings.sort()
+        print(
+            f"{label}: median {statistics.median(timings):.1f} us, "
+            f"p99 {timings[int(len(timings) * 0.99) - 1]:.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Поиск контактов: ILIKE по name/email без индекса против поиска через GIN-индексы pg_trgm.
+
+Старый путь воспроизводится тем же запросом с выключенными bitmap-сканированиями:
+тогда планировщик не может использовать триграммные индексы и, как до их
+появления, проверяет ILIKE на каждой строке организации.
+
+Запуск: python -m benchmarks.contact_search --contacts 1000000
+"""
+
+import argparse
+import asyncio
+
+from sqlalchemy import select, text
+
+from app.models import Contact
+from app.repositories import ContactRepository
+from benchmarks.common import (
+    create_engine,
+    create_session_factory,
+    ensure_schema,
+    measure,
+    seed_organization,
+)
+
+# Редкая подстрока, частая подстрока, номер телефона
+SEARCHES = ["contact123456@", "Contact ab", "0000777"]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--contacts", type=int, default=1_000_000)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = create_engine()
+    await ensure_schema(engine)
+    organization_id, _ = await seed_organization(engine, contacts=args.contacts, deals=0)
+    session_factory = create_session_factory(engine)
+
+    async with session_factory() as session:
+        contact_repo = ContactRepository(session)
+
+        for search in SEARCHES:
+
+            async def legacy_ilike(search: str = search) -> None:
+                # Запрос в том виде, в котором он был до триграммных индексов
+                await session.execute(text("SET LOCAL enable_bitmapscan = off"))
+                await session.execute(
+                    select(Contact)
+                    .where(Contact.organization_id == organization_id)
+                    .where(
+                        Contact.name.ilike(f"%{search}%") | Contact.email.ilike(f"%{search}%")
+                    )
+                    .order_by(Contact.created_at.desc(), Contact.id.desc())
+                    .limit(args.page_size)
+                )
+                await session.rollback()
+
+            async def trigram(search: str = search) -> None:
+                await contact_repo.get_organization_contacts(
+                    organization_id, limit=args.page_size, search=search
+                )
+                await session.rollback()
+
+            print(f"{search!r:>18}: ILIKE   {await measure(legacy_ilike, args.repeat)}")
+            print(f"{search!r:>18}: pg_trgm {await measure(trigram, args.repeat)}")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,114 @@
+"""
+Сводка по сделкам при промахе кэша: три последовательных запроса (группировка
+по статусу, средняя сумма выигранных, число новых за период), один запрос
+с агрегатами FILTER и чтение агрегатов deal_rollups (текущий AnalyticsService).
+
+Redis подменяется заглушкой без данных, а локальный уровень кэша отключен,
+поэтому каждый вызов сервиса выполняет запросы к БД.
+
+Запуск: python -m benchmarks.deal_summary --deals 1000000
+"""
+
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import func, select
+
+from app.core.cache import InMemoryBackend, TTLCache, cache_manager
+from app.models import Deal
+from app.repositories import DealRollupRepository
+from app.services import AnalyticsService
+from benchmarks.common import (
+    create_engine,
+    create_session_factory,
+    ensure_schema,
+    measure,
+    seed_organization,
+)
+
+
+class ColdCache(InMemoryBackend):
+    """
+    Хранилище, в котором нет ни одного значения: каждое чтение - промах
+    """
+
+    async def get(self, key: str) -> None:
+        return None
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--deals", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    engine = create_engine()
+    await ensure_schema(engine)
+    organization_id, _ = await seed_organization(engine, contacts=1000, deals=args.deals)
+    session_factory = create_session_factory(engine)
+    cache_manager.backend = ColdCache(maxsize=10_000)
+    # Без локального уровня кэша: иначе повторные вызовы сервиса не дойдут до БД
+    cache_manager.local = TTLCache(maxsize=0, ttl=0)
+
+    async with session_factory() as session:
+        # Сделки вставлены в обход репозитория: агрегаты строятся пересчетом
+        await DealRollupRepository(session).rebuild(organization_id)
+
+        async def three_queries() -> None:
+            # Запросы в том виде, в котором они были до объединения
+            await session.execute(
+                select(
+                    Deal.status,
+                    func.count(Deal.id),
+                    func.coalesce(func.sum(Deal.amount), Decimal("0")),
+                )
+                .where(Deal.organization_id == organization_id)
+                .group_by(Deal.status)
+            )
+            await session.execute(
+                select(func.avg(Deal.amount)).where(
+                    Deal.organization_id == organization_id,
+                    Deal.status == "won",
+                    Deal.amount > 0,
+                )
+            )
+            await session.execute(
+                select(func.count(Deal.id)).where(
+                    Deal.organization_id == organization_id,
+                    Deal.created_at >= datetime.utcnow() - timedelta(days=args.days),
+                    Deal.status == "new",
+                )
+            )
+            await session.rollback()
+
+        async def single_query() -> None:
+            days_ago = datetime.utcnow() - timedelta(days=args.days)
+            await session.execute(
+                select(
+                    Deal.status,
+                    func.count(Deal.id),
+                    func.coalesce(func.sum(Deal.amount), Decimal("0")),
+                    func.avg(Deal.amount).filter(Deal.amount > 0),
+                    func.count(Deal.id).filter(Deal.created_at >= days_ago),
+                )
+                .where(Deal.organization_id == organization_id)
+                .group_by(Deal.status)
+            )
+            await session.rollback()
+
+        async def rollups() -> None:
+            await AnalyticsService(session).get_deal_summary(organization_id, days=args.days)
+            await session.rollback()
+
+        print(f"three queries: {await measure(three_queries, args.repeat)}")
+        print(f"single query:  {await measure(single_query, args.repeat)}")
+        print(f"rollups:       {await measure(rollups, args.repeat)}")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
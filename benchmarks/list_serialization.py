@@ -0,0 +1,140 @@
+"""
+Сериализация страницы списка: модели *Response + повторная валидация response_model
+и json.dumps (как было) против dict + orjson (ORJSONPageResponse).
+
+Запуск: python -m benchmarks.list_serialization --page-size 100
+"""
+
+import argparse
+import json
+import statistics
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime
+from decimal import Decimal
+
+from pydantic import BaseModel
+
+from app.api.responses import ORJSONPageResponse
+from app.schemas import (
+    ActivityListResponse,
+    ActivityResponse,
+    ContactListResponse,
+    ContactResponse,
+    DealListResponse,
+    DealResponse,
+    TaskListResponse,
+    TaskResponse,
+)
+from app.services.pagination import build_page
+
+NOW = datetime(2025, 1, 2, 3, 4, 5, 123456, tzinfo=UTC)
+
+
+def deal(i: int) -> dict:
+    return {
+        "id": i,
+        "organization_id": 1,
+        "contact_id": i,
+        "owner_id": 1,
+        "title": f"Deal {i}",
+        "amount": Decimal("1234.50"),
+        "currency": "USD",
+        "status": "in_progress",
+        "stage": "proposal",
+        "description": "Lorem ipsum dolor sit amet " * 8,
+        "created_at": NOW,
+        "updated_at": NOW,
+        "contact_name": f"Contact {i}",
+        "owner_name": "Alice Owner",
+    }
+
+
+def contact(i: int) -> dict:
+    return {
+        "id": i,
+        "organization_id": 1,
+        "owner_id": 1,
+        "name": f"Contact {i}",
+        "email": f"contact{i}@example.com",
+        "phone": "+10000000000",
+        "created_at": NOW,
+        "owner_name": "Alice Owner",
+    }
+
+
+def task(i: int) -> dict:
+    return {
+        "id": i,
+        "deal_id": i,
+        "title": f"Task {i}",
+        "description": "Call the client",
+        "due_date": NOW,
+        "is_done": False,
+        "created_at": NOW,
+        "deal_title": f"Deal {i}",
+    }
+
+
+def activity(i: int) -> dict:
+    return {
+        "id": i,
+        "deal_id": 1,
+        "author_id": 1,
+        "type": "comment",
+        "payload": {"text": "Discussed the proposal", "mentions": [1, 2, 3]},
+        "created_at": NOW,
+        "author_name": "Alice Owner",
+    }
+
+
+ENDPOINTS: list[tuple[str, Callable[[int], dict], type[BaseModel], type[BaseModel]]] = [
+    ("deals", deal, DealResponse, DealListResponse),
+    ("contacts", contact, ContactResponse, ContactListResponse),
+    ("tasks", task, TaskResponse, TaskListResponse),
+    ("activities", activity, ActivityResponse, ActivityListResponse),
+]
+
+
+def measure(func: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1_000_000)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    for name, make_item, item_model, list_model in ENDPOINTS:
+        rows = [make_item(i) for i in range(args.page_size)]
+
+        def before(
+            rows: list[dict] = rows,
+            item_model: type[BaseModel] = item_model,
+            list_model: type[BaseModel] = list_model,
+        ) -> bytes:
+            # Сервис строил модели, FastAPI валидировал страницу по response_model
+            page = build_page([item_model(**row) for row in rows], 1000, 1, args.page_size)
+            content = list_model.model_validate(page).model_dump(mode="json")
+            return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+        def after(rows: list[dict] = rows) -> bytes:
+            page = build_page([dict(row) for row in rows], 1000, 1, args.page_size)
+            return ORJSONPageResponse(page).body
+
+        before_us = measure(before, args.repeat)
+        after_us = measure(after, args.repeat)
+        print(
+            f"{name:>10}: before {before_us:8.1f} us, after {after_us:7.1f} us, "
+            f"x{before_us / after_us:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
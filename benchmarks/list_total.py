@@ -0,0 +1,56 @@
+"""
+Список сделок с total: два запроса (страница + count) против одного с count(*) OVER ().
+
+Запуск: python -m benchmarks.list_total --deals 200000
+"""
+
+import argparse
+import asyncio
+
+from app.repositories import DealRepository
+from benchmarks.common import (
+    create_engine,
+    create_session_factory,
+    ensure_schema,
+    measure,
+    seed_organization,
+)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--deals", type=int, default=200_000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = create_engine()
+    await ensure_schema(engine)
+    organization_id, _ = await seed_organization(engine, contacts=1000, deals=args.deals)
+    session_factory = create_session_factory(engine)
+
+    async with session_factory() as session:
+        deal_repo = DealRepository(session)
+
+        for page in (1, 10, 100):
+            skip = (page - 1) * args.page_size
+
+            async def two_queries(skip: int = skip) -> None:
+                await deal_repo.get_organization_deals(organization_id, skip, args.page_size)
+                await deal_repo.count_organization_deals(organization_id)
+
+            async def window_count(skip: int = skip) -> None:
+                await deal_repo.get_organization_deals_with_total(
+                    organization_id, skip, args.page_size
+                )
+
+            print(f"page {page:>3}: two queries  {await measure(two_queries, args.repeat)}")
+            print(f"page {page:>3}: window count {await measure(window_count, args.repeat)}")
+
+            session.expunge_all()
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,76 @@
+"""
+Задержка event loop для остальных запросов, пока выполняются логины.
+
+Фоновая корутина-зонд просыпается каждые 5 мс и измеряет, насколько она опоздала.
+Запуск: python -m benchmarks.password_hashing --logins 32 --workers 4
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from collections.abc import Awaitable, Callable
+
+from app.core.config import settings
+from app.core.security import get_password_hash, verify_password, verify_password_async
+
+PROBE_INTERVAL = 0.005
+
+
+async def blocking_login(hashed_password: str) -> bool:
+    # Поведение до переноса хеширования в пул потоков
+    return verify_password("Password123", hashed_password)
+
+
+async def offloaded_login(hashed_password: str) -> bool:
+    return await verify_password_async("Password123", hashed_password)
+
+
+async def probe(stop: asyncio.Event, lags: list[float]) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append((time.perf_counter() - started - PROBE_INTERVAL) * 1000)
+
+
+async def measure(
+    login: Callable[[str], Awaitable[bool]], hashed_password: str, logins: int
+) -> tuple[float, list[float]]:
+    stop = asyncio.Event()
+    lags: list[float] = []
+    probe_task = asyncio.create_task(probe(stop, lags))
+    await asyncio.sleep(PROBE_INTERVAL * 2)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(login(hashed_password) for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await probe_task
+    return elapsed, lags
+
+
+def report(name: str, elapsed: float, lags: list[float]) -> None:
+    lags = sorted(lags)
+    p99 = lags[int(len(lags) * 0.99) - 1] if len(lags) > 1 else lags[0]
+    print(
+        f"{name:<10} logins: {elapsed * 1000:8.1f} ms | event loop lag "
+        f"p50 {statistics.median(lags):7.2f} ms, p99 {p99:7.2f} ms, max {lags[-1]:7.2f} ms"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=settings.PASSWORD_HASHING_WORKERS)
+    args = parser.parse_args()
+
+    settings.PASSWORD_HASHING_WORKERS = args.workers
+    hashed_password = get_password_hash("Password123")
+
+    report("blocking", *await measure(blocking_login, hashed_password, args.logins))
+    report("offloaded", *await measure(offloaded_login, hashed_password, args.logins))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
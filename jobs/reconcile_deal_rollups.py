@@ -0,0 +1,51 @@
+"""
+Сверка агрегатов deal_rollups и deal_daily_rollups с таблицей deals.
+
+Пересчитывает агрегаты с нуля, печатает расхождения и сохраняет пересчитанные
+значения. Кэш аналитики организаций с расхождениями инвалидируется.
+Код выхода 1, если расхождения найдены, - для запуска по расписанию с алертом.
+
+Запуск: python -m jobs.reconcile_deal_rollups [--organization-id N] [--dry-run]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+
+from sqlalchemy import text
+
+from app.core.data_version import bump_analytics_generation
+from app.database.session import AsyncSessionLocal, engine
+from app.repositories import DealRollupRepository
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--organization-id", type=int, default=None)
+    parser.add_argument(
+        "--dry-run", action="store_true", help="only report drift, keep stored rollups"
+    )
+    args = parser.parse_args()
+
+    async with AsyncSessionLocal() as session:
+        # Полный пересчет по большой таблице может не уложиться в statement_timeout
+        await session.execute(text("SET LOCAL statement_timeout = 0"))
+        drift = await DealRollupRepository(session).rebuild(
+            args.organization_id, commit=not args.dry_run
+        )
+
+    for item in drift:
+        print(json.dumps(item, default=str))
+
+    if not args.dry_run:
+        for organization_id in sorted({item["organization_id"] for item in drift}):
+            await bump_analytics_generation(organization_id)
+
+    print(f"{len(drift)} rollup rows drifted", file=sys.stderr)
+    await engine.dispose()
+    return 1 if drift else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -1,15 +1,16 @@
 import asyncio
 import os
 from collections.abc import AsyncGenerator, Generator
-from unittest.mock import AsyncMock, patch
+from unittest.mock import patch
 
 import pytest
 import pytest_asyncio
 from fastapi.testclient import TestClient
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.pool import NullPool
 
-from app.core.cache import cache_manager
+from app.core.cache import InMemoryBackend, cache_manager
 from app.database.base import Base
 from app.database.session import get_db
 from app.main import app
@@ -45,6 +46,8 @@ async def test_engine():
     # Создаем все таблицы
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
+        # Триграммные индексы контактов требуют расширения pg_trgm
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
         await conn.run_sync(Base.metadata.create_all)
 
     yield engine
@@ -70,12 +73,6 @@ async def test_session(test_engine) -> AsyncGenerator[AsyncSession, None]:
 
 @pytest.fixture
 def client(test_engine) -> Generator[TestClient, None, None]:
-    mock_redis = AsyncMock()
-    mock_redis.get = AsyncMock(return_value=None)
-    mock_redis.setex = AsyncMock()
-    mock_redis.delete = AsyncMock()
-    mock_redis.keys = AsyncMock(return_value=[])
-
     async_session = async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
 
     async def override_get_db():
@@ -85,8 +82,8 @@ def client(test_engine) -> Generator[TestClient, None, None]:
             finally:
                 await session.close()
 
-    # Mock для cache_manager
-    with patch.object(cache_manager, "get_redis", return_value=mock_redis):
+    # Кэш в памяти процесса вместо Redis
+    with patch.object(cache_manager, "backend", InMemoryBackend(maxsize=10_000)):
         app.dependency_overrides[get_db] = override_get_db
 
         with TestClient(app) as test_client:
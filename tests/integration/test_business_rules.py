@@ -170,6 +170,35 @@ class TestBusinessRules:
 
         assert response.status_code == 204
 
+    def test_bulk_delete_contacts_is_all_or_nothing(self, client: TestClient):
+        """Тест: массовое удаление не удаляет ничего, если у одного из контактов есть сделки"""
+        headers = self._register_and_login(client, "_bulk_delete")
+        if not headers:
+            pytest.skip("Failed to register and login")
+
+        free_contact_id = self._create_test_contact(client, headers, "_bulk_free")
+        busy_contact_id = self._create_test_contact(client, headers, "_bulk_busy")
+        if not free_contact_id or not busy_contact_id:
+            pytest.skip("Failed to create contacts")
+
+        if not self._create_test_deal(client, headers, busy_contact_id, amount=1000.0):
+            pytest.skip("Failed to create deal")
+
+        response = client.post(
+            "/api/v1/contacts/bulk-delete",
+            json={"ids": [free_contact_id, busy_contact_id]},
+            headers=headers,
+        )
+        assert response.status_code == 409
+
+        response = client.post(
+            "/api/v1/contacts/bulk-delete", json={"ids": [free_contact_id]}, headers=headers
+        )
+        assert response.status_code == 204
+
+        response = client.delete(f"/api/v1/contacts/{free_contact_id}", headers=headers)
+        assert response.status_code == 404
+
     def test_can_close_deal_with_positive_amount(self, client: TestClient):
         """Тест: можно закрыть сделку с amount > 0"""
         # Регистрируем пользователя
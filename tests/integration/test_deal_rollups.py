@@ -0,0 +1,66 @@
+# tests/integration/test_deal_rollups.py
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+
+from sqlalchemy import update
+
+from app.models import Contact, DealRollup, Organization, User
+from app.repositories import DealRepository, DealRollupRepository
+
+
+async def _seed_organization(session) -> dict:
+    suffix = uuid.uuid4().hex[:8]
+    user = User(email=f"rollups-{suffix}@example.com", hashed_password="-", name="Rollups")
+    organization = Organization(name=f"Rollups {suffix}")
+    session.add_all([user, organization])
+    await session.flush()
+
+    contact = Contact(organization_id=organization.id, owner_id=user.id, name="Contact")
+    session.add(contact)
+    await session.commit()
+    return {"organization_id": organization.id, "owner_id": user.id, "contact_id": contact.id}
+
+
+class TestDealRollups:
+    async def test_deal_writes_keep_rollups_in_sync(self, test_session):
+        data = await _seed_organization(test_session)
+        deal_repo = DealRepository(test_session)
+        rollup_repo = DealRollupRepository(test_session)
+
+        first = await deal_repo.create({**data, "title": "First", "amount": Decimal("100")})
+        second = await deal_repo.create({**data, "title": "Second", "amount": Decimal("50")})
+        await deal_repo.create({**data, "title": "Third"})
+        await deal_repo.update(first.id, {"status": "won", "stage": "closed"})
+        await deal_repo.update(second.id, {"amount": Decimal("70"), "currency": "EUR"})
+        await deal_repo.delete(second.id)
+
+        totals = {
+            row[0]: row[1:] for row in await rollup_repo.get_status_totals(data["organization_id"])
+        }
+        assert totals == {
+            "won": (1, Decimal("100"), 1, Decimal("100")),
+            "new": (1, Decimal("0"), 0, Decimal("0")),
+        }
+        histogram = await rollup_repo.get_new_deal_histogram(
+            data["organization_id"], date.today() - timedelta(days=1)
+        )
+        assert sum(histogram.values()) == 1
+        assert await rollup_repo.rebuild(data["organization_id"], commit=False) == []
+
+    async def test_rebuild_reports_and_fixes_drift(self, test_session):
+        data = await _seed_organization(test_session)
+        await DealRepository(test_session).create({**data, "title": "Deal"})
+        await test_session.execute(
+            update(DealRollup)
+            .where(DealRollup.organization_id == data["organization_id"])
+            .values(deal_count=5)
+        )
+        await test_session.commit()
+
+        rollup_repo = DealRollupRepository(test_session)
+        [drift] = await rollup_repo.rebuild(data["organization_id"])
+
+        assert drift["expected"]["deal_count"] == 1
+        assert drift["actual"]["deal_count"] == 5
+        assert await rollup_repo.rebuild(data["organization_id"], commit=False) == []
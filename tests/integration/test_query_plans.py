@@ -0,0 +1,146 @@
+# tests/integration/test_query_plans.py
+"""
+Регрессионные тесты планов запросов: каждый горячий запрос репозиториев
+должен обслуживаться индексами, а не последовательным сканированием.
+
+На маленьких тестовых таблицах seq scan дешевле любого индекса, поэтому
+перед EXPLAIN выставляется enable_seqscan = off: планировщик выбирает
+seq scan только тогда, когда подходящего индекса нет
+"""
+
+import uuid
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import Select, select, text
+
+from app.models import Activity, Contact, Deal, Organization, OrganizationMember, Task, User
+from app.repositories.activity import ActivityRepository
+from app.repositories.contact import ContactRepository
+from app.repositories.deal import DealRepository
+from app.repositories.task import TaskRepository
+
+
+async def _explain(session, query: Select) -> str:
+    conn = await session.connection()
+    compiled = query.compile(dialect=conn.dialect, compile_kwargs={"render_postcompile": True})
+    params = tuple(compiled.params[name] for name in compiled.positiontup or ())
+
+    await conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    result = await conn.exec_driver_sql(f"EXPLAIN {compiled.string}", params)
+    return "\n".join(row[0] for row in result)
+
+
+@pytest.fixture
+async def seeded(test_session):
+    suffix = uuid.uuid4().hex[:8]
+    user = User(email=f"plans-{suffix}@example.com", hashed_password="-", name="Plans")
+    organization = Organization(name=f"Plans {suffix}")
+    test_session.add_all([user, organization])
+    await test_session.flush()
+
+    test_session.add(
+        OrganizationMember(organization_id=organization.id, user_id=user.id, role="owner")
+    )
+    contacts = [
+        Contact(organization_id=organization.id, owner_id=user.id, name=f"Contact {i}")
+        for i in range(20)
+    ]
+    test_session.add_all(contacts)
+    await test_session.flush()
+
+    deals = [
+        Deal(
+            organization_id=organization.id,
+            contact_id=contacts[i % len(contacts)].id,
+            owner_id=user.id,
+            title=f"Deal {i}",
+            amount=Decimal(i * 100) if i % 5 else None,
+        )
+        for i in range(50)
+    ]
+    test_session.add_all(deals)
+    await test_session.flush()
+
+    test_session.add_all(
+        [Task(deal_id=deal.id, title=f"Task for {deal.title}") for deal in deals]
+        + [Activity(deal_id=deal.id, type="comment", payload={"text": "hi"}) for deal in deals]
+    )
+    await test_session.commit()
+    await test_session.execute(text("ANALYZE"))
+
+    return {
+        "organization_id": organization.id,
+        "user_id": user.id,
+        "contact_id": contacts[0].id,
+        "deal_id": deals[0].id,
+    }
+
+
+def _hot_queries(session, data: dict) -> dict[str, Select]:
+    organization_id = data["organization_id"]
+    user_id = data["user_id"]
+    deal_id = data["deal_id"]
+    cursor_at = (datetime.now(UTC) - timedelta(days=1), 1_000_000)
+
+    deals = DealRepository(session)
+    contacts = ContactRepository(session)
+    tasks = TaskRepository(session)
+    activities = ActivityRepository(session)
+
+    return {
+        "deals by created_at": deals._apply_order(
+            deals._organization_deals_query(organization_id), "created_at", "desc"
+        ).limit(20),
+        "deals by amount": deals._apply_order(
+            deals._organization_deals_query(organization_id, status=["new", "won"]),
+            "amount",
+            "asc",
+        ).limit(20),
+        "deals after cursor": deals._apply_order(
+            deals._organization_deals_query(organization_id), "created_at", "desc", cursor_at
+        ).limit(20),
+        "deals of member": deals._apply_order(
+            deals._organization_deals_query(organization_id, owner_id=user_id),
+            "created_at",
+            "desc",
+        ).limit(20),
+        "deals of contact": select(Deal.id).where(Deal.contact_id == data["contact_id"]),
+        "contacts": contacts._order_by_keyset(
+            contacts._organization_contacts_query(organization_id), Contact.created_at
+        ).limit(20),
+        "contacts of member": contacts._order_by_keyset(
+            contacts._organization_contacts_query(organization_id, owner_id=user_id),
+            Contact.created_at,
+        ).limit(20),
+        "contacts search": contacts._apply_order(
+            contacts._organization_contacts_query(organization_id, search="contact 1"),
+            search="contact 1",
+        ).limit(20),
+        "tasks": tasks._order_by_keyset(
+            tasks._organization_tasks_query(organization_id), Task.created_at
+        ).limit(20),
+        "tasks of deal": tasks._order_by_keyset(
+            tasks._organization_tasks_query(organization_id, deal_id=deal_id), Task.created_at
+        ).limit(20),
+        "activities of deal": activities._order_by_keyset(
+            activities._deal_activities_query(deal_id, organization_id), Activity.created_at
+        ).limit(20),
+        "organizations of user": select(Organization, OrganizationMember.role)
+        .join(OrganizationMember, OrganizationMember.organization_id == Organization.id)
+        .where(OrganizationMember.user_id == user_id)
+        .order_by(Organization.id),
+    }
+
+
+class TestQueryPlans:
+    async def test_hot_queries_do_not_use_seq_scan(self, test_session, seeded):
+        failures = {}
+        for name, query in _hot_queries(test_session, seeded).items():
+            plan = await _explain(test_session, query)
+            if "Seq Scan" in plan:
+                failures[name] = plan
+            await test_session.rollback()
+
+        assert not failures, "\n\n".join(f"{name}:\n{plan}" for name, plan in failures.items())
@@ -0,0 +1,182 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+import redis.asyncio as redis
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.dependencies import get_organization_context, get_read_db, verify_monitoring_token
+from app.core.cache import CacheManager, InMemoryBackend, membership_cache, user_cache
+from app.core.data_version import mark_recent_write
+from app.core.exceptions import UserNotMemberOfOrganizationException
+from app.schemas.dto import CurrentUserDTO
+from tests.utils import create_test_token
+
+
+@pytest.fixture(autouse=True)
+def clear_auth_caches():
+    user_cache.clear()
+    membership_cache.local.clear()
+    yield
+    user_cache.clear()
+    membership_cache.local.clear()
+
+
+@pytest.fixture
+def shared_backend() -> InMemoryBackend:
+    # Общий для воркеров Redis
+    return InMemoryBackend(maxsize=100)
+
+
+def worker_cache(backend) -> CacheManager:
+    return CacheManager(local_maxsize=10, local_ttl=30, backend=backend)
+
+
+def make_user(user_id: int) -> MagicMock:
+    user = MagicMock(id=user_id, email=f"user{user_id}@example.com", is_active=True)
+    user.name = f"User {user_id}"
+    return user
+
+
+def make_credentials(user_id: int) -> HTTPAuthorizationCredentials:
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=create_test_token(user_id))
+
+
+class TestGetOrganizationContext:
+    @pytest.mark.asyncio
+    async def test_resolves_user_and_role_in_one_query(self):
+        mock_db = AsyncMock(spec=AsyncSession)
+        mock_result = MagicMock()
+        mock_result.first.return_value = (make_user(1), "admin")
+        mock_db.execute.return_value = mock_result
+
+        org_context = await get_organization_context(10, make_credentials(1), mock_db)
+
+        assert org_context["organization_id"] == 10
+        assert org_context["user_role"] == "admin"
+        assert org_context["user"].id == 1
+        assert mock_db.execute.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_repeat_request_is_served_from_cache(self):
+        mock_db = AsyncMock(spec=AsyncSession)
+        mock_result = MagicMock()
+        mock_result.first.return_value = (make_user(1), "member")
+        mock_db.execute.return_value = mock_result
+        credentials = make_credentials(1)
+
+        await get_organization_context(10, credentials, mock_db)
+        org_context = await get_organization_context(10, credentials, mock_db)
+
+        assert org_context["user_role"] == "member"
+        assert mock_db.execute.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_cache_keeps_user_fields_instead_of_orm_object(self):
+        mock_db = AsyncMock(spec=AsyncSession)
+        mock_result = MagicMock()
+        mock_result.first.return_value = (make_user(1), "member")
+        mock_db.execute.return_value = mock_result
+        credentials = make_credentials(1)
+
+        await get_organization_context(10, credentials, mock_db)
+
+        assert user_cache.get(credentials.credentials) == CurrentUserDTO(
+            id=1, email="user1@example.com", name="User 1"
+        )
+
+    @pytest.mark.asyncio
+    async def test_non_member_is_rejected(self):
+        mock_db = AsyncMock(spec=AsyncSession)
+        mock_result = MagicMock()
+        mock_result.first.return_value = (make_user(1), None)
+        mock_db.execute.return_value = mock_result
+
+        with pytest.raises(UserNotMemberOfOrganizationException):
+            await get_organization_context(10, make_credentials(1), mock_db)
+
+
+class TestGetReadDb:
+    @pytest.mark.asyncio
+    async def test_uses_primary_without_replica(self):
+        primary_db = AsyncMock(spec=AsyncSession)
+        org_context = {"user": MagicMock(id=1)}
+
+        with patch("app.api.dependencies.ReplicaSessionLocal", None):
+            sessions = [session async for session in get_read_db(org_context, primary_db)]
+
+        assert sessions == [primary_db]
+
+    @pytest.mark.asyncio
+    async def test_uses_replica_for_readers(self, shared_backend):
+        primary_db = AsyncMock(spec=AsyncSession)
+        replica_db = AsyncMock(spec=AsyncSession)
+        replica_factory = MagicMock()
+        replica_factory.return_value.__aenter__.return_value = replica_db
+        org_context = {"user": MagicMock(id=2)}
+
+        with (
+            patch("app.core.data_version.cache_manager", worker_cache(shared_backend)),
+            patch("app.api.dependencies.ReplicaSessionLocal", replica_factory),
+        ):
+            sessions = [session async for session in get_read_db(org_context, primary_db)]
+
+        assert sessions == [replica_db]
+
+    @pytest.mark.asyncio
+    async def test_write_in_another_worker_sends_reads_to_primary(self, shared_backend):
+        primary_db = AsyncMock(spec=AsyncSession)
+        replica_factory = MagicMock()
+        org_context = {"user": MagicMock(id=3)}
+
+        # Запись обработал другой воркер со своим CacheManager
+        with patch("app.core.data_version.cache_manager", worker_cache(shared_backend)):
+            await mark_recent_write(3)
+
+        with (
+            patch("app.core.data_version.cache_manager", worker_cache(shared_backend)),
+            patch("app.api.dependencies.ReplicaSessionLocal", replica_factory),
+        ):
+            sessions = [session async for session in get_read_db(org_context, primary_db)]
+
+        assert sessions == [primary_db]
+        replica_factory.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_unavailable_redis_sends_reads_to_primary(self):
+        primary_db = AsyncMock(spec=AsyncSession)
+        replica_factory = MagicMock()
+        org_context = {"user": MagicMock(id=4)}
+        backend = MagicMock()
+        backend.available = AsyncMock(side_effect=redis.ConnectionError("down"))
+
+        with (
+            patch("app.core.data_version.cache_manager", worker_cache(backend)),
+            patch("app.api.dependencies.ReplicaSessionLocal", replica_factory),
+        ):
+            sessions = [session async for session in get_read_db(org_context, primary_db)]
+
+        assert sessions == [primary_db]
+        replica_factory.assert_not_called()
+
+
+class TestVerifyMonitoringToken:
+    @pytest.mark.asyncio
+    async def test_valid_token_is_accepted(self):
+        with patch("app.api.dependencies.settings.MONITORING_TOKEN", "secret"):
+            await verify_monitoring_token("secret")
+
+    @pytest.mark.asyncio
+    async def test_missing_or_wrong_token_is_rejected(self):
+        with patch("app.api.dependencies.settings.MONITORING_TOKEN", "secret"):
+            for token in (None, "wrong"):
+                with pytest.raises(HTTPException) as exc_info:
+                    await verify_monitoring_token(token)
+                assert exc_info.value.status_code == 403
+
+    @pytest.mark.asyncio
+    async def test_endpoints_are_closed_without_configured_token(self):
+        with patch("app.api.dependencies.settings.MONITORING_TOKEN", None):
+            with pytest.raises(HTTPException):
+                await verify_monitoring_token("")
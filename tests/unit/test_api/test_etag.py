@@ -0,0 +1,149 @@
+from unittest.mock import ANY, AsyncMock, MagicMock, patch
+
+import pytest
+import redis.asyncio as redis
+from starlette.requests import Request
+
+from app.api.etag import get_etag, not_modified
+from app.core.data_version import (
+    bump_analytics_generation,
+    bump_data_version,
+    get_data_version,
+)
+from app.repositories import ContactRepository, DealRepository
+
+
+def make_request(path: str = "/api/v1/deals/", query: str = "", if_none_match: str | None = None):
+    headers = [] if if_none_match is None else [(b"if-none-match", if_none_match.encode())]
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": path,
+            "query_string": query.encode(),
+            "headers": headers,
+        }
+    )
+
+
+def make_context(user_id: int = 1, role: str = "member") -> dict:
+    return {"organization_id": 10, "user": MagicMock(id=user_id), "user_role": role}
+
+
+class TestDataVersion:
+    @pytest.mark.asyncio
+    async def test_missing_version_is_initialized_once(self):
+        mock_redis = AsyncMock()
+        mock_redis.get.side_effect = [None, "42"]
+        mock_redis.set.return_value = False
+
+        with patch("app.core.data_version.cache_manager.get_backend", return_value=mock_redis):
+            assert await get_data_version(10) == 42
+
+        assert mock_redis.set.call_args.kwargs == {"nx": True}
+
+    @pytest.mark.asyncio
+    async def test_unavailable_redis_disables_versions(self):
+        mock_redis = AsyncMock()
+        mock_redis.get.side_effect = redis.ConnectionError()
+        mock_redis.set.side_effect = redis.ConnectionError()
+
+        with patch("app.core.data_version.cache_manager.get_backend", return_value=mock_redis):
+            assert await get_data_version(10) is None
+            await bump_data_version(10)
+
+        # Пропущенная смена версии отмечается при первом обращении после восстановления
+        healthy_redis = AsyncMock()
+        healthy_redis.get.return_value = "7"
+        with patch("app.core.data_version.cache_manager.get_backend", return_value=healthy_redis):
+            assert await get_data_version(10) == 7
+
+        healthy_redis.set.assert_called_once_with("data_version:10", ANY)
+
+    @pytest.mark.asyncio
+    async def test_repository_write_bumps_version_of_request_organization(self):
+        mock_db = AsyncMock()
+        mock_db.info = {"organization_id": 10}
+        mock_db.execute.return_value = MagicMock(rowcount=1)
+
+        with patch("app.repositories.base.bump_data_version") as mock_bump:
+            await ContactRepository(mock_db).delete(5)
+            mock_bump.assert_awaited_once_with(10)
+
+            mock_db.info = {}
+            await ContactRepository(mock_db).delete(5)
+            assert mock_bump.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_deal_write_changes_analytics_generation_before_version(self):
+        mock_db = AsyncMock()
+        mock_db.info = {"organization_id": 10}
+        mock_db.execute.return_value = MagicMock()
+        mock_db.execute.return_value.mappings.return_value.first.return_value = None
+        calls = AsyncMock()
+
+        with (
+            patch("app.repositories.deal.bump_analytics_generation", calls.generation),
+            patch("app.repositories.base.bump_data_version", calls.version),
+        ):
+            await DealRepository(mock_db).delete(5)
+
+        assert [name for name, *_ in calls.mock_calls] == ["generation", "version"]
+
+    @pytest.mark.asyncio
+    async def test_lost_analytics_generation_restarts_from_current_time(self):
+        mock_redis = AsyncMock()
+        mock_redis.incr.return_value = 1
+
+        with (
+            patch("app.core.data_version.cache_manager.get_backend", return_value=mock_redis),
+            patch("app.core.data_version.time.time_ns", return_value=123),
+        ):
+            await bump_analytics_generation(10)
+
+        mock_redis.set.assert_called_once_with("analytics_generation:10", 123)
+
+
+class TestETag:
+    @pytest.mark.asyncio
+    async def test_etag_depends_on_version_user_and_query(self):
+        with patch("app.api.etag.get_data_version", return_value=1):
+            etag = await get_etag(make_request(query="page=1"), make_context())
+            assert etag == await get_etag(make_request(query="page=1"), make_context())
+            assert etag != await get_etag(make_request(query="page=2"), make_context())
+            assert etag != await get_etag(make_request(query="page=1"), make_context(user_id=2))
+
+        with patch("app.api.etag.get_data_version", return_value=2):
+            assert etag != await get_etag(make_request(query="page=1"), make_context())
+
+        assert etag.startswith('W/"')
+
+    @pytest.mark.asyncio
+    async def test_no_etag_without_version(self):
+        with patch("app.api.etag.get_data_version", return_value=None):
+            assert await get_etag(make_request(), make_context()) is None
+
+    @pytest.mark.asyncio
+    async def test_no_etag_while_replica_may_lag(self):
+        with (
+            patch("app.api.etag.ReplicaSessionLocal", MagicMock()),
+            patch("app.api.etag.time.time_ns", return_value=10_000_000_000),
+        ):
+            with patch("app.api.etag.get_data_version", return_value=9_000_000_000):
+                assert await get_etag(make_request(), make_context()) is None
+            with patch("app.api.etag.get_data_version", return_value=1):
+                assert await get_etag(make_request(), make_context()) is not None
+
+    def test_not_modified(self):
+        etag = 'W/"abc"'
+
+        response = not_modified(make_request(if_none_match='"other", W/"abc"'), etag)
+        assert response is not None
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+
+        assert not_modified(make_request(if_none_match='"abc"'), etag) is not None
+        assert not_modified(make_request(if_none_match="*"), etag) is not None
+        assert not_modified(make_request(if_none_match='W/"old"'), etag) is None
+        assert not_modified(make_request(), etag) is None
+        assert not_modified(make_request(if_none_match=etag), None) is None
@@ -0,0 +1,59 @@
+import json
+from datetime import UTC, datetime
+from decimal import Decimal
+
+import pytest
+
+from app.api.responses import ORJSONPageResponse
+from app.schemas import ActivityListResponse, DealListResponse
+from app.services.pagination import build_page
+
+
+def deal_item(deal_id: int, amount: Decimal | None) -> dict:
+    return {
+        "id": deal_id,
+        "organization_id": 1,
+        "contact_id": 2,
+        "owner_id": 3,
+        "title": f"Deal {deal_id}",
+        "amount": amount,
+        "currency": "USD",
+        "status": "new",
+        "stage": "qualification",
+        "description": None,
+        "created_at": datetime(2025, 1, 2, 3, 4, 5, 123456, tzinfo=UTC),
+        "updated_at": None,
+        "contact_name": "Acme",
+        "owner_name": "Alice",
+    }
+
+
+class TestORJSONPageResponse:
+    @pytest.mark.parametrize("amount", [Decimal("1000.00"), Decimal("0.5"), None])
+    def test_matches_pydantic_serialization(self, amount):
+        page = build_page([deal_item(1, amount), deal_item(2, amount)], 2, 1, 100)
+
+        body = json.loads(ORJSONPageResponse(page).body)
+
+        assert body == json.loads(DealListResponse.model_validate(page).model_dump_json())
+
+    def test_nested_payload(self):
+        item = {
+            "id": 1,
+            "deal_id": 1,
+            "author_id": None,
+            "type": "comment",
+            "payload": {"text": "hi", "tags": ["a"]},
+            "created_at": datetime(2025, 1, 2, tzinfo=UTC),
+            "author_name": "System",
+        }
+        page = build_page([item], None, 1, 100, next_cursor="abc")
+
+        body = json.loads(ORJSONPageResponse(page).body)
+
+        assert body == json.loads(ActivityListResponse.model_validate(page).model_dump_json())
+        assert body["items"][0]["created_at"] == "2025-01-02T00:00:00Z"
+
+    def test_unknown_type_is_rejected(self):
+        with pytest.raises(TypeError):
+            ORJSONPageResponse({"value": object()})
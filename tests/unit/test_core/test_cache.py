@@ -0,0 +1,401 @@
+import asyncio
+import json
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+import redis.asyncio as redis
+
+from app.core.cache import (
+    CacheBackend,
+    CacheManager,
+    CircuitBreakerBackend,
+    CircuitOpenError,
+    InMemoryBackend,
+    MembershipCache,
+    RedisBackend,
+    TTLCache,
+    create_backend,
+)
+from app.core.config import settings
+
+
+class TestTTLCache:
+    def test_get_set_counts_hits_and_misses(self):
+        cache = TTLCache(maxsize=10, ttl=60)
+
+        assert cache.get("token") is None
+        cache.set("token", "user")
+
+        assert cache.get("token") == "user"
+        assert cache.stats["hits"] == 1
+        assert cache.stats["misses"] == 1
+        assert cache.stats["hit_ratio"] == 0.5
+
+    def test_expired_entry_is_a_miss(self):
+        cache = TTLCache(maxsize=10, ttl=60)
+
+        with patch("app.core.cache.time.monotonic", return_value=1000.0):
+            cache.set("token", "user", ttl=5)
+
+        with patch("app.core.cache.time.monotonic", return_value=1006.0):
+            assert cache.get("token") is None
+
+        assert len(cache) == 0
+        assert cache.misses == 1
+
+    def test_evicts_least_recently_used(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_non_positive_ttl_is_not_stored(self):
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set("token", "user", ttl=0)
+
+        assert len(cache) == 0
+
+
+class TestMembershipCache:
+    @pytest.mark.asyncio
+    async def test_redis_tier_fills_local_tier(self):
+        membership_cache = MembershipCache(maxsize=10, ttl=60, use_redis=True)
+        mock_redis = AsyncMock()
+        mock_redis.get.return_value = "admin"
+
+        with patch("app.core.cache.cache_manager.get_backend", return_value=mock_redis):
+            assert await membership_cache.get(1, 2) == "admin"
+            assert await membership_cache.get(1, 2) == "admin"
+
+        mock_redis.get.assert_called_once_with("membership:1:2")
+
+    @pytest.mark.asyncio
+    async def test_set_writes_both_tiers_with_ttl(self):
+        membership_cache = MembershipCache(maxsize=10, ttl=60, use_redis=True)
+        mock_redis = AsyncMock()
+
+        with patch("app.core.cache.cache_manager.get_backend", return_value=mock_redis):
+            await membership_cache.set(1, 2, "member")
+            assert await membership_cache.get(1, 2) == "member"
+
+        mock_redis.setex.assert_called_once_with("membership:1:2", 60, "member")
+        mock_redis.get.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_redis_errors_are_treated_as_miss(self):
+        membership_cache = MembershipCache(maxsize=10, ttl=60, use_redis=True)
+        mock_redis = AsyncMock()
+        mock_redis.get.side_effect = redis.ConnectionError()
+
+        with patch("app.core.cache.cache_manager.get_backend", return_value=mock_redis):
+            assert await membership_cache.get(1, 2) is None
+
+
+class TestCacheManager:
+    @staticmethod
+    def _manager(mock_redis, **kwargs) -> CacheManager:
+        return CacheManager(
+            local_maxsize=10, local_ttl=30, default_ttl=300, backend=mock_redis, **kwargs
+        )
+
+    @pytest.mark.asyncio
+    async def test_local_tier_serves_repeated_reads(self):
+        mock_redis = AsyncMock()
+        mock_redis.get.return_value = json.dumps({"total": 3})
+        manager = self._manager(mock_redis)
+
+        assert await manager.get("summary", "1") == {"total": 3}
+        assert await manager.get("summary", "1") == {"total": 3}
+        assert await manager.get("summary", "2") == {"total": 3}
+
+        assert mock_redis.get.call_count == 2
+        stats = manager.stats.snapshot()["summary"]
+        assert stats["local_hits"] == 1
+        assert stats["redis_hits"] == 2
+        assert stats["hit_ratio"] == 1.0
+        assert stats["local_hit_ratio"] == 0.3333
+
+    @pytest.mark.asyncio
+    async def test_miss_is_counted_and_not_stored_locally(self):
+        mock_redis = AsyncMock()
+        mock_redis.get.return_value = None
+        manager = self._manager(mock_redis)
+
+        assert await manager.get("summary", "1") is None
+
+        assert len(manager.local) == 0
+        assert manager.stats.snapshot()["summary"]["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_set_uses_namespace_ttl_and_publishes_invalidation(self):
+        mock_redis = AsyncMock()
+        manager = self._manager(mock_redis, channel="invalidate")
+        manager.register_namespace("summary", 60)
+
+        await manager.set("summary", "1", {"amount": Decimal("10.5")})
+        await manager.set("other", "1", {"amount": 1})
+
+        # Локальная копия - в том же виде, что и в Redis
+        assert await manager.get("summary", "1") == {"amount": "10.5"}
+        assert mock_redis.setex.call_args_list[0].args[:2] == ("summary:1", 60)
+        assert mock_redis.setex.call_args_list[1].args[:2] == ("other:1", 300)
+        channel, message = mock_redis.publish.call_args_list[0].args
+        assert channel == "invalidate"
+        assert json.loads(message)["namespace"] == "summary"
+        assert json.loads(message)["key"] == "1"
+
+    @pytest.mark.asyncio
+    async def test_invalidation_from_another_worker_drops_local_copy(self):
+        first = self._manager(AsyncMock())
+        second = self._manager(AsyncMock())
+        await first.set("summary", "1", {"total": 1})
+        await second.set("summary", "1", {"total": 2})
+
+        message = first.backend.publish.call_args.args[1]
+        first.apply_invalidation(message)
+        second.apply_invalidation(message)
+
+        # Собственное сообщение не сбрасывает только что записанное значение
+        assert first.local.get(("summary", "1")) == {"total": 1}
+        assert second.local.get(("summary", "1")) is None
+
+    @pytest.mark.asyncio
+    async def test_delete_clears_both_tiers(self):
+        mock_redis = AsyncMock()
+        manager = self._manager(mock_redis)
+        await manager.set("summary", "1", {"total": 1})
+
+        await manager.delete("summary", "1")
+
+        assert manager.local.get(("summary", "1")) is None
+        mock_redis.delete.assert_called_once_with("summary:1")
+        assert mock_redis.publish.call_count == 2
+
+    def test_malformed_invalidation_message_is_ignored(self):
+        manager = self._manager(AsyncMock())
+
+        manager.apply_invalidation("not json")
+        manager.apply_invalidation(json.dumps({"origin": "other"}))
+
+
+class TestCacheBackend:
+    def test_incomplete_backend_cannot_be_created(self):
+        class GetOnlyBackend(CacheBackend):
+            async def get(self, key):
+                return None
+
+        with pytest.raises(TypeError):
+            GetOnlyBackend()
+
+
+class TestInMemoryBackend:
+    @pytest.mark.asyncio
+    async def test_set_nx_incr_and_lock_release(self):
+        backend = InMemoryBackend(maxsize=10)
+
+        assert await backend.set("lock", "token-1", ex=10, nx=True) is True
+        assert await backend.set("lock", "token-2", ex=10, nx=True) is False
+        assert await backend.release_lock("lock", "token-2") is False
+        assert await backend.release_lock("lock", "token-1") is True
+        assert await backend.get("lock") is None
+
+        assert await backend.incr("counter") == 1
+        assert await backend.incr("counter") == 2
+        assert await backend.get("counter") == "2"
+
+    @pytest.mark.asyncio
+    async def test_max_ttl_caps_every_entry(self):
+        backend = InMemoryBackend(maxsize=10, max_ttl=5)
+
+        with patch("app.core.cache.time.monotonic", return_value=1000.0):
+            await backend.set("version", 1)
+            await backend.setex("summary", 300, "{}")
+
+        with patch("app.core.cache.time.monotonic", return_value=1006.0):
+            assert await backend.get("version") is None
+            assert await backend.get("summary") is None
+
+
+class TestCircuitBreakerBackend:
+    @staticmethod
+    def _breaker(primary) -> CircuitBreakerBackend:
+        return CircuitBreakerBackend(
+            primary, InMemoryBackend(maxsize=10), failure_threshold=2, reset_seconds=5
+        )
+
+    @pytest.mark.asyncio
+    async def test_opens_after_consecutive_failures_and_uses_fallback(self):
+        primary = AsyncMock()
+        primary.get.side_effect = redis.ConnectionError()
+        breaker = self._breaker(primary)
+
+        # Пока размыкатель замкнут, ошибки пробрасываются
+        for _ in range(2):
+            with pytest.raises(redis.ConnectionError):
+                await breaker.get("key")
+
+        assert breaker.is_open
+        assert await breaker.set("key", "value") is True
+        assert await breaker.get("key") == "value"
+        assert primary.get.call_count == 2
+        primary.set.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_success_resets_failure_count(self):
+        primary = AsyncMock()
+        primary.get.side_effect = [redis.ConnectionError(), "value", redis.ConnectionError()]
+        breaker = self._breaker(primary)
+
+        with pytest.raises(redis.ConnectionError):
+            await breaker.get("key")
+        assert await breaker.get("key") == "value"
+        with pytest.raises(redis.ConnectionError):
+            await breaker.get("key")
+
+        assert not breaker.is_open
+
+    @pytest.mark.asyncio
+    async def test_probe_after_reset_closes_circuit_and_clears_fallback(self):
+        primary = AsyncMock()
+        primary.get.side_effect = redis.ConnectionError()
+        breaker = self._breaker(primary)
+
+        with patch("app.core.cache.time.monotonic", return_value=1000.0):
+            for _ in range(2):
+                with pytest.raises(redis.ConnectionError):
+                    await breaker.get("key")
+            await breaker.set("key", "stale")
+
+        primary.ping.side_effect = redis.ConnectionError()
+        with patch("app.core.cache.time.monotonic", return_value=1006.0):
+            assert await breaker.available() is False
+        # Неудачная проверка откладывает следующую еще на reset_seconds
+        with patch("app.core.cache.time.monotonic", return_value=1010.0):
+            assert await breaker.available() is False
+        primary.ping.assert_called_once()
+
+        primary.ping.side_effect = None
+        primary.get.side_effect = None
+        primary.get.return_value = "fresh"
+        with patch("app.core.cache.time.monotonic", return_value=1012.0):
+            assert await breaker.get("key") == "fresh"
+
+        assert not breaker.is_open
+        assert await breaker.fallback.get("key") is None
+
+    @pytest.mark.asyncio
+    async def test_subscribe_fails_fast_while_open(self):
+        primary = AsyncMock()
+        primary.get.side_effect = redis.ConnectionError()
+        breaker = self._breaker(primary)
+        for _ in range(2):
+            with pytest.raises(redis.ConnectionError):
+                await breaker.get("key")
+
+        with pytest.raises(CircuitOpenError):
+            async for _ in breaker.subscribe("channel"):
+                pass
+
+
+class IdlePubSub:
+    """Подписка, в которой подолгу нет сообщений"""
+
+    def __init__(self, messages=()):
+        self.messages = list(messages)
+        self.reads = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return None
+
+    async def subscribe(self, channel):
+        self.channel = channel
+
+    async def get_message(self, ignore_subscribe_messages, timeout):
+        self.reads += 1
+        if self.messages:
+            return self.messages.pop(0)
+        # Как redis-py с явным timeout: по истечении ожидания - None, а не ошибка
+        await asyncio.sleep(timeout)
+        return None
+
+
+class TestInvalidationListener:
+    @pytest.mark.asyncio
+    async def test_idle_channel_keeps_circuit_closed_and_local_tier(self):
+        pubsub = IdlePubSub()
+        client = MagicMock()
+        client.pubsub.return_value = pubsub
+        breaker = CircuitBreakerBackend(
+            RedisBackend(client), InMemoryBackend(maxsize=10), failure_threshold=1, reset_seconds=5
+        )
+        manager = CacheManager(local_maxsize=10, local_ttl=30, backend=breaker)
+        manager.local.set(("summary", "1"), {"total": 1})
+
+        with patch("app.core.cache._SUBSCRIBE_POLL_SECONDS", 0.01):
+            await manager.start_invalidation_listener()
+            await asyncio.sleep(0.2)
+
+            # Канал молчит: много пустых чтений, но ни одной ошибки
+            assert pubsub.reads > 5
+            assert not breaker.is_open
+            assert manager.local.get(("summary", "1")) == {"total": 1}
+
+            message = json.dumps({"origin": "other", "namespace": "summary", "key": "1"})
+            pubsub.messages.append({"type": "message", "data": message})
+            await asyncio.sleep(0.05)
+            assert manager.local.get(("summary", "1")) is None
+
+            await manager.stop_invalidation_listener()
+
+    @pytest.mark.asyncio
+    async def test_resubscription_clears_local_tier_once(self):
+        manager = CacheManager(local_maxsize=10, local_ttl=30, backend=MagicMock(shared=True))
+        attempts = 0
+
+        async def subscribe(channel, on_subscribed):
+            nonlocal attempts
+            attempts += 1
+            on_subscribed()
+            if attempts == 1:
+                manager.local.set(("summary", "1"), {"total": 1})
+                raise redis.ConnectionError()
+            await asyncio.sleep(10)
+            yield
+
+        manager.backend.subscribe = subscribe
+        with patch("app.core.cache._RESUBSCRIBE_SECONDS", 0.01):
+            await manager.start_invalidation_listener()
+            await asyncio.sleep(0.1)
+            await manager.stop_invalidation_listener()
+
+        assert attempts == 2
+        assert manager.local.get(("summary", "1")) is None
+
+
+class TestCreateBackend:
+    def test_redis_backend_uses_settings_redis_url(self):
+        with (
+            patch("app.core.cache.settings.CACHE_BACKEND", "redis"),
+            patch("app.core.cache.settings.TESTING", True),
+            patch("app.core.cache.redis.from_url") as from_url,
+        ):
+            backend = create_backend()
+
+        assert isinstance(backend, CircuitBreakerBackend)
+        assert from_url.call_args.args == (settings.TEST_REDIS_URL,)
+
+    def test_memory_backend(self):
+        with patch("app.core.cache.settings.CACHE_BACKEND", "memory"):
+            backend = create_backend()
+
+        assert isinstance(backend, InMemoryBackend)
+        assert not backend.shared
@@ -0,0 +1,145 @@
+import gzip
+import zlib
+from unittest.mock import patch
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.core.compression import CompressionMiddleware, CompressionStats, choose_encoding
+
+LARGE = {"items": [{"id": i, "description": "Lorem ipsum dolor sit amet"} for i in range(200)]}
+
+
+async def large(request):
+    return JSONResponse(LARGE)
+
+
+async def small(request):
+    return JSONResponse({"ok": True})
+
+
+async def stream(request):
+    async def chunks():
+        for i in range(3):
+            yield f"chunk {i} ".encode() * 200
+
+    return StreamingResponse(chunks(), media_type="text/plain")
+
+
+async def image(request):
+    return Response(b"\x89PNG" * 1000, media_type="image/png")
+
+
+async def encoded(request):
+    return PlainTextResponse("x" * 5000, headers={"Content-Encoding": "identity"})
+
+
+@pytest.fixture
+def stats():
+    return CompressionStats()
+
+
+@pytest.fixture
+def client(stats):
+    app = Starlette(
+        routes=[
+            Route("/large", large),
+            Route("/small", small),
+            Route("/stream", stream),
+            Route("/image", image),
+            Route("/encoded", encoded),
+        ]
+    )
+    app.add_middleware(CompressionMiddleware, minimum_size=500, stats=stats)
+    return TestClient(app)
+
+
+class TestChooseEncoding:
+    def test_gzip_when_brotli_is_unavailable(self):
+        with patch("app.core.compression.brotli", None):
+            assert choose_encoding("gzip, deflate, br") == "gzip"
+
+    def test_prefers_brotli_and_respects_weights(self):
+        with patch("app.core.compression.brotli", object()):
+            assert choose_encoding("gzip, br") == "br"
+            assert choose_encoding("gzip;q=1.0, br;q=0.5") == "gzip"
+            assert choose_encoding("*") == "br"
+
+    def test_refused_or_missing_encoding(self):
+        assert choose_encoding("") is None
+        assert choose_encoding("identity") is None
+        assert choose_encoding("gzip;q=0") is None
+
+
+class TestCompressionMiddleware:
+    def test_large_json_is_gzipped(self, client, stats):
+        response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert int(response.headers["content-length"]) < len(response.text)
+        assert response.json() == LARGE
+
+        summary = stats.snapshot()["encodings"]["gzip"]
+        assert summary["responses"] == 1
+        assert summary["bytes_saved"] > 0
+
+    def test_small_response_is_not_compressed(self, client, stats):
+        response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in response.headers
+        assert response.json() == {"ok": True}
+        assert stats.snapshot()["skipped_below_threshold"] == 1
+
+    def test_without_accept_encoding(self, client):
+        response = client.get("/large", headers={"Accept-Encoding": "identity"})
+
+        assert "content-encoding" not in response.headers
+        assert response.json() == LARGE
+
+    def test_streaming_response_is_compressed_per_chunk(self, client):
+        with client.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as response:
+            raw = list(response.iter_raw())
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        # Каждая часть сброшена отдельно: первую можно распаковать, не дожидаясь остальных
+        assert zlib.decompressobj(31).decompress(raw[0]).startswith(b"chunk 0")
+        assert gzip.decompress(b"".join(raw)).decode().endswith("chunk 2 ")
+
+    def test_non_text_and_already_encoded_responses_pass_through(self, client):
+        image = client.get("/image", headers={"Accept-Encoding": "gzip"})
+        encoded = client.get("/encoded", headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in image.headers
+        assert encoded.headers["content-encoding"] == "identity"
+
+
+class TestBrotliCompression:
+    @pytest.fixture(autouse=True)
+    def brotli(self):
+        return pytest.importorskip("brotli")
+
+    def test_large_json_round_trips_through_brotli(self, client, stats, brotli):
+        with client.stream("GET", "/large", headers={"Accept-Encoding": "br, gzip"}) as response:
+            raw = b"".join(response.iter_raw())
+
+        assert response.headers["content-encoding"] == "br"
+        assert int(response.headers["content-length"]) == len(raw)
+        assert brotli.decompress(raw) == JSONResponse(LARGE).body
+        assert stats.snapshot()["encodings"]["br"]["responses"] == 1
+
+    def test_streaming_response_is_brotli_compressed_per_chunk(self, client, brotli):
+        with client.stream("GET", "/stream", headers={"Accept-Encoding": "br"}) as response:
+            raw = list(response.iter_raw())
+
+        assert response.headers["content-encoding"] == "br"
+        assert "content-length" not in response.headers
+        # Каждая часть сброшена отдельно: первую можно распаковать, не дожидаясь остальных
+        decompressor = brotli.Decompressor()
+        assert decompressor.process(raw[0]).startswith(b"chunk 0")
+        body = b"".join(raw)
+        assert brotli.decompress(body).decode() == "".join(f"chunk {i} " * 200 for i in range(3))
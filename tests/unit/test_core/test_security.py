@@ -0,0 +1,12 @@
+import pytest
+
+from app.core.security import get_password_hash_async, verify_password_async
+
+
+class TestPasswordHashing:
+    @pytest.mark.asyncio
+    async def test_offloaded_hash_roundtrip(self):
+        hashed_password = await get_password_hash_async("Password123")
+
+        assert await verify_password_async("Password123", hashed_password)
+        assert not await verify_password_async("WrongPassword", hashed_password)
@@ -0,0 +1,52 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.repositories import DealRepository
+
+
+def make_result(rows=None, scalar=None):
+    result = MagicMock()
+    result.all.return_value = rows or []
+    result.scalar_one.return_value = scalar
+    return result
+
+
+class TestFetchPageWithTotal:
+    @pytest.mark.asyncio
+    async def test_total_comes_from_window_count(self):
+        mock_db = AsyncMock(spec=AsyncSession)
+        deal = MagicMock(id=1)
+        mock_db.execute.return_value = make_result(rows=[(deal, 42)])
+        deal_repo = DealRepository(mock_db)
+
+        deals, total = await deal_repo.get_organization_deals_with_total(1, skip=0, limit=10)
+
+        assert deals == [deal]
+        assert total == 42
+        assert mock_db.execute.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_empty_first_page_skips_count(self):
+        mock_db = AsyncMock(spec=AsyncSession)
+        mock_db.execute.return_value = make_result()
+        deal_repo = DealRepository(mock_db)
+
+        deals, total = await deal_repo.get_organization_deals_with_total(1, skip=0, limit=10)
+
+        assert deals == []
+        assert total == 0
+        assert mock_db.execute.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_page_past_the_end_falls_back_to_count(self):
+        mock_db = AsyncMock(spec=AsyncSession)
+        mock_db.execute.side_effect = [make_result(), make_result(scalar=15)]
+        deal_repo = DealRepository(mock_db)
+
+        deals, total = await deal_repo.get_organization_deals_with_total(1, skip=100, limit=10)
+
+        assert deals == []
+        assert total == 15
+        assert mock_db.execute.call_count == 2
@@ -0,0 +1,60 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.repositories.contact import ContactRepository
+
+
+def _compile(query) -> str:
+    return str(query.compile(dialect=postgresql.dialect()))
+
+
+class TestContactSearchQuery:
+    def test_search_matches_name_email_and_phone(self):
+        repo = ContactRepository(None)  # type: ignore[arg-type]
+
+        query = repo._organization_contacts_query(1, search="555")
+        sql = _compile(query)
+
+        assert "contacts.name ILIKE" in sql
+        assert "contacts.email ILIKE" in sql
+        assert "contacts.phone ILIKE" in sql
+
+    def test_search_escapes_like_wildcards(self):
+        repo = ContactRepository(None)  # type: ignore[arg-type]
+
+        query = repo._organization_contacts_query(1, search="100%_a")
+        params = query.compile(dialect=postgresql.dialect()).params
+
+        assert "%100\\%\\_a%" in params.values()
+
+    def test_search_is_ordered_by_relevance(self):
+        repo = ContactRepository(None)  # type: ignore[arg-type]
+
+        sql = _compile(repo._apply_order(repo._organization_contacts_query(1, "acme"), "acme"))
+
+        assert "ORDER BY greatest(word_similarity(" in sql
+        assert "contacts.created_at" not in sql.split("ORDER BY")[1]
+
+    def test_list_without_search_keeps_created_at_order(self):
+        repo = ContactRepository(None)  # type: ignore[arg-type]
+
+        sql = _compile(repo._apply_order(repo._organization_contacts_query(1)))
+
+        assert "ORDER BY contacts.created_at DESC, contacts.id DESC" in sql
+
+
+class TestDeletionCandidatesQuery:
+    @pytest.mark.asyncio
+    async def test_deals_are_checked_within_the_organization(self):
+        db = AsyncMock()
+        db.execute.return_value = MagicMock()
+        repo = ContactRepository(db)
+
+        await repo.get_deletion_candidates([1, 2], organization_id=7)
+        sql = _compile(db.execute.call_args.args[0])
+
+        exists_clause = sql.split("EXISTS")[1]
+        assert "deals.contact_id = contacts.id" in exists_clause
+        assert "deals.organization_id = " in exists_clause
@@ -0,0 +1,86 @@
+from datetime import UTC, date, datetime
+from decimal import Decimal
+from unittest.mock import AsyncMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.repositories import DealRollupRepository
+
+DEAL = {
+    "organization_id": 1,
+    "stage": "proposal",
+    "status": "in_progress",
+    "currency": "USD",
+    "amount": Decimal("100"),
+    "created_at": datetime(2026, 10, 1, 23, 30, tzinfo=UTC),
+}
+
+
+def executed_rows(mock_db, call_index: int = 0) -> list[dict]:
+    statement = mock_db.execute.call_args_list[call_index].args[0]
+    params = statement.compile(dialect=postgresql.dialect()).params
+    rows: dict[int, dict] = {}
+    for name, value in params.items():
+        field, _, index = name.rpartition("_m")
+        rows.setdefault(int(index), {})[field] = value
+    return [rows[index] for index in sorted(rows)]
+
+
+class TestApplyDealChange:
+    @pytest.mark.asyncio
+    async def test_created_deal_adds_to_its_rollup(self):
+        mock_db = AsyncMock(spec=AsyncSession)
+
+        await DealRollupRepository(mock_db).apply_deal_change(None, DEAL)
+
+        [row] = executed_rows(mock_db)
+        assert row["deal_count"] == 1
+        assert row["amount_sum"] == Decimal("100")
+        assert row["positive_amount_count"] == 1
+        mock_db.commit.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_status_change_moves_deal_between_rollups(self):
+        mock_db = AsyncMock(spec=AsyncSession)
+
+        await DealRollupRepository(mock_db).apply_deal_change(DEAL, {**DEAL, "status": "won"})
+
+        old_row, new_row = executed_rows(mock_db)
+        assert (old_row["status"], old_row["deal_count"]) == ("in_progress", -1)
+        assert (new_row["status"], new_row["deal_count"]) == ("won", 1)
+
+    @pytest.mark.asyncio
+    async def test_amount_change_keeps_count(self):
+        mock_db = AsyncMock(spec=AsyncSession)
+
+        await DealRollupRepository(mock_db).apply_deal_change(DEAL, {**DEAL, "amount": None})
+
+        [row] = executed_rows(mock_db)
+        assert row["deal_count"] == 0
+        assert row["amount_sum"] == Decimal("-100")
+        assert row["positive_amount_count"] == -1
+
+    @pytest.mark.asyncio
+    async def test_unchanged_deal_writes_nothing(self):
+        mock_db = AsyncMock(spec=AsyncSession)
+
+        await DealRollupRepository(mock_db).apply_deal_change(DEAL, dict(DEAL))
+
+        mock_db.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_new_deal_counts_in_histogram_until_status_changes(self):
+        mock_db = AsyncMock(spec=AsyncSession)
+        new_deal = {**DEAL, "status": "new"}
+        repository = DealRollupRepository(mock_db)
+
+        await repository.apply_deal_change(None, new_deal)
+        [created] = executed_rows(mock_db, call_index=1)
+        await repository.apply_deal_change(new_deal, {**new_deal, "status": "won"})
+        [moved] = executed_rows(mock_db, call_index=3)
+
+        assert created == {"organization_id": 1, "day": date(2026, 10, 1), "new_deal_count": 1}
+        assert moved["new_deal_count"] == -1
+        assert mock_db.execute.call_count == 4
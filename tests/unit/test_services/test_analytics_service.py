@@ -1,43 +1,61 @@
 import json
+import time
+from datetime import UTC, datetime, timedelta
 from decimal import Decimal
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, call, patch
 
 import pytest
+import redis.asyncio as redis
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import CircuitBreakerBackend, InMemoryBackend, cache_manager
+from app.repositories import DealRollupRepository
 from app.services import AnalyticsService
 
 
+@pytest.fixture(autouse=True)
+def clear_local_cache():
+    cache_manager.local.clear()
+
+
+@pytest.fixture(autouse=True)
+def primary_session():
+    session = AsyncMock(spec=AsyncSession)
+    session_factory = MagicMock()
+    session_factory.return_value.__aenter__.return_value = session
+    with patch("app.services.caching.AsyncSessionLocal", session_factory):
+        yield session
+
+
 class TestAnalyticsService:
     @pytest.mark.asyncio
     async def test_get_deal_summary_success(self, test_session: AsyncSession):
         analytics_service = AnalyticsService(test_session)
 
-        # Создаем моки для каждого вызова execute
-        mock_result1 = MagicMock()  # Для первого вызова - статусы
-        mock_result1.all.return_value = [
-            ("new", 5, Decimal("0")),
-            ("in_progress", 3, Decimal("15000")),
-            ("won", 2, Decimal("50000")),
-            ("lost", 1, Decimal("0")),
+        # Агрегаты по статусам: количество, сумма, число и сумма положительных
+        status_totals = [
+            ("new", 5, Decimal("0"), 0, Decimal("0")),
+            ("in_progress", 3, Decimal("15000"), 3, Decimal("15000")),
+            ("won", 2, Decimal("50000"), 2, Decimal("50000")),
+            ("lost", 1, Decimal("0"), 0, Decimal("0")),
         ]
-
-        mock_result2 = MagicMock()  # Для второго вызова - среднее значение
-        mock_result2.scalar.return_value = Decimal("25000")
-
-        mock_result3 = MagicMock()  # Для третьего вызова - количество новых сделок
-        mock_result3.scalar.return_value = 2
+        # Сделки в статусе new по дням создания
+        today = datetime.now(UTC).date()
+        histogram = {today: 1, today - timedelta(days=29): 1, today - timedelta(days=45): 3}
 
         # Mock Redis
         mock_redis = AsyncMock()
         mock_redis.get.return_value = None
         mock_redis.setex = AsyncMock()
 
-        with patch("app.services.analytics.cache_manager.get_redis", return_value=mock_redis):
-            with patch.object(analytics_service.db, "execute") as mock_execute:
-                # Используем side_effect для последовательных возвратов
-                mock_execute.side_effect = [mock_result1, mock_result2, mock_result3]
-
+        with patch("app.services.caching.cache_manager.get_backend", return_value=mock_redis):
+            with (
+                # Промах считается в собственной сессии основной БД, в новом экземпляре сервиса
+                patch.object(DealRollupRepository, "get_status_totals", return_value=status_totals),
+                patch.object(
+                    DealRollupRepository, "get_new_deal_histogram", return_value=histogram
+                ),
+            ):
                 result = await analytics_service.get_deal_summary(organization_id=1, days=30)
 
         assert result["status_counts"]["new"] == 5
@@ -51,38 +69,166 @@ class TestAnalyticsService:
     async def test_get_deal_summary_with_cache(self, test_session: AsyncSession):
         analytics_service = AnalyticsService(test_session)
 
-        # Создаем данные для кэша с учетом того, что JSON сериализует Decimal в строку
+        # Создаем данные для кэша с учетом того, что JSON сериализует Decimal в строку.
+        # Запись одна для любого days: новые сделки хранятся гистограммой по дням
+        today = datetime.now(UTC).date()
         cached_data = {
             "status_counts": {"new": 3, "won": 1},
             "amount_by_status": {"new": "0", "won": "10000"},  # Decimal как строки
             "average_won_amount": 10000.0,
-            "new_deals_last_n_days": 1,
-            "days_period": 30,
+            "new_deals_by_day": {
+                today.isoformat(): 1,
+                (today - timedelta(days=20)).isoformat(): 2,
+            },
         }
 
         # Mock Redis with cached data
         mock_redis = AsyncMock()
-        mock_redis.get.return_value = json.dumps(cached_data, default=str)
+        mock_redis.get.return_value = json.dumps(
+            {"value": cached_data, "refresh_at": time.time() + 60}, default=str
+        )
 
-        with patch("app.services.analytics.cache_manager.get_redis", return_value=mock_redis):
+        with (
+            patch("app.services.caching.cache_manager.get_backend", return_value=mock_redis),
+            patch("app.services.analytics.get_analytics_generation", return_value=7),
+        ):
             result = await analytics_service.get_deal_summary(organization_id=1, days=30)
+            week = await analytics_service.get_deal_summary(organization_id=1, days=7)
 
         # Проверяем что данные возвращаются из кэша (строки остаются строками)
         assert result["status_counts"] == cached_data["status_counts"]
         assert result["amount_by_status"] == cached_data["amount_by_status"]  # Строки, а не Decimal
         assert result["average_won_amount"] == cached_data["average_won_amount"]
-        assert result["new_deals_last_n_days"] == cached_data["new_deals_last_n_days"]
-        assert result["days_period"] == cached_data["days_period"]
+        assert result["new_deals_last_n_days"] == 3
+        assert result["days_period"] == 30
+        assert week["new_deals_last_n_days"] == 1
+        assert week["days_period"] == 7
+
+        # Второй вызов читает запись из локального уровня кэша, не обращаясь к Redis
+        assert mock_redis.get.call_args_list == [call("deal_summary:1:7")]
+
+    @pytest.mark.asyncio
+    async def test_get_deal_summary_with_circuit_open(self, test_session: AsyncSession):
+        analytics_service = AnalyticsService(test_session)
+
+        # Redis не отвечает, и размыкатель уже открыт: сводка считается по агрегатам
+        primary = AsyncMock()
+        primary.get.side_effect = redis.ConnectionError()
+        breaker = CircuitBreakerBackend(
+            primary, InMemoryBackend(maxsize=10), failure_threshold=1, reset_seconds=60
+        )
+        with pytest.raises(redis.ConnectionError):
+            await breaker.get("probe")
+
+        with (
+            patch.object(cache_manager, "backend", breaker),
+            patch.object(
+                analytics_service.rollup_repo,
+                "get_status_totals",
+                return_value=[("won", 2, Decimal("100"), 2, Decimal("100"))],
+            ),
+            patch.object(analytics_service.rollup_repo, "get_new_deal_histogram", return_value={}),
+        ):
+            result = await analytics_service.get_deal_summary(organization_id=1, days=30)
+
+        assert result["status_counts"] == {"won": 2}
+        assert result["average_won_amount"] == 50.0
+        assert primary.get.call_count == 1
 
-        mock_redis.get.assert_called_once_with("deal_summary:1:30")
+    @pytest.mark.asyncio
+    async def test_failing_redis_opens_circuit_without_errors(self):
+        analytics_service = AnalyticsService(AsyncMock(spec=AsyncSession))
+
+        # Redis не отвечает ни на одну команду, размыкатель пока замкнут
+        primary = AsyncMock()
+        for command in ("ping", "get", "set", "incr", "release_lock", "publish"):
+            getattr(primary, command).side_effect = redis.ConnectionError()
+        breaker = CircuitBreakerBackend(
+            primary, InMemoryBackend(maxsize=10), failure_threshold=3, reset_seconds=60
+        )
+
+        with (
+            patch.object(cache_manager, "backend", breaker),
+            patch.object(
+                DealRollupRepository,
+                "get_status_totals",
+                return_value=[("won", 2, Decimal("100"), 2, Decimal("100"))],
+            ),
+            patch.object(DealRollupRepository, "get_new_deal_histogram", return_value={}),
+        ):
+            results = [
+                await analytics_service.get_deal_summary(organization_id=1, days=30)
+                for _ in range(5)
+            ]
+
+        assert all(result["status_counts"] == {"won": 2} for result in results)
+        assert breaker.is_open
+        # После открытия размыкателя Redis больше не опрашивается
+        assert primary.get.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_redis_failure_on_cache_miss_opens_circuit_without_errors(self):
+        analytics_service = AnalyticsService(AsyncMock(spec=AsyncSession))
+
+        # Чтения проходят (поколение есть, сводки в кэше нет), а блокировка
+        # пересчета падает и открывает размыкатель
+        primary = AsyncMock()
+        primary.get.side_effect = lambda key: "7" if key == "analytics_generation:1" else None
+        primary.set.side_effect = redis.ConnectionError()
+        breaker = CircuitBreakerBackend(
+            primary, InMemoryBackend(maxsize=10), failure_threshold=1, reset_seconds=60
+        )
+
+        with (
+            patch.object(cache_manager, "backend", breaker),
+            patch.object(
+                DealRollupRepository,
+                "get_status_totals",
+                return_value=[("won", 2, Decimal("100"), 2, Decimal("100"))],
+            ),
+            patch.object(DealRollupRepository, "get_new_deal_histogram", return_value={}),
+        ):
+            first = await analytics_service.get_deal_summary(organization_id=1, days=30)
+            assert breaker.is_open
+            second = await analytics_service.get_deal_summary(organization_id=1, days=30)
+
+        assert first["status_counts"] == second["status_counts"] == {"won": 2}
+        primary.set.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_cache_miss_is_computed_on_primary(self, primary_session):
+        # Сервис эндпоинта работает с репликой, которая еще не догнала запись
+        replica_session = AsyncMock(spec=AsyncSession)
+        analytics_service = AnalyticsService(replica_session)
+
+        def status_totals(repo, organization_id):
+            if repo.db is primary_session:
+                return [("won", 2, Decimal("100"), 2, Decimal("100"))]
+            return [("won", 1, Decimal("50"), 1, Decimal("50"))]
+
+        with (
+            patch.object(cache_manager, "backend", InMemoryBackend(maxsize=10)),
+            patch.object(
+                DealRollupRepository,
+                "get_status_totals",
+                autospec=True,
+                side_effect=status_totals,
+            ),
+            patch.object(DealRollupRepository, "get_new_deal_histogram", return_value={}),
+        ):
+            result = await analytics_service.get_deal_summary(organization_id=1, days=30)
+            cached = await analytics_service.get_deal_summary(organization_id=1, days=30)
+
+        # В кэш под новым поколением попадает результат основной БД, а не реплики
+        assert result["status_counts"] == {"won": 2}
+        assert cached["status_counts"] == {"won": 2}
 
     @pytest.mark.asyncio
     async def test_get_deal_funnel_success(self, test_session: AsyncSession):
         analytics_service = AnalyticsService(test_session)
 
-        # Mock database results
-        mock_result = MagicMock()
-        mock_result.all.return_value = [
+        # Агрегаты по стадиям и статусам
+        stage_status_counts = [
             ("qualification", "new", 5),
             ("qualification", "in_progress", 2),
             ("proposal", "in_progress", 3),
@@ -95,10 +241,12 @@ class TestAnalyticsService:
         mock_redis.get.return_value = None
         mock_redis.setex = AsyncMock()
 
-        with patch("app.services.analytics.cache_manager.get_redis", return_value=mock_redis):
-            with patch.object(analytics_service.db, "execute") as mock_execute:
-                mock_execute.return_value = mock_result
-
+        with patch("app.services.caching.cache_manager.get_backend", return_value=mock_redis):
+            with patch.object(
+                DealRollupRepository,
+                "get_stage_status_counts",
+                return_value=stage_status_counts,
+            ):
                 result = await analytics_service.get_deal_funnel(organization_id=1)
 
         assert len(result["stages"]) == 4
@@ -112,12 +260,11 @@ class TestAnalyticsService:
 
         # Mock Redis
         mock_redis = AsyncMock()
-        mock_redis.keys.return_value = ["deal_summary:1:30", "deal_summary:1:7"]
-        mock_redis.delete = AsyncMock()
+        mock_redis.incr.return_value = 8
 
-        with patch("app.services.analytics.cache_manager.get_redis", return_value=mock_redis):
+        with patch("app.services.caching.cache_manager.get_backend", return_value=mock_redis):
             await analytics_service.invalidate_analytics_cache(organization_id=1)
 
-        mock_redis.keys.assert_called_once_with("deal_summary:1:*")
-        mock_redis.delete.assert_any_call("deal_summary:1:30", "deal_summary:1:7")
-        mock_redis.delete.assert_any_call("deal_funnel:1")
+        mock_redis.incr.assert_called_once_with("analytics_generation:1")
+        mock_redis.keys.assert_not_called()
+        mock_redis.delete.assert_not_called()
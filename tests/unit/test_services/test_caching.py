@@ -0,0 +1,174 @@
+import asyncio
+import json
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+import redis.asyncio as redis
+
+from app.core.cache import InMemoryBackend, cache_manager
+from app.services import caching
+from app.services.caching import stale_while_revalidate
+
+
+async def _key(organization_id: int) -> str:
+    return str(organization_id)
+
+
+class CountingService:
+    calls = 0
+    sessions: list = []
+
+    def __init__(self, db):
+        self.db = db
+
+    @stale_while_revalidate("summary", _key, soft_ttl=60, lock_seconds=10, wait_seconds=1.0)
+    async def compute(self, organization_id: int) -> dict:
+        type(self).calls += 1
+        type(self).sessions.append(self.db)
+        await asyncio.sleep(0.01)
+        return {"organization_id": organization_id, "calls": type(self).calls}
+
+
+def _session_factory():
+    session_factory = MagicMock()
+    session_factory.return_value.__aenter__.return_value = MagicMock(name="primary_session")
+    return session_factory
+
+
+@pytest.fixture
+def backend():
+    CountingService.calls = 0
+    CountingService.sessions = []
+    cache_manager.local.clear()
+    backend = InMemoryBackend(maxsize=100)
+    with (
+        patch.object(cache_manager, "backend", backend),
+        patch("app.services.caching.AsyncSessionLocal", _session_factory()),
+    ):
+        yield backend
+
+
+class TestStaleWhileRevalidate:
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_compute_once(self, backend):
+        service = CountingService(MagicMock())
+
+        results = await asyncio.gather(*(service.compute(1) for _ in range(10)))
+
+        assert CountingService.calls == 1
+        assert all(result == {"organization_id": 1, "calls": 1} for result in results)
+        assert json.loads(await backend.get("summary:1"))["value"]["calls"] == 1
+        # Блокировка снята после записи значения
+        assert await backend.get("lock:summary:1") is None
+
+    @pytest.mark.asyncio
+    async def test_stale_value_is_served_and_refreshed_once(self, backend):
+        await backend.set(
+            "summary:1", json.dumps({"value": {"calls": 0}, "refresh_at": time.time() - 1})
+        )
+        session_factory = _session_factory()
+
+        with patch("app.services.caching.AsyncSessionLocal", session_factory):
+            service = CountingService(MagicMock())
+            results = await asyncio.gather(*(service.compute(1) for _ in range(5)))
+            await asyncio.gather(*caching._background_tasks)
+
+        assert all(result == {"calls": 0} for result in results)
+        assert CountingService.calls == 1
+        session_factory.assert_called_once()
+        entry = json.loads(await backend.get("summary:1"))
+        assert entry["value"]["calls"] == 1
+        assert entry["refresh_at"] > time.time()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_first_caller_does_not_break_shared_computation(self, backend):
+        request_session = MagicMock(name="request_session")
+        first = asyncio.create_task(CountingService(request_session).compute(1))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(CountingService(MagicMock()).compute(1))
+        await asyncio.sleep(0)
+
+        # Клиент первого запроса отключился, его сессия закрывается
+        first.cancel()
+
+        assert await second == {"organization_id": 1, "calls": 1}
+        assert first.cancelled()
+        # Пересчет шел в собственной сессии, а не в сессии отмененного запроса
+        assert CountingService.sessions == [
+            caching.AsyncSessionLocal.return_value.__aenter__.return_value
+        ]
+        assert request_session not in CountingService.sessions
+
+    @pytest.mark.asyncio
+    async def test_waits_for_computation_in_another_worker(self, backend):
+        await backend.set("lock:summary:1", "other-worker")
+
+        async def other_worker():
+            await asyncio.sleep(0.1)
+            await backend.set(
+                "summary:1", json.dumps({"value": {"calls": 42}, "refresh_at": time.time() + 60})
+            )
+
+        service = CountingService(MagicMock())
+        result, _ = await asyncio.gather(service.compute(1), other_worker())
+
+        assert result == {"calls": 42}
+        assert CountingService.calls == 0
+
+    @pytest.mark.asyncio
+    async def test_redis_error_computes_without_cache(self):
+        CountingService.calls = 0
+        cache_manager.local.clear()
+        client = MagicMock()
+        client.get.side_effect = redis.ConnectionError("down")
+
+        with patch.object(cache_manager, "backend", client):
+            service = CountingService(MagicMock())
+            first = await service.compute(1)
+            second = await service.compute(1)
+
+        assert first["calls"] == 1
+        assert second["calls"] == 2
+
+    @pytest.mark.asyncio
+    async def test_redis_error_on_lock_computes_without_cache(self, backend):
+        with patch.object(backend, "set", AsyncMock(side_effect=redis.ConnectionError("down"))):
+            result = await CountingService(MagicMock()).compute(1)
+
+        assert result == {"organization_id": 1, "calls": 1}
+
+    @pytest.mark.asyncio
+    async def test_redis_errors_after_compute_keep_the_value(self, backend):
+        with (
+            patch.object(backend, "setex", AsyncMock(side_effect=redis.ConnectionError("down"))),
+            patch.object(
+                backend, "release_lock", AsyncMock(side_effect=redis.ConnectionError("down"))
+            ),
+        ):
+            result = await CountingService(MagicMock()).compute(1)
+
+        assert result == {"organization_id": 1, "calls": 1}
+        assert await backend.get("summary:1") is None
+
+    @pytest.mark.asyncio
+    async def test_redis_error_while_waiting_computes_without_cache(self, backend):
+        await backend.set("lock:summary:1", "other-worker")
+
+        # Промах читается из Redis, затем Redis отказывает во время ожидания
+        failing_get = AsyncMock(side_effect=[None, redis.ConnectionError("down")])
+        with patch.object(backend, "get", failing_get):
+            result = await CountingService(MagicMock()).compute(1)
+
+        assert result == {"organization_id": 1, "calls": 1}
+        assert failing_get.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_missing_key_skips_cache(self, backend):
+        class UncachedService(CountingService):
+            @stale_while_revalidate("summary", AsyncMock(return_value=None), soft_ttl=60)
+            async def compute(self, organization_id: int) -> dict:
+                return {"organization_id": organization_id}
+
+        assert await UncachedService(MagicMock()).compute(1) == {"organization_id": 1}
+        assert await backend.get("summary:None") is None
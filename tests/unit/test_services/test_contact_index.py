@@ -0,0 +1,138 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.services.contact_index import ContactEntry, ContactPrefixIndex, OrganizationContactIndex
+
+CONTACTS = [
+    ContactEntry(1, "John Smith", "john@acme.com", owner_id=1),
+    ContactEntry(2, "Jane Doe", "jane@example.com", owner_id=2),
+    ContactEntry(3, "Smithers", None, owner_id=1),
+    ContactEntry(4, "Éric Jonas", "eric@example.com", owner_id=2),
+]
+
+
+def make_registry(**kwargs) -> ContactPrefixIndex:
+    options = {
+        "max_contacts": 100,
+        "max_organization_contacts": 10,
+        "idle_seconds": 600,
+        "max_age_seconds": 300,
+    }
+    options.update(kwargs)
+    return ContactPrefixIndex(**options)
+
+
+class TestOrganizationContactIndex:
+    def test_matches_name_words_and_email_case_insensitively(self):
+        index = OrganizationContactIndex(CONTACTS)
+
+        assert [entry.id for entry in index.search("SMI", 10)] == [1, 3]
+        assert [entry.id for entry in index.search("jane@", 10)] == [2]
+        assert [entry.id for entry in index.search("éric", 10)] == [4]
+
+    def test_contact_is_returned_once_and_limit_applies(self):
+        index = OrganizationContactIndex(CONTACTS)
+
+        assert [entry.id for entry in index.search("j", 10)] == [2, 1, 4]
+        assert len(index.search("j", 2)) == 2
+
+    def test_owner_filter(self):
+        index = OrganizationContactIndex(CONTACTS)
+
+        assert [entry.id for entry in index.search("j", 10, owner_id=2)] == [2, 4]
+
+    def test_incremental_add_and_remove(self):
+        index = OrganizationContactIndex(CONTACTS)
+
+        index.add(ContactEntry(5, "Smith & Co", None, owner_id=1))
+        index.remove(1)
+
+        assert [entry.id for entry in index.search("smith", 10)] == [5, 3]
+        assert index.search("john", 10) == []
+        assert len(index) == 4
+
+
+class TestContactPrefixIndex:
+    @pytest.mark.asyncio
+    async def test_loads_lazily_once(self):
+        registry = make_registry()
+        load = AsyncMock(return_value=CONTACTS)
+
+        await registry.get(1, load)
+        index = await registry.get(1, load)
+
+        load.assert_called_once_with(10)
+        assert len(index) == 4
+        assert registry.stats == {"organizations": 1, "contacts": 4}
+
+    @pytest.mark.asyncio
+    async def test_too_large_organization_is_not_indexed(self):
+        registry = make_registry()
+
+        assert await registry.get(1, AsyncMock(return_value=None)) is None
+        assert registry.stats["organizations"] == 0
+
+    @pytest.mark.asyncio
+    async def test_updates_only_loaded_organizations(self):
+        registry = make_registry()
+        await registry.get(1, AsyncMock(return_value=CONTACTS))
+
+        registry.add(1, ContactEntry(5, "New", None, owner_id=1))
+        registry.add(2, ContactEntry(6, "Other", None, owner_id=1))
+        registry.remove(1, 2)
+
+        assert registry.stats == {"organizations": 1, "contacts": 4}
+
+    @pytest.mark.asyncio
+    async def test_changes_during_load_are_applied_to_loaded_index(self):
+        registry = make_registry()
+
+        async def load(limit):
+            # Загрузка уже прочитала контакты, когда другой запрос их изменил
+            registry.add(1, ContactEntry(5, "Smith & Co", None, owner_id=1))
+            registry.remove(1, 2)
+            return CONTACTS
+
+        index = await registry.get(1, load)
+
+        assert [entry.id for entry in index.search("smith", 10)] == [1, 5, 3]
+        assert index.search("jane", 10) == []
+        assert registry.stats == {"organizations": 1, "contacts": 4}
+
+    @pytest.mark.asyncio
+    async def test_evicts_idle_organizations(self):
+        registry = make_registry(idle_seconds=60)
+
+        with patch("app.services.contact_index.time.monotonic", return_value=1000.0):
+            await registry.get(1, AsyncMock(return_value=CONTACTS))
+        with patch("app.services.contact_index.time.monotonic", return_value=1061.0):
+            await registry.get(2, AsyncMock(return_value=CONTACTS[:1]))
+
+        assert registry.stats == {"organizations": 1, "contacts": 1}
+
+    @pytest.mark.asyncio
+    async def test_reloads_after_max_age(self):
+        registry = make_registry(max_age_seconds=60)
+        load = AsyncMock(return_value=CONTACTS)
+
+        with patch("app.services.contact_index.time.monotonic", return_value=1000.0):
+            await registry.get(1, load)
+        with patch("app.services.contact_index.time.monotonic", return_value=1030.0):
+            await registry.get(1, load)
+        with patch("app.services.contact_index.time.monotonic", return_value=1061.0):
+            await registry.get(1, load)
+
+        assert load.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_evicts_least_recently_used_over_memory_bound(self):
+        registry = make_registry(max_contacts=5)
+
+        await registry.get(1, AsyncMock(return_value=CONTACTS[:2]))
+        await registry.get(2, AsyncMock(return_value=CONTACTS[:2]))
+        await registry.get(1, AsyncMock())
+        await registry.get(3, AsyncMock(return_value=CONTACTS[:2]))
+
+        assert registry.stats == {"organizations": 2, "contacts": 4}
+        assert await registry.get(1, AsyncMock()) is not None
@@ -1,4 +1,5 @@
-from unittest.mock import AsyncMock, MagicMock
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -7,10 +8,16 @@ from app.core.exceptions import (
     ContactHasActiveDealsException,
     ContactNotFoundException,
     PermissionDeniedException,
+    ValidationException,
 )
+from app.repositories import ContactRepository
 from app.schemas import ContactResponse
 from app.schemas.dto import ContactCreateDTO
 from app.services import ContactService
+from app.services.contact_index import contact_prefix_index
+from app.services.pagination import encode_cursor
+
+CURSOR_CREATED_AT = datetime(2024, 1, 1, tzinfo=UTC)
 
 
 class TestContactService:
@@ -32,6 +39,7 @@ class TestContactService:
         # Mock repositories
         contact_service.contact_repo = AsyncMock()
         contact_service.contact_repo.create = AsyncMock(return_value=mock_contact)
+        contact_service.names.users = AsyncMock(return_value={1: "Test Owner"})
 
         contact_dto = ContactCreateDTO(
             name="Test Contact",
@@ -54,6 +62,7 @@ class TestContactService:
         assert result.phone == "+1234567890"
         assert result.organization_id == 1
         assert result.owner_id == 1
+        assert result.owner_name == "Test Owner"
 
     @pytest.mark.asyncio
     async def test_get_contacts_member_cannot_filter_others(self):
@@ -75,14 +84,15 @@ class TestContactService:
 
         # Mock repositories
         contact_service.contact_repo = AsyncMock()
-        contact_service.contact_repo.get_organization_contacts = AsyncMock(return_value=[])
-        contact_service.contact_repo.count_organization_contacts = AsyncMock(return_value=0)
+        contact_service.contact_repo.get_organization_contacts_with_total = AsyncMock(
+            return_value=([], 0)
+        )
 
         await contact_service.get_contacts(organization_id=1, current_user_id=1, user_role="member")
 
         # Should call with owner_id=1 (current user)
-        contact_service.contact_repo.get_organization_contacts.assert_called_once()
-        call_args = contact_service.contact_repo.get_organization_contacts.call_args
+        contact_service.contact_repo.get_organization_contacts_with_total.assert_called_once()
+        call_args = contact_service.contact_repo.get_organization_contacts_with_total.call_args
 
         # Проверяем ИМЕНОВАННЫЕ аргументы (а не позиционные)
         kwargs = call_args.kwargs
@@ -121,8 +131,157 @@ class TestContactService:
 
         # Mock deals exist for this contact
         contact_service.deal_repo = AsyncMock()
-        mock_deal = MagicMock(contact_id=1)
-        contact_service.deal_repo.get_organization_deals = AsyncMock(return_value=[mock_deal])
+        contact_service.deal_repo.contact_has_deals = AsyncMock(return_value=True)
 
         with pytest.raises(ContactHasActiveDealsException):
             await contact_service.delete_contact(1, 1)
+
+        contact_service.deal_repo.contact_has_deals.assert_called_once_with(1, 1)
+        contact_service.contact_repo.delete.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_bulk_delete_contacts_success(self):
+        mock_db = AsyncMock(spec=AsyncSession)
+        contact_service = ContactService(mock_db)
+
+        contact_service.contact_repo = AsyncMock()
+        contact_service.contact_repo.get_deletion_candidates = AsyncMock(
+            return_value={1: False, 2: False}
+        )
+        contact_service.contact_repo.delete_many = AsyncMock(return_value=2)
+
+        assert await contact_service.bulk_delete_contacts([1, 2, 1], 5) == 2
+        contact_service.contact_repo.delete_many.assert_called_once_with([1, 2], 5)
+
+    @pytest.mark.asyncio
+    async def test_bulk_delete_contacts_rejects_missing_contacts(self):
+        mock_db = AsyncMock(spec=AsyncSession)
+        contact_service = ContactService(mock_db)
+
+        contact_service.contact_repo = AsyncMock()
+        contact_service.contact_repo.get_deletion_candidates = AsyncMock(return_value={1: False})
+
+        with pytest.raises(ContactNotFoundException):
+            await contact_service.bulk_delete_contacts([1, 2], 5)
+
+        contact_service.contact_repo.delete_many.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_bulk_delete_contacts_rejects_contacts_with_deals(self):
+        mock_db = AsyncMock(spec=AsyncSession)
+        contact_service = ContactService(mock_db)
+
+        contact_service.contact_repo = AsyncMock()
+        contact_service.contact_repo.get_deletion_candidates = AsyncMock(
+            return_value={1: False, 2: True}
+        )
+
+        with pytest.raises(ContactHasActiveDealsException):
+            await contact_service.bulk_delete_contacts([1, 2], 5)
+
+        contact_service.contact_repo.delete_many.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_contacts_without_total(self):
+        mock_db = AsyncMock(spec=AsyncSession)
+        contact_service = ContactService(mock_db)
+
+        contact_service.contact_repo = AsyncMock()
+        contact_service.contact_repo.get_organization_contacts = AsyncMock(return_value=[])
+
+        result = await contact_service.get_contacts(
+            organization_id=1, current_user_id=1, user_role="admin", count="none"
+        )
+
+        contact_service.contact_repo.count_organization_contacts.assert_not_called()
+        assert result["total"] is None
+        assert result["total_pages"] is None
+
+    @pytest.mark.asyncio
+    async def test_get_contacts_with_cursor_uses_keyset(self):
+        mock_db = AsyncMock(spec=AsyncSession)
+        contact_service = ContactService(mock_db)
+
+        contact_service.contact_repo = AsyncMock()
+        contact_service.contact_repo.get_organization_contacts = AsyncMock(return_value=[])
+        contact_service.contact_repo.count_organization_contacts = AsyncMock(return_value=0)
+
+        cursor = encode_cursor("created_at:desc", CURSOR_CREATED_AT, 10)
+        result = await contact_service.get_contacts(
+            organization_id=1, page=5, current_user_id=1, user_role="admin", cursor=cursor
+        )
+
+        kwargs = contact_service.contact_repo.get_organization_contacts.call_args.kwargs
+        assert kwargs["skip"] == 0
+        assert kwargs["after"] == (CURSOR_CREATED_AT, 10)
+        contact_service.contact_repo.get_organization_contacts_with_total.assert_not_called()
+        assert result["next_cursor"] is None
+
+    @pytest.mark.asyncio
+    async def test_get_contacts_search_rejects_cursor(self):
+        mock_db = AsyncMock(spec=AsyncSession)
+        contact_service = ContactService(mock_db)
+
+        cursor = encode_cursor("created_at:desc", CURSOR_CREATED_AT, 10)
+        with pytest.raises(ValidationException):
+            await contact_service.get_contacts(
+                organization_id=1,
+                search="acme",
+                current_user_id=1,
+                user_role="admin",
+                cursor=cursor,
+            )
+
+    @pytest.mark.asyncio
+    async def test_autocomplete_falls_back_to_db_for_large_organizations(self):
+        mock_db = AsyncMock(spec=AsyncSession)
+        contact_service = ContactService(mock_db)
+
+        contact = MagicMock(id=7, email="anna@example.com", owner_id=1)
+        contact.name = "Anna"
+        contact_service.contact_repo = AsyncMock()
+        contact_service.contact_repo.search_by_prefix = AsyncMock(return_value=[contact])
+
+        with (
+            patch("app.services.contact.AsyncSessionLocal", MagicMock()),
+            patch.object(
+                ContactRepository,
+                "get_organization_contact_keys",
+                return_value=[(i, f"Contact {i}", None, 1) for i in range(3)],
+            ),
+            patch.object(contact_prefix_index, "max_organization_contacts", 2),
+        ):
+            result = await contact_service.autocomplete(
+                organization_id=99, prefix="an", current_user_id=1, user_role="member"
+            )
+
+        contact_service.contact_repo.search_by_prefix.assert_called_once_with(99, "an", 10, 1)
+        assert [suggestion.name for suggestion in result] == ["Anna"]
+
+    @pytest.mark.asyncio
+    async def test_autocomplete_index_is_loaded_from_primary(self):
+        # Сессия запроса может быть репликой: индекс строится не по ней
+        replica_db = AsyncMock(spec=AsyncSession)
+        contact_service = ContactService(replica_db)
+        primary_db = AsyncMock(spec=AsyncSession)
+        session_factory = MagicMock()
+        session_factory.return_value.__aenter__.return_value = primary_db
+
+        async def contact_keys(repo, organization_id, limit):
+            assert repo.db is primary_db
+            return [(1, "Anna", "anna@example.com", 1)]
+
+        with (
+            patch("app.services.contact.AsyncSessionLocal", session_factory),
+            patch.object(
+                ContactRepository,
+                "get_organization_contact_keys",
+                autospec=True,
+                side_effect=contact_keys,
+            ),
+        ):
+            result = await contact_service.autocomplete(organization_id=98, prefix="an")
+
+        contact_prefix_index.discard(98)
+        assert [suggestion.name for suggestion in result] == ["Anna"]
+        replica_db.execute.assert_not_called()
@@ -22,8 +22,9 @@ class TestDealService:
 
         # Mock repositories
         deal_service.contact_repo.get_contact_with_organization = AsyncMock(
-            return_value=type("obj", (object,), {"id": 1})
+            return_value=type("obj", (object,), {"id": 1, "name": "Test Contact"})
         )
+        deal_service.names.users = AsyncMock(return_value={1: "Test Owner"})
         deal_service.deal_repo.create = AsyncMock()
         deal_service.deal_repo.create.return_value = type(
             "obj",
@@ -60,6 +61,8 @@ class TestDealService:
 
         assert result.id == 1
         assert result.title == "Test Deal"
+        assert result.contact_name == "Test Contact"
+        assert result.owner_name == "Test Owner"
         deal_service.contact_repo.get_contact_with_organization.assert_called_once_with(1, 1)
         deal_service.activity_repo.create.assert_called_once()
 
@@ -0,0 +1,34 @@
+from unittest.mock import AsyncMock
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.names import NameLoader
+
+
+class TestNameLoader:
+    @pytest.mark.asyncio
+    async def test_loads_each_id_once_per_request(self):
+        loader = NameLoader(AsyncMock(spec=AsyncSession))
+        loader._user_repo = AsyncMock()
+        loader._user_repo.get_names_by_ids = AsyncMock(
+            side_effect=[{1: "Alice", 2: "Bob"}, {3: "Carol"}]
+        )
+
+        first = await loader.users([1, 2, 1, None])
+        second = await loader.users([2, 3])
+
+        assert first[1] == "Alice"
+        assert second[3] == "Carol"
+        calls = loader._user_repo.get_names_by_ids.call_args_list
+        assert [call.args[0] for call in calls] == [{1, 2}, {3}]
+
+    @pytest.mark.asyncio
+    async def test_no_query_when_all_names_are_known(self):
+        loader = NameLoader(AsyncMock(spec=AsyncSession))
+        loader._deal_repo = AsyncMock()
+        loader._deal_repo.get_titles_by_ids = AsyncMock(return_value={})
+
+        assert await loader.deals([]) == {}
+        assert await loader.deals([None]) == {}
+        loader._deal_repo.get_titles_by_ids.assert_not_called()
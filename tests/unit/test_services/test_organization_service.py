@@ -0,0 +1,49 @@
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import user_organizations_cache
+from app.services import OrganizationService
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    user_organizations_cache.clear()
+    yield
+    user_organizations_cache.clear()
+
+
+def make_service() -> OrganizationService:
+    service = OrganizationService(AsyncMock(spec=AsyncSession))
+    service.member_repo = AsyncMock()
+    organization = MagicMock(id=1, created_at=datetime(2025, 1, 1))
+    organization.name = "Acme"
+    service.member_repo.get_user_organizations_with_roles = AsyncMock(
+        return_value=[(organization, "owner")]
+    )
+    return service
+
+
+class TestOrganizationService:
+    @pytest.mark.asyncio
+    async def test_get_user_organizations_uses_single_query(self):
+        service = make_service()
+
+        result = await service.get_user_organizations(10)
+
+        assert result == [
+            {"id": 1, "name": "Acme", "created_at": datetime(2025, 1, 1), "role": "owner"}
+        ]
+        service.member_repo.get_user_organizations_with_roles.assert_called_once_with(10)
+        service.member_repo.get_user_membership.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_user_organizations_is_cached(self):
+        service = make_service()
+
+        await service.get_user_organizations(10)
+        await service.get_user_organizations(10)
+
+        service.member_repo.get_user_organizations_with_roles.assert_called_once()
@@ -0,0 +1,89 @@
+import base64
+import json
+from datetime import UTC, datetime
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.core.exceptions import ValidationException
+from app.services.pagination import (
+    build_page,
+    decode_cursor,
+    encode_cursor,
+    get_count_cap,
+    make_next_cursor,
+)
+
+
+class TestBuildPage:
+    def test_exact_total(self):
+        page = build_page([], total=250, page=2, page_size=100)
+
+        assert page["total"] == 250
+        assert page["total_capped"] is False
+        assert page["total_pages"] == 3
+
+    def test_capped_total(self):
+        count_cap = get_count_cap("capped")
+        page = build_page([], total=count_cap + 1, page=1, page_size=100, count_cap=count_cap)
+
+        assert page["total"] == count_cap
+        assert page["total_capped"] is True
+
+    def test_total_below_cap_is_exact(self):
+        page = build_page([], total=5, page=1, page_size=100, count_cap=1000)
+
+        assert page["total"] == 5
+        assert page["total_capped"] is False
+
+    def test_exact_mode_has_no_cap(self):
+        assert get_count_cap("exact") is None
+        assert get_count_cap("none") is None
+
+
+class TestCursor:
+    def test_roundtrip_keeps_value_types(self):
+        created_at = datetime(2024, 5, 1, 12, 30, tzinfo=UTC)
+
+        assert decode_cursor(
+            encode_cursor("created_at:desc", created_at, 7), "created_at:desc"
+        ) == (
+            created_at,
+            7,
+        )
+        assert decode_cursor(encode_cursor("amount:asc", Decimal("10.50"), 3), "amount:asc") == (
+            Decimal("10.50"),
+            3,
+        )
+        assert decode_cursor(encode_cursor("amount:asc", None, 3), "amount:asc") == (None, 3)
+
+    def test_cursor_for_other_sort_is_rejected(self):
+        cursor = encode_cursor("amount:asc", Decimal("1"), 1)
+
+        with pytest.raises(ValidationException):
+            decode_cursor(cursor, "amount:desc")
+
+    def test_value_of_wrong_type_for_sort_column_is_rejected(self):
+        for sort, value in (
+            ("amount:desc", "abc"),
+            ("amount:desc", 10),
+            ("created_at:desc", None),
+            ("created_at:desc", "2024-01-01"),
+        ):
+            payload = json.dumps({"s": sort, "v": value, "id": 1}).encode()
+            cursor = base64.urlsafe_b64encode(payload).decode()
+
+            with pytest.raises(ValidationException):
+                decode_cursor(cursor, sort)
+
+    def test_garbage_cursor_is_rejected(self):
+        with pytest.raises(ValidationException):
+            decode_cursor("not-a-cursor", "created_at:desc")
+
+    def test_next_cursor_only_for_full_page(self):
+        items = [MagicMock(id=i, created_at=datetime(2024, 1, i, tzinfo=UTC)) for i in (1, 2)]
+
+        assert make_next_cursor(items[:1], 2, "created_at:desc", "created_at") is None
+        cursor = make_next_cursor(items, 2, "created_at:desc", "created_at")
+        assert decode_cursor(cursor, "created_at:desc") == (items[1].created_at, 2)
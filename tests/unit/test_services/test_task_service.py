@@ -31,6 +31,7 @@ def deal():
     mock_deal.id = 1
     mock_deal.owner_id = 1
     mock_deal.organization_id = 1
+    mock_deal.title = "Test Deal"
     return mock_deal
 
 
@@ -76,6 +77,7 @@ class TestTaskService:
 
         assert result.id == 1
         assert result.title == "Test Task"
+        assert result.deal_title == "Test Deal"
         task_service.deal_repo.get.assert_called_once_with(1)
         task_service.activity_repo.create.assert_called_once()
 